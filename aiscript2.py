@@ -14,12 +14,23 @@ from docx.shared import Inches
 import re
 from collections import Counter
 from textblob import TextBlob
-from transformers import pipeline
+
+
+# The BART summarization model takes seconds and over a gigabyte to load, so
+# it is loaded on first use rather than at import.
+_summarizer = None
+
+
+def get_summarizer():
+    global _summarizer
+    if _summarizer is None:
+        from transformers import pipeline
+
+        _summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+    return _summarizer
 
 
 # Function to categorize sentiment based on polarity score
-# Load the summarization model
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
 
 def categorize_sentiment(polarity):
     """Categorize sentiment based on polarity score."""
@@ -202,7 +213,6 @@ from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem
 
 from collections import Counter
-from transformers import pipeline
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem
 
@@ -215,7 +225,7 @@ def summarize_text(text, max_length=50, min_length=5):
     input_length = len(text.split())
     max_length = min(max_length, input_length)  # Adjust max_length if input is shorter
 
-    summary = summarizer(text, max_length=max_length, min_length=min_length, do_sample=False)
+    summary = get_summarizer()(text, max_length=max_length, min_length=min_length, do_sample=False)
     return summary[0]['summary_text']
 
 def is_meaningful(content):
@@ -1,12 +1,342 @@
 import os
-from flask import Flask, jsonify, request, send_from_directory
+import time
+from flask import Flask, Response, g, jsonify, request, send_file, url_for
 import traceback
-import json
+import unicodedata
+from urllib.parse import quote
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import dump_options_header
+from werkzeug.wsgi import wrap_file
 
 # --- Main function to generate reports based on user input ---
-from report_generator import generate_reports
+from artifact_cache import (ARTIFACT_CACHE_ENABLED, acquire_generation_lock,
+                            artifact_key, open_artifact, publish_artifact,
+                            release_generation_lock)
+from meeting_sessions import (SessionStateError, append_entries, create_session,
+                              end_session, get_session, known_interval_summaries,
+                              session_meeting_data)
+from metrics import (REPORT_JOB_QUEUE_DEPTH, REPORT_REQUEST_SECONDS,
+                     REPORT_REQUESTS_TOTAL, record_cache_lookup, render_latest)
+from renderers import REPORT_MIMETYPES, RENDERERS
+from report_generator import (REPORT_BUILDERS, MeetingAnalysis,
+                              generate_report_bundle, generate_report_stream,
+                              validate_interval_minutes)
+from report_jobs import (get_job, get_job_result, queue_depth, start_workers,
+                         submit_job)
+from request_body import MAX_REQUEST_BODY_BYTES, read_request_body
+from summary_llm import SummarizationError
+from tracing import finish_trace, span, start_trace
+from warmup import readiness, start_warmup
 
 app = Flask(__name__)
+# Rejects oversized uploads up front when they declare a Content-Length
+app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BODY_BYTES
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.trace_token = start_trace(f"{request.method} {request.path}")
+
+
+@app.after_request
+def add_server_timing(response):
+    """Ends the request trace and summarizes its stages in a Server-Timing header."""
+    token = g.pop("trace_token", None)
+    if token is not None:
+        trace = finish_trace(token)
+        response.headers["Server-Timing"] = trace.server_timing()
+    return response
+
+
+@app.teardown_request
+def finish_abandoned_trace(error=None):
+    # Ends (and logs) the trace if after_request never ran, e.g. it raised
+    token = g.pop("trace_token", None)
+    if token is not None:
+        finish_trace(token)
+
+
+@app.after_request
+def record_report_metrics(response):
+    """Records latency for requests that identified a report (see g.report_labels)."""
+    labels = g.get("report_labels")
+    if labels is not None:
+        report_type, report_format = labels
+        REPORT_REQUEST_SECONDS.labels(request.endpoint, report_type, report_format).observe(
+            time.perf_counter() - g.request_started
+        )
+        REPORT_REQUESTS_TOTAL.labels(request.endpoint, report_type, report_format, response.status_code).inc()
+    return response
+
+
+def read_report_body():
+    """
+    Reads the report request body: JSON or NDJSON, optionally gzip-encoded
+    (see request_body.py). Returns the request object, or None if empty.
+    """
+    with span("parse_json", content_length=request.content_length) as current:
+        received_data, reader = read_request_body(
+            request.stream, request.mimetype, request.headers.get("Content-Encoding")
+        )
+        current.set(decoded_bytes=reader.decoder.decoded_bytes)
+    print(f"Received report request: {reader.describe()}")
+    return received_data
+
+
+REQUIRED_MEETING_KEYS = [
+    "meetingTitle",
+    "meetingStartTimeStamp",
+    "meetingEndTimeStamp",
+    "convenor",
+    "attendees",
+    "transcriptData",
+    "speakerDuration",
+]
+
+
+def validate_meeting_data(meeting_data):
+    """Raises ValueError if meeting_data lacks a key the report builders need."""
+    missing_keys = [key for key in REQUIRED_MEETING_KEYS if key not in meeting_data]
+    if missing_keys:
+        raise ValueError(f"Missing required keys in meeting_data: {', '.join(missing_keys)}")
+
+
+def standardize_report_choice(report_type: str, report_format: str) -> tuple[str, str]:
+    """
+    Normalizes the case of a report type and format.
+
+    This ensures "normal" becomes "Normal" and "pdf" becomes "PDF". Known
+    types are matched case-insensitively so "speakerranking" maps to "SpeakerRanking".
+    """
+    report_type_standardized = next(
+        (name for name in REPORT_BUILDERS if name.lower() == report_type.lower()),
+        report_type.capitalize(),
+    )
+    return report_type_standardized, report_format.upper()
+
+
+def parse_report_request(received_data) -> dict:
+    """
+    Extracts and validates the report fields shared by /report and /reports.
+
+    Raises:
+        ValueError: If the request is missing data; the message is client-facing.
+    """
+    if not received_data:
+        raise ValueError("No JSON data received")
+
+    # --- Extract and Validate Data ---
+    meeting_data = received_data.get("meeting_data")
+    report_type = received_data.get("report_type")
+    report_format = received_data.get("report_format")
+    interval_minutes = received_data.get("interval_minutes")
+    if interval_minutes is None:
+        interval_minutes = 5
+
+    print(f"Extracted fields: report_type={report_type}, report_format={report_format}, interval_minutes={interval_minutes}")
+
+    if meeting_data:
+        print(f"Meeting data keys: {list(meeting_data.keys())}")
+    else:
+        print("ERROR: meeting_data is missing or null")
+
+    if not all([meeting_data, report_type, report_format]):
+        missing = []
+        if not meeting_data: missing.append("meeting_data")
+        if not report_type: missing.append("report_type")
+        if not report_format: missing.append("report_format")
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    # Validate essential keys in meeting_data
+    validate_meeting_data(meeting_data)
+
+    # --- 💡 FIX: Standardize inputs to prevent case-sensitivity errors ---
+    report_type_standardized, report_format_standardized = standardize_report_choice(report_type, report_format)
+    # Only the Interval report reads the interval length
+    if report_type_standardized == "Interval":
+        validate_interval_minutes(interval_minutes)
+
+    print(f"Standardized fields: report_type={report_type_standardized}, report_format={report_format_standardized}")
+
+    return {
+        "meeting_data": meeting_data,
+        "report_type": report_type_standardized,
+        "report_format": report_format_standardized,
+        "interval_minutes": interval_minutes,
+    }
+
+
+def parse_bundle_request(received_data) -> dict:
+    """
+    Extracts and validates a /report/bundle request.
+
+    `reports` is a list of {"report_type": ..., "report_format": ...} objects
+    (or [report_type, report_format] pairs).
+
+    Raises:
+        ValueError: If the request is invalid; the message is client-facing.
+    """
+    if not received_data:
+        raise ValueError("No JSON data received")
+
+    meeting_data = received_data.get("meeting_data")
+    reports = received_data.get("reports")
+    if not meeting_data or not reports or not isinstance(reports, list):
+        raise ValueError("meeting_data and a non-empty reports list are required")
+    validate_meeting_data(meeting_data)
+
+    choices = []
+    for entry in reports:
+        if isinstance(entry, dict):
+            report_type, report_format = entry.get("report_type"), entry.get("report_format")
+        elif isinstance(entry, (list, tuple)) and len(entry) == 2:
+            report_type, report_format = entry
+        else:
+            report_type = report_format = None
+        if not isinstance(report_type, str) or not isinstance(report_format, str):
+            raise ValueError(f"Invalid reports entry: {entry!r}")
+        report_type, report_format = standardize_report_choice(report_type, report_format)
+        if report_type not in REPORT_BUILDERS or report_format not in RENDERERS:
+            raise ValueError(f"Invalid report/format combination: {report_type}/{report_format}")
+        choices.append((report_type, report_format))
+
+    interval_minutes = received_data.get("interval_minutes")
+    if interval_minutes is None:
+        interval_minutes = 5
+    if any(report_type == "Interval" for report_type, _ in choices):
+        validate_interval_minutes(interval_minutes)
+
+    print(f"Bundle request: {', '.join(f'{t}/{f}' for t, f in choices)}")
+    return {
+        "meeting_data": meeting_data,
+        "reports": choices,
+        "interval_minutes": interval_minutes,
+    }
+
+
+def content_disposition(download_name: str) -> str:
+    """The attachment Content-Disposition header for a download name."""
+    # Non-ASCII (e.g. Vietnamese) titles need the RFC 5987 form, as in send_file
+    try:
+        download_name.encode("ascii")
+        disposition = {"filename": download_name}
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", download_name).encode("ascii", "ignore").decode("ascii")
+        disposition = {"filename": simple, "filename*": f"UTF-8''{quote(download_name, safe='')}"}
+    return dump_options_header("attachment", disposition)
+
+
+def report_file_response(buffer, size: int, download_name: str, mimetype: str) -> Response:
+    """Streams a rendered report with explicit Content-Type and Content-Length."""
+    response = Response(
+        wrap_file(request.environ, buffer), mimetype=mimetype, direct_passthrough=True
+    )
+    response.content_length = size
+    response.headers["Content-Disposition"] = content_disposition(download_name)
+    response.call_on_close(buffer.close)
+    return response
+
+
+def artifact_response(response: Response, etag: str) -> Response:
+    """Marks a report response as revalidatable under its artifact ETag."""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def open_cached_report(etag: str):
+    """Returns a streaming response for a cached artifact, or None on a miss."""
+    with span("artifact_get") as current:
+        cached = open_artifact(etag)
+        current.set(hit=cached is not None)
+    if cached is None:
+        return None
+    report_file, metadata = cached
+    response = report_file_response(
+        report_file, metadata["size"], metadata["download_name"], metadata["mimetype"]
+    )
+    return artifact_response(response, etag)
+
+
+def cached_report_response(etag: str, report_request: dict):
+    """
+    Serves the report from the artifact cache, generating it at most once.
+
+    Concurrent identical requests (in any worker) wait on the same generation
+    lock and then find the finished artifact. Returns None only if the report
+    could not be generated.
+    """
+    response = open_cached_report(etag)
+    record_cache_lookup("artifact", hit=response is not None)
+    if response is not None:
+        print("Serving report from the artifact cache.")
+        return response
+
+    result = generate_cached_report(etag, report_request)
+    if result is None:
+        return None
+    buffer, size, download_name = result
+    response = report_file_response(
+        buffer, size, download_name, REPORT_MIMETYPES[report_request["report_format"]]
+    )
+    return artifact_response(response, etag)
+
+
+def generate_cached_report(etag: str, report_request: dict):
+    """
+    Generates a report under its generation lock and caches it on the side.
+
+    A request that waited on a concurrent generation gets the artifact it
+    produced. The report itself is returned straight from the render buffer,
+    so a failed or already evicted cache write never fails the request.
+
+    Returns:
+        tuple | None: (rewound file object, size in bytes, download file
+        name), or None if the report could not be generated.
+    """
+    lock_file = acquire_generation_lock(etag)
+    result = None
+    try:
+        cached = open_artifact(etag)
+        if cached is None:
+            print("Starting report generation...")
+            result = generate_report_stream(
+                report_request["meeting_data"],
+                report_type=report_request["report_type"],
+                format_type=report_request["report_format"],
+                interval_minutes=report_request["interval_minutes"],
+            )
+    except BaseException:
+        release_generation_lock(lock_file)
+        raise
+    if cached is not None:
+        release_generation_lock(lock_file)
+        print("Serving report generated by a concurrent request.")
+        report_file, metadata = cached
+        return report_file, metadata["size"], metadata["download_name"]
+    if result is None:
+        release_generation_lock(lock_file)
+        return None
+
+    buffer, size, download_name = result
+    # Releases the lock once the artifact is written
+    publish_artifact(
+        etag, buffer, size, download_name, REPORT_MIMETYPES[report_request["report_format"]], lock_file
+    )
+    print(f"Report generated: {download_name} ({size} bytes)")
+    return result
+
+
+def summarization_error_response(error: SummarizationError):
+    """503 for quota/transient failures (with Retry-After), 502 otherwise."""
+    if error.retryable:
+        response = jsonify({"error": "The summarization service is busy. Please retry shortly."})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(int(error.retry_after or 30) + 1)
+        return response
+    return jsonify({"error": f"Report summarization failed: {error}"}), 502
+
 
 @app.route("/report", methods=["POST"])
 def get_report():
@@ -16,80 +346,61 @@ def get_report():
     # Ghi nhật ký chi tiết hơn
     print("\n--- NEW REPORT REQUEST ---")
     try:
-        received_data = request.json
-        print(f"Received raw request data: {json.dumps(received_data, indent=2)}")
-        
-        if not received_data:
-            print("ERROR: No JSON data received")
-            return jsonify({"error": "No JSON data received"}), 400
-
-        # --- Extract and Validate Data ---
-        meeting_data = received_data.get("meeting_data")
-        report_type = received_data.get("report_type")
-        report_format = received_data.get("report_format")
-        interval_minutes = received_data.get("interval_minutes", 5)
-        
-        print(f"Extracted fields: report_type={report_type}, report_format={report_format}, interval_minutes={interval_minutes}")
-        
-        if meeting_data:
-            print(f"Meeting data keys: {list(meeting_data.keys())}")
-        else:
-            print("ERROR: meeting_data is missing or null")
-            
-        if not all([meeting_data, report_type, report_format]):
-            missing = []
-            if not meeting_data: missing.append("meeting_data")
-            if not report_type: missing.append("report_type")
-            if not report_format: missing.append("report_format")
-            error_msg = f"Missing required fields: {', '.join(missing)}"
-            print(f"ERROR: {error_msg}")
-            return jsonify({"error": error_msg}), 400
-
-        # Validate essential keys in meeting_data
-        required_keys = [
-            "meetingTitle",
-            "meetingStartTimeStamp",
-            "meetingEndTimeStamp",
-            "convenor",
-            "attendees",
-            "transcriptData",
-            "speakerDuration",
-        ]
-        
-        missing_keys = [key for key in required_keys if key not in meeting_data]
-        if missing_keys:
-            error_msg = f"Missing required keys in meeting_data: {', '.join(missing_keys)}"
-            print(f"ERROR: {error_msg}")
-            return jsonify({"error": error_msg}), 400
-        
-        # --- 💡 FIX: Standardize inputs to prevent case-sensitivity errors ---
-        # This ensures "normal" becomes "Normal" and "pdf" becomes "PDF".
-        report_type_standardized = report_type.capitalize()
-        report_format_standardized = report_format.upper()
-        
-        print(f"Standardized fields: report_type={report_type_standardized}, report_format={report_format_standardized}")
+        try:
+            report_request = parse_report_request(read_report_body())
+        except HTTPException as e:
+            print(f"ERROR: {e.description}")
+            return jsonify({"error": e.description}), e.code
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            return jsonify({"error": str(e)}), 400
+        g.report_labels = (report_request["report_type"], report_request["report_format"])
+
+        # --- Serve from the artifact cache when possible ---
+        etag = artifact_key(
+            report_request["meeting_data"],
+            report_request["report_type"],
+            report_request["report_format"],
+            report_request["interval_minutes"],
+        )
+        if ARTIFACT_CACHE_ENABLED and etag in request.if_none_match:
+            record_cache_lookup("artifact", hit=True)
+            print("Client already has this report (304).")
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
 
         # --- Generate Report ---
         try:
+            if ARTIFACT_CACHE_ENABLED:
+                response = cached_report_response(etag, report_request)
+                if response is None:
+                    print("ERROR: Report generation returned None")
+                    return jsonify({"error": "Report generation failed on the server."}), 500
+                return response
+
             print("Starting report generation...")
-            file_path = generate_reports(
-                meeting_data,
-                report_type=report_type_standardized,
-                format_type=report_format_standardized,
-                interval_minutes=interval_minutes,
+            result = generate_report_stream(
+                report_request["meeting_data"],
+                report_type=report_request["report_type"],
+                format_type=report_request["report_format"],
+                interval_minutes=report_request["interval_minutes"],
             )
-            
-            if file_path is None:
+
+            if result is None:
                 print("ERROR: Report generation returned None")
                 return jsonify({"error": "Report generation failed on the server."}), 500
 
-            print(f"Report generated successfully at: {file_path}")
-            # --- Send File ---
-            directory = os.path.dirname(file_path)
-            filename = os.path.basename(file_path)
-
-            return send_from_directory(directory, filename, as_attachment=True)
+            # --- Stream File ---
+            buffer, size, download_name = result
+            print(f"Report generated successfully: {download_name} ({size} bytes)")
+            return report_file_response(
+                buffer, size, download_name, REPORT_MIMETYPES[report_request["report_format"]]
+            )
 
+        except SummarizationError as e:
+            print(f"ERROR (Summarization): {str(e)}")
+            return summarization_error_response(e)
         except ValueError as e:
             print(f"ERROR (ValueError): {str(e)}")
             return jsonify({"error": str(e)}), 400
@@ -103,9 +414,269 @@ def get_report():
         print(traceback.format_exc())
         return jsonify({"error": "Error processing request"}), 400
 
+
+@app.route("/report/bundle", methods=["POST"])
+def get_report_bundle():
+    """
+    API endpoint to generate several reports for one meeting as a zip file.
+
+    The meeting is analyzed once for all requested reports.
+    """
+    print("\n--- NEW REPORT BUNDLE REQUEST ---")
+    try:
+        bundle_request = parse_bundle_request(read_report_body())
+    except HTTPException as e:
+        print(f"ERROR: {e.description}")
+        return jsonify({"error": e.description}), e.code
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return jsonify({"error": str(e)}), 400
+    g.report_labels = ("Bundle", "ZIP")
+
+    try:
+        result = generate_report_bundle(
+            bundle_request["meeting_data"],
+            bundle_request["reports"],
+            interval_minutes=bundle_request["interval_minutes"],
+        )
+    except SummarizationError as e:
+        print(f"ERROR (Summarization): {str(e)}")
+        return summarization_error_response(e)
+    except ValueError as e:
+        print(f"ERROR (ValueError): {str(e)}")
+        return jsonify({"error": str(e)}), 400
+
+    if result is None:
+        print("ERROR: Report bundle generation returned None")
+        return jsonify({"error": "Report generation failed on the server."}), 500
+
+    buffer, size, download_name = result
+    return report_file_response(buffer, size, download_name, "application/zip")
+
+
+# ==============================================================================
+# ASYNCHRONOUS REPORT JOBS
+# ==============================================================================
+
+
+def job_response(job: dict) -> dict:
+    """Adds the polling and download URLs to a job status."""
+    return {
+        **job,
+        "status_url": url_for("get_report_job", job_id=job["job_id"]),
+        "download_url": url_for("download_report_job", job_id=job["job_id"]),
+    }
+
+
+@app.route("/reports", methods=["POST"])
+def create_report_job():
+    """
+    Queues a report and returns its job id immediately (202 Accepted).
+
+    An `Idempotency-Key` header (or `idempotency_key` field) makes retries of
+    the same request return the original job instead of queueing a new one;
+    if that job failed, it is queued again.
+    """
+    print("\n--- NEW REPORT JOB REQUEST ---")
+    try:
+        received_data = read_report_body()
+        report_request = parse_report_request(received_data)
+        if report_request["report_type"] not in REPORT_BUILDERS or report_request["report_format"] not in RENDERERS:
+            raise ValueError(
+                f"Invalid report/format combination: {report_request['report_type']}/{report_request['report_format']}"
+            )
+    except HTTPException as e:
+        print(f"ERROR: {e.description}")
+        return jsonify({"error": e.description}), e.code
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return jsonify({"error": str(e)}), 400
+
+    idempotency_key = request.headers.get("Idempotency-Key") or received_data.get("idempotency_key")
+    start_workers()
+    job, created = submit_job(report_request, idempotency_key)
+    print(f"Job {job['job_id']} {'queued' if created else 'already exists'} (idempotency_key={idempotency_key})")
+    return jsonify(job_response(job)), 202 if created else 200
+
+
+@app.route("/reports/<job_id>", methods=["GET"])
+def get_report_job(job_id):
+    """Returns the status and progress of a report job."""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job_response(job))
+
+
+@app.route("/reports/<job_id>/download", methods=["GET"])
+def download_report_job(job_id):
+    """Sends the finished report file; 409 while the job is still running."""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    result = get_job_result(job_id)
+    if result is None:
+        return jsonify({"error": f"Report is not ready (status: {job['status']})", **job_response(job)}), 409
+
+    file_path, download_name = result
+    return send_file(file_path, as_attachment=True, download_name=download_name)
+
+
+# ==============================================================================
+# LIVE MEETING SESSIONS
+# ==============================================================================
+
+
+def session_response(session: dict) -> dict:
+    """Adds the URLs a live client needs to a session status."""
+    session_id = session["session_id"]
+    return {
+        **session,
+        "transcript_url": url_for("append_meeting_transcript", session_id=session_id),
+        "end_url": url_for("end_meeting_session", session_id=session_id),
+        "report_url": url_for("get_meeting_report", session_id=session_id),
+    }
+
+
+@app.route("/meetings", methods=["POST"])
+def create_meeting_session():
+    """
+    Opens a live session. Body: {"meeting_data": {...known fields...}, "interval_minutes": 5}.
+
+    The transcript is then appended in chunks while the meeting runs.
+    """
+    received_data = request.get_json(silent=True) or {}
+    try:
+        session = create_session(received_data.get("meeting_data") or {}, received_data.get("interval_minutes", 5))
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return jsonify({"error": str(e)}), 400
+    print(f"Meeting session {session['session_id']} started.")
+    return jsonify(session_response(session)), 201
+
+
+@app.route("/meetings/<session_id>", methods=["GET"])
+def get_meeting_session(session_id):
+    """Returns the session status and which intervals are already summarized."""
+    session = get_session(session_id)
+    if session is None:
+        return jsonify({"error": "Meeting session not found"}), 404
+    return jsonify(session_response(session))
+
+
+@app.route("/meetings/<session_id>/transcript", methods=["POST"])
+def append_meeting_transcript(session_id):
+    """
+    Appends {"transcriptData": [...], "chunk_id": optional} to a live session.
+
+    Intervals closed by the new captions are summarized in the background.
+    """
+    received_data = request.get_json(silent=True) or {}
+    try:
+        session = append_entries(session_id, received_data.get("transcriptData"), received_data.get("chunk_id"))
+    except KeyError:
+        return jsonify({"error": "Meeting session not found"}), 404
+    except SessionStateError as e:
+        return jsonify({"error": str(e)}), 409
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return jsonify({"error": str(e)}), 400
+    return jsonify(session_response(session))
+
+
+@app.route("/meetings/<session_id>/end", methods=["POST"])
+def end_meeting_session(session_id):
+    """Ends the session; an optional {"meeting_data": {...}} supplies the final fields."""
+    received_data = request.get_json(silent=True) or {}
+    try:
+        session = end_session(session_id, received_data.get("meeting_data"))
+    except KeyError:
+        return jsonify({"error": "Meeting session not found"}), 404
+    print(f"Meeting session {session_id} ended.")
+    return jsonify(session_response(session))
+
+
+@app.route("/meetings/<session_id>/report", methods=["POST"])
+def get_meeting_report(session_id):
+    """
+    Generates a report for a session from {"report_type", "report_format"}.
+
+    Interval summaries made while the meeting ran are reused.
+    """
+    print("\n--- NEW MEETING SESSION REPORT REQUEST ---")
+    received_data = request.get_json(silent=True) or {}
+    meeting_data = session_meeting_data(session_id)
+    if meeting_data is None:
+        return jsonify({"error": "Meeting session not found"}), 404
+    try:
+        report_type, report_format = received_data.get("report_type"), received_data.get("report_format")
+        if not isinstance(report_type, str) or not isinstance(report_format, str):
+            raise ValueError("Missing required fields: report_type, report_format")
+        report_type, report_format = standardize_report_choice(report_type, report_format)
+        if not meeting_data["transcriptData"]:
+            raise ValueError("The meeting session has no transcript yet")
+        validate_meeting_data(meeting_data)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return jsonify({"error": str(e)}), 400
+    g.report_labels = (report_type, report_format)
+
+    analysis = MeetingAnalysis(
+        meeting_data,
+        report_types=[report_type],
+        known_interval_summaries=known_interval_summaries(session_id),
+    )
+    try:
+        result = generate_report_stream(
+            meeting_data,
+            report_type=report_type,
+            format_type=report_format,
+            interval_minutes=get_session(session_id)["interval_minutes"],
+            analysis=analysis,
+        )
+    except SummarizationError as e:
+        print(f"ERROR (Summarization): {str(e)}")
+        return summarization_error_response(e)
+    except ValueError as e:
+        print(f"ERROR (ValueError): {str(e)}")
+        return jsonify({"error": str(e)}), 400
+
+    if result is None:
+        print("ERROR: Report generation returned None")
+        return jsonify({"error": "Report generation failed on the server."}), 500
+    buffer, size, download_name = result
+    return report_file_response(buffer, size, download_name, REPORT_MIMETYPES[report_format])
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """Liveness probe: the process is up and serving requests."""
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """Readiness probe: 503 until the background warmup (see warmup.py) has finished."""
+    ready, details = readiness()
+    return jsonify({"ready": ready, "warmup": details}), 200 if ready else 503
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus scrape endpoint, aggregated over all worker processes."""
+    try:
+        REPORT_JOB_QUEUE_DEPTH.set(queue_depth())
+    except Exception as e:
+        print(f"Could not read the report job queue depth: {e}")
+    body, content_type = render_latest()
+    return Response(body, content_type=content_type)
+
+
 if __name__ == "__main__":
     # Ensure the 'reports' directory exists before starting the app
     if not os.path.exists("./reports"):
         os.makedirs("./reports")
+    start_warmup()
+    start_workers()
     app.run(port=8000, debug=True)
 
@@ -0,0 +1,213 @@
+import fcntl
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from renderers import REPORT_SPOOL_MAX_BYTES
+from report_generator import (NORMAL_REPORT_MODE, OVERALL_SUMMARY_SOURCE,
+                              SUMMARY_HIERARCHY_INTERVAL_MINUTES)
+from summary_llm import SUMMARIZER_BACKEND
+from tracing import span
+
+# ==============================================================================
+# RENDERED REPORT ARTIFACT CACHE
+# ==============================================================================
+# Finished report files are stored under a hash of the canonical request, so a
+# repeated request (double click, popup retry) is served from disk, answered
+# with 304 when the client already has it, and concurrent identical requests
+# across all gunicorn workers wait on one generation via a per-key file lock.
+#
+# The request that generates a report streams it from its render buffer; the
+# cache is written on the side. A report small enough to stay in memory
+# (REPORT_SPOOL_MAX_BYTES) is written by a background thread, so its response
+# never waits on disk; a larger one is already spooled to disk and is copied
+# before it is streamed. The generation lock is held until the write is done,
+# so a waiting identical request finds the finished artifact.
+
+ARTIFACT_CACHE_DIR = os.environ.get("ARTIFACT_CACHE_DIR", "./cache/artifacts")
+ARTIFACT_CACHE_MAX_BYTES = int(os.environ.get("ARTIFACT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+ARTIFACT_CACHE_ENABLED = ARTIFACT_CACHE_MAX_BYTES > 0
+# Lock files untouched for this long belong to no running generation
+LOCK_FILE_MAX_AGE_SECONDS = 3600
+
+_evict_lock = threading.Lock()
+
+
+def artifact_key(meeting_data: dict, report_type: str, report_format: str, interval_minutes) -> str:
+    """Hashes the canonicalized request; also used as the response ETag."""
+    canonical = json.dumps(
+        {
+            "meeting_data": meeting_data,
+            "report_type": report_type,
+            "report_format": report_format,
+            # Only the Interval report depends on the interval length
+            "interval_minutes": interval_minutes if report_type == "Interval" else None,
+            # ...and only the Normal report on how its sections are summarized
+            "normal_report": (
+                [NORMAL_REPORT_MODE, OVERALL_SUMMARY_SOURCE, SUMMARY_HIERARCHY_INTERVAL_MINUTES]
+                if report_type == "Normal"
+                else None
+            ),
+            # Reports summarized by the fake backend must not be served for real ones
+            "backend": SUMMARIZER_BACKEND,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _paths(key: str) -> tuple[str, str]:
+    base = os.path.join(ARTIFACT_CACHE_DIR, key)
+    return f"{base}.bin", f"{base}.json"
+
+
+def get_artifact(key: str):
+    """
+    Returns (file path, metadata) for a cached artifact, or None.
+
+    A hit refreshes the file's mtime, which drives LRU eviction.
+    """
+    data_path, meta_path = _paths(key)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            metadata = json.load(f)
+        os.utime(data_path)
+    except (OSError, ValueError):
+        return None
+    return data_path, metadata
+
+
+def open_artifact(key: str):
+    """Opens a cached artifact for reading; returns (file object, metadata) or None."""
+    cached = get_artifact(key)
+    if cached is None:
+        return None
+    data_path, metadata = cached
+    try:
+        return open(data_path, "rb"), metadata
+    except OSError:
+        return None  # evicted in the meantime
+
+
+def put_artifact(key: str, buffer, size: int, download_name: str, mimetype: str):
+    """Copies a rendered report into the cache atomically."""
+    os.makedirs(ARTIFACT_CACHE_DIR, exist_ok=True)
+    data_path, meta_path = _paths(key)
+
+    fd, tmp_path = tempfile.mkstemp(dir=ARTIFACT_CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        shutil.copyfileobj(buffer, f)
+    os.replace(tmp_path, data_path)
+
+    fd, tmp_path = tempfile.mkstemp(dir=ARTIFACT_CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"size": size, "download_name": download_name, "mimetype": mimetype}, f, ensure_ascii=False)
+    os.replace(tmp_path, meta_path)
+
+    evict_artifacts()
+
+
+def acquire_generation_lock(key: str):
+    """
+    Waits for the generation lock of one artifact (across threads and
+    processes) and returns its handle for release_generation_lock.
+    """
+    lock_dir = os.path.join(ARTIFACT_CACHE_DIR, "locks")
+    os.makedirs(lock_dir, exist_ok=True)
+    lock_file = open(os.path.join(lock_dir, f"{key}.lock"), "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        # Marks the lock as in use for evict_artifacts
+        os.utime(lock_file.fileno())
+    except BaseException:
+        lock_file.close()
+        raise
+    return lock_file
+
+
+def release_generation_lock(lock_file):
+    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    lock_file.close()
+
+
+def _store_artifact(key: str, buffer, size: int, download_name: str, mimetype: str):
+    try:
+        with span("artifact_put", output_bytes=size):
+            put_artifact(key, buffer, size, download_name, mimetype)
+    except OSError as e:
+        # The report was still served; it just is not cached
+        print(f"Could not cache report artifact {key[:12]}: {e}")
+
+
+def _store_in_background(key: str, data: bytes, download_name: str, mimetype: str, lock_file):
+    try:
+        _store_artifact(key, io.BytesIO(data), len(data), download_name, mimetype)
+    finally:
+        release_generation_lock(lock_file)
+
+
+def publish_artifact(key: str, buffer, size: int, download_name: str, mimetype: str, lock_file):
+    """
+    Caches a freshly rendered report, then releases its generation lock.
+
+    `buffer` is left rewound for the caller to stream. A failed cache write
+    is logged and otherwise ignored.
+    """
+    try:
+        if size <= REPORT_SPOOL_MAX_BYTES:
+            data = buffer.read()
+            buffer.seek(0)
+            threading.Thread(
+                target=_store_in_background,
+                args=(key, data, download_name, mimetype, lock_file),
+                name="artifact-publish",
+                daemon=True,
+            ).start()
+            return
+        _store_artifact(key, buffer, size, download_name, mimetype)
+        buffer.seek(0)
+    except BaseException:
+        release_generation_lock(lock_file)
+        raise
+    release_generation_lock(lock_file)
+
+
+def evict_artifacts(max_bytes: int = ARTIFACT_CACHE_MAX_BYTES):
+    """Deletes least recently used artifacts until the cache fits in max_bytes."""
+    with _evict_lock:
+        try:
+            entries = []
+            for entry in os.scandir(ARTIFACT_CACHE_DIR):
+                if entry.name.endswith(".bin"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.name[: -len(".bin")]))
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= max_bytes:
+                break
+            for path in _paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+        # One lock file is left per generated key
+        cutoff = time.time() - LOCK_FILE_MAX_AGE_SECONDS
+        try:
+            for entry in os.scandir(os.path.join(ARTIFACT_CACHE_DIR, "locks")):
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+        except OSError:
+            pass
@@ -0,0 +1,223 @@
+import asyncio
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
+from werkzeug.http import parse_etags
+
+import summary_llm
+from app import app as flask_app
+from app import content_disposition, generate_cached_report, parse_report_request
+from artifact_cache import ARTIFACT_CACHE_ENABLED, artifact_key, open_artifact
+from metrics import REPORT_REQUEST_SECONDS, REPORT_REQUESTS_TOTAL, record_cache_lookup
+from renderers import REPORT_MIMETYPES
+from report_generator import generate_report_stream
+from report_jobs import start_workers
+from request_body import MAX_REQUEST_BODY_BYTES, READ_CHUNK_BYTES, RequestBodyReader
+from summary_llm import SummarizationError
+from tracing import finish_trace, propagate, span, start_trace
+from warmup import start_warmup
+
+# ==============================================================================
+# ASYNC SERVING PATH (ASGI)
+# ==============================================================================
+# Run with uvicorn workers instead of the default sync workers:
+#
+#   gunicorn asgi:app -k uvicorn.workers.UvicornWorker
+#
+# POST /report is served natively here with the same contract as the Flask
+# route (400/304/502/503, artifact cache, ETag, Server-Timing, metrics). Its
+# Gemini calls run as coroutines on this event loop (see summary_llm), and
+# report building and rendering run on REPORT_BUILD_THREADS executor threads,
+# so one process holds hundreds of in-flight reports instead of one per sync
+# worker. Every other route is the Flask app, mounted as WSGI.
+
+# Threads that build (mostly waiting on Gemini) and render reports
+REPORT_BUILD_THREADS = int(os.environ.get("REPORT_BUILD_THREADS", "256"))
+# Threads that serve the mounted Flask routes
+WSGI_THREADS = int(os.environ.get("WSGI_THREADS", "16"))
+STREAM_CHUNK_BYTES = 64 * 1024
+
+_build_executor = None
+
+
+async def run_blocking(fn, *args):
+    """Runs fn(*args) on the report build threads, inside the current trace."""
+    return await asyncio.get_running_loop().run_in_executor(_build_executor, propagate(fn), *args)
+
+
+def error_response(message: str, status_code: int) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+def summarization_error_response(error: SummarizationError) -> JSONResponse:
+    """503 for quota/transient failures (with Retry-After), 502 otherwise."""
+    if error.retryable:
+        return JSONResponse(
+            {"error": "The summarization service is busy. Please retry shortly."},
+            status_code=503,
+            headers={"Retry-After": str(int(error.retry_after or 30) + 1)},
+        )
+    return error_response(f"Report summarization failed: {error}", 502)
+
+
+def _iter_buffer(buffer):
+    try:
+        while chunk := buffer.read(STREAM_CHUNK_BYTES):
+            yield chunk
+    finally:
+        buffer.close()
+
+
+def stream_response(buffer, size: int, download_name: str, mimetype: str, etag: str = None) -> StreamingResponse:
+    """Streams a rendered report (read on a worker thread) with an explicit Content-Length."""
+    headers = {"Content-Length": str(size), "Content-Disposition": content_disposition(download_name)}
+    if etag is not None:
+        headers.update({"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"})
+    return StreamingResponse(_iter_buffer(buffer), media_type=mimetype, headers=headers)
+
+
+async def read_report_body(request):
+    """Feeds the body to a RequestBodyReader as it arrives (JSON or NDJSON, optionally gzip)."""
+    content_length = request.headers.get("content-length")
+    with span("parse_json", content_length=content_length) as current:
+        if content_length and content_length.isdigit() and int(content_length) > MAX_REQUEST_BODY_BYTES:
+            raise RequestEntityTooLarge(f"The request body exceeds {MAX_REQUEST_BODY_BYTES} bytes.")
+        mimetype = request.headers.get("content-type", "").split(";")[0].strip()
+        reader = RequestBodyReader(mimetype, request.headers.get("content-encoding"))
+        # Decompression and NDJSON parsing run on the build threads, a batch
+        # of up to READ_CHUNK_BYTES at a time, so a large upload never stalls the loop
+        batch, batch_bytes = [], 0
+        async for chunk in request.stream():
+            batch.append(chunk)
+            batch_bytes += len(chunk)
+            if batch_bytes >= READ_CHUNK_BYTES:
+                await run_blocking(reader.feed, b"".join(batch))
+                batch, batch_bytes = [], 0
+        if batch:
+            await run_blocking(reader.feed, b"".join(batch))
+        # A JSON body is parsed in one piece at the end
+        received_data = await run_blocking(reader.close)
+        current.set(decoded_bytes=reader.decoder.decoded_bytes)
+    print(f"Received report request: {reader.describe()}")
+    return received_data
+
+
+async def serve_report(request, labels: dict):
+    try:
+        report_request = parse_report_request(await read_report_body(request))
+    except HTTPException as e:
+        print(f"ERROR: {e.description}")
+        return error_response(e.description, e.code)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return error_response(str(e), 400)
+    labels["report_type"], labels["format"] = report_request["report_type"], report_request["report_format"]
+
+    etag = artifact_key(
+        report_request["meeting_data"],
+        report_request["report_type"],
+        report_request["report_format"],
+        report_request["interval_minutes"],
+    )
+    try:
+        if ARTIFACT_CACHE_ENABLED:
+            if etag in parse_etags(request.headers.get("if-none-match")):
+                record_cache_lookup("artifact", hit=True)
+                print("Client already has this report (304).")
+                return Response(status_code=304, headers={"ETag": f'"{etag}"'})
+
+            with span("artifact_get") as current:
+                cached = await run_blocking(open_artifact, etag)
+                current.set(hit=cached is not None)
+            record_cache_lookup("artifact", hit=cached is not None)
+            if cached is not None:
+                print("Serving report from the artifact cache.")
+                report_file, metadata = cached
+                return stream_response(
+                    report_file, metadata["size"], metadata["download_name"], metadata["mimetype"], etag
+                )
+
+            result = await run_blocking(generate_cached_report, etag, report_request)
+            if result is None:
+                print("ERROR: Report generation returned None")
+                return error_response("Report generation failed on the server.", 500)
+            buffer, size, download_name = result
+            return stream_response(buffer, size, download_name, REPORT_MIMETYPES[report_request["report_format"]], etag)
+
+        print("Starting report generation...")
+        result = await run_blocking(
+            generate_report_stream,
+            report_request["meeting_data"],
+            report_request["report_type"],
+            report_request["report_format"],
+            report_request["interval_minutes"],
+        )
+        if result is None:
+            print("ERROR: Report generation returned None")
+            return error_response("Report generation failed on the server.", 500)
+        buffer, size, download_name = result
+        print(f"Report generated successfully: {download_name} ({size} bytes)")
+        return stream_response(buffer, size, download_name, REPORT_MIMETYPES[report_request["report_format"]])
+
+    except SummarizationError as e:
+        print(f"ERROR (Summarization): {str(e)}")
+        return summarization_error_response(e)
+    except ValueError as e:
+        print(f"ERROR (ValueError): {str(e)}")
+        return error_response(str(e), 400)
+    except Exception as e:
+        print(f"ERROR (Unexpected): {str(e)}")
+        print(traceback.format_exc())
+        return error_response("An internal server error occurred.", 500)
+
+
+async def report(request):
+    """Async twin of the Flask /report route."""
+    print("\n--- NEW REPORT REQUEST ---")
+    started = time.perf_counter()
+    token = start_trace(f"{request.method} {request.url.path}")
+    labels = {}
+    try:
+        response = await serve_report(request, labels)
+    finally:
+        trace = finish_trace(token)
+    response.headers["Server-Timing"] = trace.server_timing()
+
+    if labels:
+        # Same labels as the Flask route, so dashboards do not care which server ran
+        REPORT_REQUEST_SECONDS.labels("get_report", labels["report_type"], labels["format"]).observe(
+            time.perf_counter() - started
+        )
+        REPORT_REQUESTS_TOTAL.labels("get_report", labels["report_type"], labels["format"], response.status_code).inc()
+    return response
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global _build_executor
+    _build_executor = ThreadPoolExecutor(max_workers=REPORT_BUILD_THREADS, thread_name_prefix="report")
+    summary_llm.use_event_loop(asyncio.get_running_loop())
+    start_warmup()
+    start_workers()
+    try:
+        yield
+    finally:
+        summary_llm.use_event_loop(None)
+        _build_executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = Starlette(
+    routes=[
+        Route("/report", report, methods=["POST"]),
+        Mount("/", app=WSGIMiddleware(flask_app, workers=WSGI_THREADS)),
+    ],
+    lifespan=lifespan,
+)
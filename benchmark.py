@@ -0,0 +1,289 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import charts
+import report_generator
+import summary_llm
+from renderers import RENDERERS, render_to_buffer
+from report_generator import (MeetingAnalysis, analyze_speech, build_report,
+                              generate_interval_summaries)
+from sentiment import get_sentiment_engine
+from transcript import Transcript
+
+# ==============================================================================
+# MICRO-BENCHMARKS FOR THE REPORT PIPELINE
+# ==============================================================================
+# Generates seeded English and Vietnamese meetings shaped like SAMPLE_DATA_ENG
+# and SAMPLE_DATA_VN, replaces Gemini with an instant stub, and times the hot
+# paths. Results (median/min seconds and peak traced memory per benchmark)
+# are printed as JSON so runs can be diffed across changes:
+#
+#   python benchmark.py --cases 10x2,1000x5,10000x20 --output before.json
+
+DEFAULT_CASES = "10x2,1000x5,10000x20,100000x200"
+REPORT_TYPES = ["Normal", "SpeakerRanking", "Sentiment", "Interval"]
+
+# ==============================================================================
+# 1. SYNTHETIC MEETINGS
+# ==============================================================================
+
+PHRASES = {
+    "en": {
+        "fillers": ["Okay.", "Yeah.", "Right.", "Sure.", "Thank you.", "Got it."],
+        "openers": ["I think", "So", "Honestly,", "As I said,", "Well,", "To be fair,"],
+        "subjects": ["the release", "the new dashboard", "our extension", "the report export", "the backend", "the API"],
+        "verbs": ["looks", "is", "seems", "feels", "was", "will be"],
+        "opinions": ["really good", "great", "not great", "a bit slow", "terrible", "fine", "excellent", "confusing"],
+        "tails": ["for the users", "this sprint", "after the last fix", "on mobile", "compared to last week", ""],
+        "names": ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie"],
+        "title": "Synthetic-Sync-Meeting",
+    },
+    "vn": {
+        "fillers": ["Vâng.", "Dạ.", "Ừ.", "Được.", "Cảm ơn.", "Ok."],
+        "openers": ["Mình nghĩ", "Thật ra", "Theo mình,", "Như đã nói,", "Vậy thì", "Nói chung"],
+        "subjects": ["bản phát hành", "bảng điều khiển mới", "tiện ích mở rộng", "phần xuất báo cáo", "hệ thống", "API"],
+        "verbs": ["có vẻ", "thì", "đang", "sẽ", "đã", "khá là"],
+        "opinions": ["rất tốt", "tuyệt vời", "không tốt", "hơi chậm", "tệ quá", "ổn", "xuất sắc", "khó hiểu"],
+        "tails": ["cho người dùng", "trong sprint này", "sau bản sửa lỗi", "trên điện thoại", "so với tuần trước", ""],
+        "names": ["Minh", "Lan", "Hùng", "Thảo", "Tuấn", "Hương", "Dũng", "Ngọc"],
+        "title": "Cuộc họp tổng hợp",
+    },
+}
+
+
+def _sentence(rng: random.Random, phrases: dict) -> str:
+    parts = [
+        rng.choice(phrases["openers"]),
+        rng.choice(phrases["subjects"]),
+        rng.choice(phrases["verbs"]),
+        rng.choice(phrases["opinions"]),
+        rng.choice(phrases["tails"]),
+    ]
+    return " ".join(part for part in parts if part) + "."
+
+
+def generate_meeting(utterances: int, speakers: int, language: str = "en", seed: int = 0) -> dict:
+    """
+    Builds a meeting dict with the same keys as SAMPLE_DATA_ENG/SAMPLE_DATA_VN.
+
+    About a third of the utterances are short fillers ("Okay.", "Vâng."), the
+    rest one to three generated sentences; timestamps advance 2-20 s apart.
+    """
+    rng = random.Random(seed)
+    phrases = PHRASES[language]
+    names = [
+        f"{phrases['names'][index % len(phrases['names'])]} {index // len(phrases['names']) + 1}"
+        for index in range(speakers)
+    ]
+
+    start = datetime(2024, 9, 29, 12, 0, 0, tzinfo=timezone.utc)
+    current = start
+    durations = dict.fromkeys(names, 0)
+    transcript = []
+    for _ in range(utterances):
+        name = rng.choice(names)
+        if rng.random() < 0.33:
+            content = rng.choice(phrases["fillers"])
+        else:
+            content = " ".join(_sentence(rng, phrases) for _ in range(rng.randint(1, 3)))
+        step = rng.randint(2, 20)
+        current += timedelta(seconds=step)
+        durations[name] += step
+        transcript.append(
+            {"name": name, "content": content, "timeStamp": current.strftime("%Y-%m-%dT%H:%M:%S.000Z")}
+        )
+
+    return {
+        "meetingTitle": f"{phrases['title']}-{utterances}x{speakers}",
+        "convenor": names[0],
+        "speakers": names,
+        "meetingStartTimeStamp": start.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "meetingEndTimeStamp": (current + timedelta(seconds=5)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "attendees": names,
+        "speakerDuration": durations,
+        "transcriptData": transcript,
+    }
+
+
+# ==============================================================================
+# 2. STUBBED SUMMARIZER
+# ==============================================================================
+
+
+def stub_summary(text_to_summarize: str, instruction: str = "") -> str:
+    """Instant, deterministic stand-in for summarize_with_gemini."""
+    words = text_to_summarize.split()
+    return "Summary: " + " ".join(words[:60])
+
+
+@contextmanager
+def stubbed_summarizer():
+    """Routes every Gemini call made by the report pipeline to stub_summary."""
+    originals = (summary_llm.summarize_with_gemini, report_generator.summarize_structured)
+    summary_llm.summarize_with_gemini = stub_summary
+    report_generator.summarize_structured = lambda *args, **kwargs: None
+    try:
+        yield
+    finally:
+        summary_llm.summarize_with_gemini, report_generator.summarize_structured = originals
+
+
+# ==============================================================================
+# 3. MEASUREMENT
+# ==============================================================================
+
+
+def measure(fn, repeat: int, setup=None) -> dict:
+    """
+    Times `fn` `repeat` times, then runs it once more under tracemalloc.
+
+    `setup` runs before every call (outside the timing), e.g. to clear caches.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "repeat": repeat,
+        "peak_mem_bytes": peak,
+    }
+
+
+def _clear_sentiment_memo():
+    get_sentiment_engine()._memo.clear()
+
+
+def _clear_chart_cache():
+    charts._png_cache.clear()
+
+
+def _clear_document_cache():
+    report_generator._report_cache.clear()
+
+
+def run_case(utterances: int, speakers: int, language: str, args) -> list:
+    meeting = generate_meeting(utterances, speakers, language, seed=args.seed)
+    transcript = Transcript.from_entries(meeting["transcriptData"])
+    case = {"utterances": utterances, "speakers": speakers, "language": language}
+    results = []
+
+    def record(name: str, fn, setup=None, repeat=None, **extra):
+        print(f"  {name}...", file=sys.stderr)
+        result = measure(fn, repeat or args.repeat, setup)
+        results.append({"benchmark": name, **case, **extra, **result})
+
+    record("transcript_parse", lambda: Transcript.from_entries(meeting["transcriptData"]))
+    record("analyze_speech", lambda: analyze_speech(transcript), setup=_clear_sentiment_memo)
+    record("analyze_speech_memoized", lambda: analyze_speech(transcript))
+    record("generate_interval_summaries", lambda: generate_interval_summaries(transcript, args.interval))
+
+    _, counts = analyze_speech(transcript)
+    record("chart_pdf_drawing", lambda: charts.sentiment_pie_drawing(counts))
+    record("chart_docx_png", lambda: charts.sentiment_pie_png(counts), setup=_clear_chart_cache)
+
+    if utterances > args.max_render_utterances:
+        print(f"  skipping rendering above {args.max_render_utterances} utterances", file=sys.stderr)
+        return results
+
+    for report_type in REPORT_TYPES:
+        record(
+            "build_report",
+            lambda: build_report(meeting, report_type, args.interval, MeetingAnalysis(meeting, transcript)),
+            setup=_clear_document_cache,
+            report_type=report_type,
+        )
+        document = build_report(meeting, report_type, args.interval)
+        for format_type in RENDERERS:
+            def render():
+                buffer, _ = render_to_buffer(document, format_type)
+                buffer.close()
+
+            record("render", render, report_type=report_type, format=format_type)
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_cases(value: str) -> list:
+    """Parses "10x2,1000x5" into [(10, 2), (1000, 5)]."""
+    cases = []
+    for case in value.split(","):
+        utterances, speakers = case.lower().split("x")
+        cases.append((int(utterances), int(speakers)))
+    return cases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the report pipeline on synthetic meetings.")
+    parser.add_argument("--cases", default=DEFAULT_CASES, help="utterances x speakers, comma separated")
+    parser.add_argument("--languages", default="en,vn", help="comma separated: en, vn")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--interval", type=int, default=5, help="interval report length in minutes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--max-render-utterances", type=int, default=10000,
+        help="skip building/rendering full reports for larger meetings",
+    )
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = []
+    with stubbed_summarizer():
+        for utterances, speakers in parse_cases(args.cases):
+            for language in args.languages.split(","):
+                print(f"Benchmarking {utterances} utterances, {speakers} speakers ({language})", file=sys.stderr)
+                results.extend(run_case(utterances, speakers, language, args))
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": vars(args),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Wrote {len(results)} results to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import io
+import threading
+from collections import OrderedDict
+
+from report_model import Chart
+
+# ==============================================================================
+# SENTIMENT CHARTS
+# ==============================================================================
+# PDF reports get the pie as native reportlab vector graphics. DOCX needs a
+# bitmap, drawn with matplotlib's object-oriented Agg canvas (no global pyplot
+# state, safe across threads) and cached by the sentiment counts. Both
+# libraries are imported on first use.
+
+SENTIMENT_COLORS = {"Positive": "#4CAF50", "Neutral": "#FFC107", "Negative": "#F44336"}
+FALLBACK_COLORS = ["#2196F3", "#9C27B0", "#607D8B"]
+CHART_FONT = "DejaVuSans"
+PNG_CACHE_SIZE = 256
+PNG_DPI = 150
+
+_png_cache = OrderedDict()
+_png_cache_lock = threading.Lock()
+
+
+def _slices(counts: dict) -> list:
+    """Returns (label, value, color) for every non-empty slice."""
+    slices = []
+    for index, (label, value) in enumerate(counts.items()):
+        if value > 0:
+            color = SENTIMENT_COLORS.get(label, FALLBACK_COLORS[index % len(FALLBACK_COLORS)])
+            slices.append((label, value, color))
+    return slices
+
+
+def sentiment_pie_drawing(counts: dict, width_inches: float = 4):
+    """Builds the sentiment pie as a reportlab Drawing (a PDF flowable)."""
+    from reportlab.graphics.charts.piecharts import Pie
+    from reportlab.graphics.shapes import Drawing, String
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+
+    size = width_inches * inch
+    drawing = Drawing(size, size)
+    slices = _slices(counts)
+    if not slices:
+        drawing.add(String(size / 2, size / 2, "No sentiment data", fontName=CHART_FONT, fontSize=10, textAnchor="middle"))
+        return drawing
+
+    total = sum(value for _, value, _ in slices)
+    pie = Pie()
+    # Leave a margin around the pie for the labels
+    pie.x = pie.y = size * 0.2
+    pie.width = pie.height = size * 0.6
+    pie.data = [value for _, value, _ in slices]
+    pie.labels = [f"{label} {value / total:.1%}" for label, value, _ in slices]
+    pie.startAngle = 140
+    pie.direction = "anticlockwise"
+    pie.slices.strokeColor = colors.white
+    pie.slices.strokeWidth = 1
+    pie.slices.fontName = CHART_FONT
+    pie.slices.fontSize = 8
+    for index, (_, _, color) in enumerate(slices):
+        pie.slices[index].fillColor = colors.HexColor(color)
+    drawing.add(pie)
+    return drawing
+
+
+def _draw_pie_png(slices: tuple, width_inches: float) -> bytes:
+    # Only DOCX rendering pays for importing matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(width_inches, width_inches), dpi=PNG_DPI)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    if slices:
+        axes.pie(
+            [value for _, value, _ in slices],
+            labels=[label for label, _, _ in slices],
+            colors=[color for _, _, color in slices],
+            autopct="%1.1f%%",
+            startangle=140,
+            wedgeprops={"edgecolor": "white"},
+        )
+        axes.axis("equal")
+    else:
+        axes.text(0.5, 0.5, "No sentiment data", ha="center", va="center")
+        axes.axis("off")
+
+    image = io.BytesIO()
+    figure.savefig(image, format="png")
+    return image.getvalue()
+
+
+def sentiment_pie_png(counts: dict, width_inches: float = 4) -> io.BytesIO:
+    """Returns the sentiment pie as an in-memory PNG, drawing each distinct chart once."""
+    slices = tuple(_slices(counts))
+    key = (slices, width_inches)
+    with _png_cache_lock:
+        png = _png_cache.get(key)
+        if png is not None:
+            _png_cache.move_to_end(key)
+    if png is None:
+        png = _draw_pie_png(slices, width_inches)
+        with _png_cache_lock:
+            _png_cache[key] = png
+            while len(_png_cache) > PNG_CACHE_SIZE:
+                _png_cache.popitem(last=False)
+    return io.BytesIO(png)
+
+
+def chart_drawing(chart: Chart):
+    """Vector flowable for a chart block (PDF)."""
+    if chart.kind == "pie":
+        return sentiment_pie_drawing(chart.data, chart.width_inches)
+    raise ValueError(f"Unsupported chart kind: {chart.kind}")
+
+
+def chart_png(chart: Chart) -> io.BytesIO:
+    """PNG image for a chart block (DOCX)."""
+    if chart.kind == "pie":
+        return sentiment_pie_png(chart.data, chart.width_inches)
+    raise ValueError(f"Unsupported chart kind: {chart.kind}")
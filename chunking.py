@@ -0,0 +1,75 @@
+import os
+
+# ==============================================================================
+# TOKEN-AWARE TRANSCRIPT CHUNKING
+# ==============================================================================
+# Long transcripts are split along utterance boundaries so each prompt stays
+# within a fixed token budget (see summary_llm.summarize_sections).
+
+SUMMARY_CHUNK_TOKENS = int(os.environ.get("SUMMARY_CHUNK_TOKENS", "12000"))
+SUMMARY_CHUNK_OVERLAP_TOKENS = int(os.environ.get("SUMMARY_CHUNK_OVERLAP_TOKENS", "200"))
+
+# Gemini averages roughly four characters per token for English and a little
+# less for Vietnamese; a local estimate avoids a count_tokens round trip.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _split_long_line(line: str, chunk_tokens: int) -> list:
+    """Cuts a single utterance that alone exceeds the budget at word boundaries."""
+    max_chars = chunk_tokens * CHARS_PER_TOKEN
+    pieces, current = [], []
+    current_chars = 0
+    for word in line.split():
+        if current and current_chars + len(word) + 1 > max_chars:
+            pieces.append(" ".join(current))
+            current, current_chars = [], 0
+        current.append(word)
+        current_chars += len(word) + 1
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_utterances(
+    lines: list,
+    chunk_tokens: int = SUMMARY_CHUNK_TOKENS,
+    overlap_tokens: int = SUMMARY_CHUNK_OVERLAP_TOKENS,
+    separator: str = " ",
+) -> list:
+    """
+    Packs utterance lines into chunks of at most `chunk_tokens` tokens.
+
+    Each chunk after the first repeats the trailing utterances of the previous
+    one, up to `overlap_tokens`, so context is not lost at the cut.
+
+    Returns:
+        list: Chunk texts; a single (possibly empty) chunk if everything fits.
+    """
+    if not lines:
+        return [""]
+
+    chunks = []
+    current, current_tokens = [], 0
+    for line in lines:
+        for piece in _split_long_line(line, chunk_tokens) if estimate_tokens(line) > chunk_tokens else [line]:
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > chunk_tokens:
+                chunks.append(separator.join(current))
+                # Carry the tail of the finished chunk into the next one
+                carried, carried_tokens = [], 0
+                for previous in reversed(current):
+                    previous_tokens = estimate_tokens(previous)
+                    if carried_tokens + previous_tokens > overlap_tokens or carried_tokens + previous_tokens + piece_tokens > chunk_tokens:
+                        break
+                    carried.insert(0, previous)
+                    carried_tokens += previous_tokens
+                current, current_tokens = carried, carried_tokens
+            current.append(piece)
+            current_tokens += piece_tokens
+
+    chunks.append(separator.join(current))
+    return chunks
@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from google.api_core import exceptions as google_exception
+
+from chunking import estimate_tokens
+
+# ==============================================================================
+# IN-PROCESS FAKE GEMINI MODEL
+# ==============================================================================
+# Selected with SUMMARIZER_BACKEND=fake (see summary_llm). Mimics
+# GenerativeModel.generate_content closely enough for the whole pipeline:
+# latency drawn from a log-normal distribution plus output tokens at a fixed
+# throughput, optional 429/500 injection with the real google exception types
+# (so retries, backoff and the rate limiter behave as in production), and
+# deterministic output sized to the prompt. No API key or network needed.
+
+# Median time to first token and its spread (sigma of the underlying normal)
+FAKE_GEMINI_LATENCY_MEDIAN_SECONDS = float(os.environ.get("FAKE_GEMINI_LATENCY_MEDIAN_SECONDS", "0.6"))
+FAKE_GEMINI_LATENCY_SIGMA = float(os.environ.get("FAKE_GEMINI_LATENCY_SIGMA", "0.4"))
+FAKE_GEMINI_TOKENS_PER_SECOND = float(os.environ.get("FAKE_GEMINI_TOKENS_PER_SECOND", "200"))
+# Fraction of calls answered with 429 ResourceExhausted / 500 InternalServerError
+FAKE_GEMINI_RATE_LIMIT_RATE = float(os.environ.get("FAKE_GEMINI_RATE_LIMIT_RATE", "0"))
+FAKE_GEMINI_SERVER_ERROR_RATE = float(os.environ.get("FAKE_GEMINI_SERVER_ERROR_RATE", "0"))
+FAKE_GEMINI_RETRY_AFTER_SECONDS = float(os.environ.get("FAKE_GEMINI_RETRY_AFTER_SECONDS", "2"))
+# Seeds latency and failure draws; outputs are always derived from the prompt
+FAKE_GEMINI_SEED = os.environ.get("FAKE_GEMINI_SEED")
+
+# Roughly one output token per this many prompt tokens, within [MIN, max_output_tokens]
+PROMPT_TO_OUTPUT_RATIO = 8
+MIN_OUTPUT_TOKENS = 16
+
+_rng = random.Random(FAKE_GEMINI_SEED)
+_rng_lock = threading.Lock()
+
+
+def _draw(fn):
+    with _rng_lock:
+        return fn(_rng)
+
+
+class FakeGenerativeModel:
+    """Drop-in stand-in for genai.GenerativeModel (generate_content and generate_content_async only)."""
+
+    def __init__(self, model_name: str, generation_config: dict = None):
+        self.model_name = model_name
+        self.generation_config = generation_config or {}
+
+    def _respond(self, prompt: str):
+        """Returns (seconds the call takes, response or exception to raise)."""
+        prompt_tokens = estimate_tokens(prompt)
+        max_output_tokens = self.generation_config.get("max_output_tokens", 256)
+        output_tokens = min(max_output_tokens, max(MIN_OUTPUT_TOKENS, prompt_tokens // PROMPT_TO_OUTPUT_RATIO))
+        first_token = _draw(
+            lambda rng: FAKE_GEMINI_LATENCY_MEDIAN_SECONDS * math.exp(FAKE_GEMINI_LATENCY_SIGMA * rng.gauss(0, 1))
+        )
+        failure = _draw(lambda rng: rng.random())
+
+        if failure < FAKE_GEMINI_RATE_LIMIT_RATE:
+            # Quota errors come back quickly, with a retry hint like the real API
+            return first_token / 10, google_exception.ResourceExhausted(
+                f"Resource has been exhausted (e.g. check quota). Please retry in {FAKE_GEMINI_RETRY_AFTER_SECONDS:g}s."
+            )
+        if failure < FAKE_GEMINI_RATE_LIMIT_RATE + FAKE_GEMINI_SERVER_ERROR_RATE:
+            return first_token, google_exception.InternalServerError("An internal error has occurred. Please retry.")
+
+        if self.generation_config.get("response_mime_type") == "application/json":
+            text = json.dumps(
+                fake_structured_output(prompt, self.generation_config.get("response_schema") or {}, output_tokens),
+                ensure_ascii=False,
+            )
+        else:
+            text = fake_text(prompt, output_tokens)
+        response = SimpleNamespace(
+            text=text,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=estimate_tokens(text),
+                total_token_count=prompt_tokens + estimate_tokens(text),
+            ),
+        )
+        return first_token + output_tokens / FAKE_GEMINI_TOKENS_PER_SECOND, response
+
+    def generate_content(self, prompt: str):
+        delay, outcome = self._respond(prompt)
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def generate_content_async(self, prompt: str):
+        delay, outcome = self._respond(prompt)
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _split_prompt(prompt: str) -> tuple[str, str]:
+    """Splits summary_llm's "instruction\\n\\n---\\n\\ntext" prompt."""
+    instruction, _, text = prompt.partition("\n\n---\n\n")
+    return instruction, text or instruction
+
+
+def _prompt_rng(prompt: str) -> random.Random:
+    return random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+
+
+def fake_text(prompt: str, output_tokens: int, rng: random.Random = None) -> str:
+    """Deterministic pseudo-summary built from the prompt's own words (so it keeps its language)."""
+    rng = rng or _prompt_rng(prompt)
+    words = _split_prompt(prompt)[1].split() or ["summary"]
+    target_chars = output_tokens * 4
+    picked, length = [], 0
+    while length < target_chars:
+        word = rng.choice(words)
+        picked.append(word)
+        length += len(word) + 1
+    return "[fake] " + " ".join(picked)
+
+
+def _fake_value(schema: dict, prompt: str, output_tokens: int, rng: random.Random, speakers: list):
+    kind = str(schema.get("type", "string")).lower()
+    if kind == "object":
+        properties = schema.get("properties", {})
+        share = max(MIN_OUTPUT_TOKENS, output_tokens // max(1, len(properties)))
+        return {name: _fake_value(sub, prompt, share, rng, speakers) for name, sub in properties.items()}
+    if kind == "array":
+        items = schema.get("items", {})
+        if "speaker" in items.get("properties", {}) and speakers:
+            share = max(MIN_OUTPUT_TOKENS, output_tokens // len(speakers))
+            entries = []
+            for speaker in speakers:
+                entry = _fake_value(items, prompt, share, rng, speakers)
+                entry["speaker"] = speaker
+                entries.append(entry)
+            return entries
+        return [_fake_value(items, prompt, output_tokens // 2, rng, speakers) for _ in range(2)]
+    if kind in ("integer", "number"):
+        return rng.randint(0, 100)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    return fake_text(prompt, output_tokens, rng)
+
+
+def fake_structured_output(prompt: str, schema: dict, output_tokens: int):
+    """
+    Fills a response schema deterministically. Arrays of objects with a
+    "speaker" field get one entry per "- name" line of the instruction, as
+    the Normal report prompt lists its speakers that way.
+    """
+    instruction, _ = _split_prompt(prompt)
+    speakers = re.findall(r"^- (.+)$", instruction, re.MULTILINE)
+    return _fake_value(schema, prompt, output_tokens, _prompt_rng(prompt), speakers)
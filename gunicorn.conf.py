@@ -0,0 +1,37 @@
+# Gunicorn reads this file automatically from the working directory.
+import os
+import shutil
+
+# Workers write their metrics here so /metrics can aggregate all of them. It
+# must be set before any worker imports prometheus_client.
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.abspath("./cache/prometheus")
+)
+
+
+def on_starting(server):
+    """Clears the metrics left by a previous run."""
+    # Samples left by a previous run would otherwise be merged into this one
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def post_worker_init(worker):
+    """
+    Loads the heavy dependencies in the background once the worker is serving
+    (see warmup.py) and starts the report job workers.
+    """
+    # Warming up in the master instead would delay binding the port on cold starts
+    from report_jobs import start_workers
+    from warmup import start_warmup
+
+    start_warmup()
+    # Jobs queued before a restart must not wait for the next POST /reports
+    start_workers()
+
+
+def child_exit(server, worker):
+    """Drops the live gauges of a worker that exited."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
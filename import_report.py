@@ -0,0 +1,88 @@
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+# ==============================================================================
+# IMPORT-TIME REPORT
+# ==============================================================================
+# Shows what a cold worker pays before it can answer its first request:
+# imports each module in a fresh interpreter under `python -X importtime` and
+# lists the most expensive imports, optionally followed by the warmup steps.
+#
+#   python import_report.py app asgi --top 15
+#   python import_report.py app --warmup --json
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def measure_imports(module: str) -> dict:
+    """Imports `module` in a new interpreter and returns its -X importtime breakdown (seconds)."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr.strip()[-2000:]}")
+
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append(
+                {
+                    "module": name,
+                    "self_s": int(self_us) / 1e6,
+                    "cumulative_s": int(cumulative_us) / 1e6,
+                    "depth": len(indent) // 2,
+                }
+            )
+    own = [entry for entry in imports if entry["module"] == module and entry["depth"] == 0]
+    total = own[-1]["cumulative_s"] if own else sum(entry["cumulative_s"] for entry in imports if entry["depth"] == 0)
+    return {"module": module, "total_s": total, "imports": imports}
+
+
+def measure_warmup() -> list:
+    """Runs the warmup steps in this process (after importing app) and returns their timings."""
+    import app  # noqa: F401
+    from warmup import run_warmup
+
+    return run_warmup()
+
+
+def print_report(report: dict, top: int):
+    print(f"\n{report['module']}: {report['total_s']:.3f}s to import")
+    print(f"  {'cumulative':>10}  {'self':>8}  module")
+    heaviest = sorted(report["imports"], key=lambda entry: entry["cumulative_s"], reverse=True)
+    for entry in heaviest[:top]:
+        print(f"  {entry['cumulative_s']:>9.3f}s  {entry['self_s']:>7.3f}s  {entry['module']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report what importing the server modules costs.")
+    parser.add_argument("modules", nargs="*", default=["app"], help="modules to import (default: app)")
+    parser.add_argument("--top", type=int, default=20, help="how many of the heaviest imports to list")
+    parser.add_argument("--warmup", action="store_true", help="also time the background warmup steps")
+    parser.add_argument("--json", action="store_true", help="print the full breakdown as JSON")
+    args = parser.parse_args(argv)
+
+    reports = [measure_imports(module) for module in args.modules]
+    warmup_steps = measure_warmup() if args.warmup else None
+
+    if args.json:
+        print(json.dumps({"imports": reports, "warmup": warmup_steps}, indent=2))
+        return
+    for report in reports:
+        print_report(report, args.top)
+    if warmup_steps is not None:
+        print("\nwarmup steps:")
+        for step in warmup_steps:
+            suffix = f"  ({step['error']})" if step["error"] else ""
+            print(f"  {step['seconds']:>9.3f}s  {step['name']}{suffix}")
+
+
+if __name__ == "__main__":
+    main()
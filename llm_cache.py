@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import record_cache_lookup
+from process_state import lazy_singleton, thread_connection
+
+# ==============================================================================
+# TWO-TIER CONTENT-ADDRESSED CACHE FOR LLM RESPONSES
+# ==============================================================================
+# Tier 1 is an in-process LRU; tier 2 is a SQLite file shared by every gunicorn
+# worker on the host and kept across restarts. Entries are addressed by a hash
+# of (model name, generation config, instruction, normalized input text).
+
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "./cache/llm_cache.sqlite3")
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_ENTRIES = int(os.environ.get("LLM_CACHE_MEMORY_ENTRIES", "512"))
+LLM_CACHE_DISK_MAX_BYTES = int(os.environ.get("LLM_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") != "0"
+
+LLM_CACHE_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS llm_cache ("
+    " key TEXT PRIMARY KEY,"
+    " value TEXT NOT NULL,"
+    " size INTEGER NOT NULL,"
+    " expires_at REAL NOT NULL,"
+    " last_access REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS llm_cache_access ON llm_cache (last_access)",
+)
+
+
+def normalize_text(text: str) -> str:
+    """Collapses whitespace so cosmetic differences map to the same entry."""
+    return " ".join(text.split())
+
+
+def make_cache_key(model_name: str, generation_config: dict, instruction: str, text: str) -> str:
+    """Builds the content address for one summarization call."""
+    text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    material = json.dumps(
+        {
+            "model": model_name,
+            "config": generation_config,
+            "instruction": normalize_text(instruction),
+            "text": text_hash,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """In-process LRU in front of a shared SQLite store, both with TTL eviction."""
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        disk_max_bytes: int = LLM_CACHE_DISK_MAX_BYTES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        # Creates the file and schema up front rather than on the first lookup
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Returns this thread's connection to the disk tier."""
+        return thread_connection(
+            self._local,
+            self.path,
+            schema=LLM_CACHE_SCHEMA,
+            pragmas=("journal_mode=WAL", "synchronous=NORMAL"),
+            timeout=10,
+        )
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, key: str):
+        """Returns the cached value, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    record_cache_lookup("llm", hit=True)
+                    return value
+                del self._memory[key]
+
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] > now:
+                with conn:
+                    conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                self._remember(key, row[0], row[1])
+                self._count("disk_hits")
+                record_cache_lookup("llm", hit=True)
+                return row[0]
+        except sqlite3.Error as e:
+            print(f"LLM cache read failed: {e}")
+
+        self._count("misses")
+        record_cache_lookup("llm", hit=False)
+        return None
+
+    def set(self, key: str, value: str):
+        """Stores a value in both tiers and evicts whatever no longer fits."""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        self._remember(key, value, expires_at)
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, size, expires_at, last_access)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value.encode("utf-8")), expires_at, now),
+                )
+            self._count("stores")
+            self._evict_disk(conn, now)
+        except sqlite3.Error as e:
+            print(f"LLM cache write failed: {e}")
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def _evict_disk(self, conn: sqlite3.Connection, now: float):
+        """Drops expired rows, then least recently used rows over the size budget."""
+        with conn:
+            expired = conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,)).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            overflow = total - self.disk_max_bytes
+            removed = 0
+            if overflow > 0:
+                for key, size in conn.execute(
+                    "SELECT key, size FROM llm_cache ORDER BY last_access"
+                ).fetchall():
+                    if overflow <= 0:
+                        break
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    overflow -= size
+                    removed += 1
+        with self._lock:
+            self.stats["evictions"] += expired + removed
+
+    def snapshot(self) -> dict:
+        """Returns the hit/miss counters plus the derived hit ratio."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+@lazy_singleton
+def _shared_cache() -> LLMCache:
+    return LLMCache()
+
+
+def get_llm_cache():
+    """Returns the process-wide cache, or None when caching is disabled."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    return _shared_cache()
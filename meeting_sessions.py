@@ -0,0 +1,393 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from process_state import lazy_singleton, thread_connection
+from report_generator import (INTERVAL_SUMMARY_INSTRUCTION, interval_lines,
+                              interval_text_key, validate_interval_minutes)
+from summary_llm import SummarizationError, summarize_sections
+from tracing import propagate
+from transcript import Transcript, epoch_to_datetime, parse_timestamp
+
+# ==============================================================================
+# LIVE MEETING SESSIONS
+# ==============================================================================
+# The extension can stream caption chunks while the meeting is running. Each
+# interval window is summarized as soon as it closes (once captions more than
+# MEETING_WINDOW_GRACE_SECONDS past its end arrive), so when the meeting ends
+# the Interval report only waits for the last window. Sessions live in SQLite
+# so every gunicorn worker sees the same state; a window is claimed by exactly
+# one worker. Stored summaries are addressed by their interval's exact text
+# (report_generator.interval_text_key), so any window whose captions changed
+# afterwards is simply summarized again at report time.
+
+MEETING_SESSIONS_DB = os.environ.get("MEETING_SESSIONS_DB", "./cache/meeting_sessions.sqlite3")
+# Captions can arrive a little late; a window closes this long after its end
+MEETING_WINDOW_GRACE_SECONDS = int(os.environ.get("MEETING_WINDOW_GRACE_SECONDS", "15"))
+# How long a final report waits for windows still being summarized elsewhere
+MEETING_PENDING_WAIT_SECONDS = float(os.environ.get("MEETING_PENDING_WAIT_SECONDS", "30"))
+# A window pending for longer than this was lost with its worker: reports no
+# longer wait for it, and the next transcript chunk or end claims it again
+MEETING_PENDING_STALE_SECONDS = float(os.environ.get("MEETING_PENDING_STALE_SECONDS", "300"))
+# Threads that wait on window summaries; the Gemini calls themselves share
+# the LLM pool, so this only bounds how many claim batches are in flight
+MEETING_SUMMARY_THREADS = int(os.environ.get("MEETING_SUMMARY_THREADS", "4"))
+REQUIRED_SESSION_KEYS = ["meetingTitle", "convenor"]
+
+_local = threading.local()
+
+
+class SessionStateError(Exception):
+    """Raised when a session cannot accept the operation (e.g. it has ended)."""
+
+
+MEETING_SESSIONS_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meeting_sessions ("
+    " id TEXT PRIMARY KEY,"
+    " status TEXT NOT NULL,"
+    " meta TEXT NOT NULL,"
+    " interval_minutes REAL NOT NULL,"
+    " origin INTEGER,"
+    " latest INTEGER,"
+    " created_at REAL NOT NULL,"
+    " updated_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS session_entries ("
+    " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " session_id TEXT NOT NULL,"
+    " ts INTEGER NOT NULL,"
+    " entry TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS session_entries_ts ON session_entries (session_id, ts)",
+    "CREATE TABLE IF NOT EXISTS session_chunks ("
+    " session_id TEXT NOT NULL,"
+    " chunk_id TEXT NOT NULL,"
+    " PRIMARY KEY (session_id, chunk_id))",
+    "CREATE TABLE IF NOT EXISTS session_intervals ("
+    " session_id TEXT NOT NULL,"
+    " window_index INTEGER NOT NULL,"
+    " label TEXT NOT NULL,"
+    " text_key TEXT NOT NULL,"
+    " status TEXT NOT NULL,"
+    " summary TEXT,"
+    " error TEXT,"
+    " updated_at REAL NOT NULL,"
+    " PRIMARY KEY (session_id, window_index))",
+)
+
+
+def _connect() -> sqlite3.Connection:
+    """Returns this thread's connection to the session database."""
+    return thread_connection(
+        _local,
+        MEETING_SESSIONS_DB,
+        schema=MEETING_SESSIONS_SCHEMA,
+        row_factory=sqlite3.Row,
+        timeout=30,
+        isolation_level=None,
+    )
+
+
+def _interval_minutes(session):
+    """The session's interval length; whole minutes come back from the REAL column as floats."""
+    minutes = session["interval_minutes"]
+    return int(minutes) if float(minutes).is_integer() else minutes
+
+
+def _interval_seconds(session) -> int:
+    return max(1, int(session["interval_minutes"] * 60))
+
+
+def _window_label(session, window_index: int) -> str:
+    interval_seconds = _interval_seconds(session)
+    start = epoch_to_datetime(session["origin"] + window_index * interval_seconds)
+    end = epoch_to_datetime(session["origin"] + (window_index + 1) * interval_seconds)
+    return f"{start.strftime('%I:%M %p')} - {end.strftime('%I:%M %p')}"
+
+
+def _validate_entries(entries) -> list:
+    """Returns [(epoch seconds, entry)] or raises ValueError with a client-facing message."""
+    if not isinstance(entries, list):
+        raise ValueError("transcriptData must be a list")
+    parsed = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not all(isinstance(entry.get(key), str) for key in ("name", "content", "timeStamp")):
+            raise ValueError("Each transcriptData entry needs string name, content and timeStamp fields")
+        try:
+            epoch = int(parse_timestamp(entry["timeStamp"]).timestamp())
+        except ValueError:
+            raise ValueError(f"Invalid timeStamp: {entry['timeStamp']!r}")
+        parsed.append((epoch, {"name": entry["name"], "content": entry["content"], "timeStamp": entry["timeStamp"]}))
+    return parsed
+
+
+def create_session(meta: dict, interval_minutes=5) -> dict:
+    """Opens a live session for a meeting; `meta` holds the meeting_data fields known so far."""
+    missing = [key for key in REQUIRED_SESSION_KEYS if not (meta or {}).get(key)]
+    if missing:
+        raise ValueError(f"Missing required keys in meeting_data: {', '.join(missing)}")
+    validate_interval_minutes(interval_minutes)
+
+    meta = {key: value for key, value in meta.items() if key != "transcriptData"}
+    session_id = uuid.uuid4().hex
+    now = time.time()
+    _connect().execute(
+        "INSERT INTO meeting_sessions (id, status, meta, interval_minutes, created_at, updated_at)"
+        " VALUES (?, 'live', ?, ?, ?, ?)",
+        (session_id, json.dumps(meta, ensure_ascii=False), interval_minutes, now, now),
+    )
+    return get_session(session_id)
+
+
+def get_session(session_id: str):
+    """Returns the session's status and interval progress, or None if it does not exist."""
+    conn = _connect()
+    session = conn.execute("SELECT * FROM meeting_sessions WHERE id = ?", (session_id,)).fetchone()
+    if session is None:
+        return None
+    utterances = conn.execute(
+        "SELECT COUNT(*) FROM session_entries WHERE session_id = ?", (session_id,)
+    ).fetchone()[0]
+    intervals = conn.execute(
+        "SELECT window_index, label, status FROM session_intervals WHERE session_id = ? ORDER BY window_index",
+        (session_id,),
+    ).fetchall()
+    return {
+        "session_id": session_id,
+        "status": session["status"],
+        "interval_minutes": _interval_minutes(session),
+        "utterances": utterances,
+        "intervals": [{"label": row["label"], "status": row["status"]} for row in intervals],
+    }
+
+
+def append_entries(session_id: str, entries, chunk_id: str = None) -> dict:
+    """
+    Stores a chunk of transcriptData and starts summarizing any window it closed.
+
+    A repeated `chunk_id` (a client retry) is acknowledged without storing
+    the entries again.
+
+    Raises:
+        ValueError: If the entries are malformed.
+        KeyError: If the session does not exist.
+        SessionStateError: If the session has already ended.
+    """
+    parsed = _validate_entries(entries)
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        session = conn.execute("SELECT * FROM meeting_sessions WHERE id = ?", (session_id,)).fetchone()
+        if session is None:
+            raise KeyError(session_id)
+        if session["status"] != "live":
+            raise SessionStateError("This meeting session has already ended")
+        if chunk_id is not None:
+            try:
+                conn.execute("INSERT INTO session_chunks (session_id, chunk_id) VALUES (?, ?)", (session_id, chunk_id))
+            except sqlite3.IntegrityError:
+                conn.execute("COMMIT")
+                return get_session(session_id)
+
+        conn.executemany(
+            "INSERT INTO session_entries (session_id, ts, entry) VALUES (?, ?, ?)",
+            [(session_id, epoch, json.dumps(entry, ensure_ascii=False)) for epoch, entry in parsed],
+        )
+        if parsed:
+            epochs = [epoch for epoch, _ in parsed]
+            origin, latest = session["origin"], session["latest"]
+            if origin is None or min(epochs) < origin:
+                # Windows are aligned to the earliest caption, as in the Interval report
+                origin = min(epochs)
+                conn.execute("DELETE FROM session_intervals WHERE session_id = ?", (session_id,))
+            else:
+                # Late captions reopen the windows they belong to
+                interval_seconds = _interval_seconds(session)
+                reopened = {(epoch - origin) // interval_seconds for epoch in epochs}
+                conn.executemany(
+                    "DELETE FROM session_intervals WHERE session_id = ? AND window_index = ?",
+                    [(session_id, window_index) for window_index in reopened],
+                )
+            latest = max([latest or origin] + epochs)
+            conn.execute(
+                "UPDATE meeting_sessions SET origin = ?, latest = ?, updated_at = ? WHERE id = ?",
+                (origin, latest, time.time(), session_id),
+            )
+        claimed = _claim_closed_windows(conn, session_id, final=False)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+    _summarize_windows(session_id, claimed)
+    return get_session(session_id)
+
+
+def end_session(session_id: str, meta_updates: dict = None) -> dict:
+    """Marks the meeting finished, merges final meeting_data fields and summarizes the last windows."""
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        session = conn.execute("SELECT * FROM meeting_sessions WHERE id = ?", (session_id,)).fetchone()
+        if session is None:
+            raise KeyError(session_id)
+        meta = json.loads(session["meta"])
+        meta.update({key: value for key, value in (meta_updates or {}).items() if key != "transcriptData"})
+        conn.execute(
+            "UPDATE meeting_sessions SET status = 'ended', meta = ?, updated_at = ? WHERE id = ?",
+            (json.dumps(meta, ensure_ascii=False), time.time(), session_id),
+        )
+        claimed = _claim_closed_windows(conn, session_id, final=True)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+    _summarize_windows(session_id, claimed)
+    return get_session(session_id)
+
+
+def _claim_closed_windows(conn, session_id: str, final: bool) -> list:
+    """
+    Claims every closed, unclaimed window inside the caller's transaction.
+
+    Returns:
+        list: (window_index, text_key, lines) for the windows this caller must summarize.
+    """
+    session = conn.execute("SELECT * FROM meeting_sessions WHERE id = ?", (session_id,)).fetchone()
+    if session["origin"] is None:
+        return []
+    origin, interval_seconds = session["origin"], _interval_seconds(session)
+    conn.execute(
+        "DELETE FROM session_intervals WHERE session_id = ? AND status = 'pending' AND updated_at < ?",
+        (session_id, time.time() - MEETING_PENDING_STALE_SECONDS),
+    )
+    # Windows ending at or before the cutoff are complete
+    cutoff = None if final else session["latest"] - MEETING_WINDOW_GRACE_SECONDS
+    query = (
+        "SELECT DISTINCT (ts - ?) / ? AS window_index FROM session_entries"
+        " WHERE session_id = ? AND window_index NOT IN"
+        " (SELECT window_index FROM session_intervals WHERE session_id = ?)"
+    )
+    windows = [
+        row["window_index"]
+        for row in conn.execute(query, (origin, interval_seconds, session_id, session_id))
+        if cutoff is None or origin + (row["window_index"] + 1) * interval_seconds <= cutoff
+    ]
+
+    claimed = []
+    for window_index in sorted(windows):
+        start = origin + window_index * interval_seconds
+        entries = [
+            json.loads(row["entry"])
+            for row in conn.execute(
+                "SELECT entry FROM session_entries WHERE session_id = ? AND ts >= ? AND ts < ? ORDER BY seq",
+                (session_id, start, start + interval_seconds),
+            )
+        ]
+        transcript = Transcript.from_entries(entries)
+        lines = interval_lines(transcript, transcript.time_ordered_indices())
+        text_key = interval_text_key(lines)
+        conn.execute(
+            "INSERT INTO session_intervals (session_id, window_index, label, text_key, status, updated_at)"
+            " VALUES (?, ?, ?, ?, 'pending', ?)",
+            (session_id, window_index, _window_label(session, window_index), text_key, time.time()),
+        )
+        claimed.append((window_index, text_key, lines))
+    return claimed
+
+
+@lazy_singleton
+def _get_window_executor() -> ThreadPoolExecutor:
+    """Threads that summarize claimed windows, created lazily (never inherited across fork)."""
+    return ThreadPoolExecutor(max_workers=MEETING_SUMMARY_THREADS, thread_name_prefix="session-windows")
+
+
+def _summarize_windows(session_id: str, claimed: list):
+    """Summarizes claimed windows in the background without blocking the request."""
+    if claimed:
+        _get_window_executor().submit(propagate(_summarize_and_store), session_id, claimed)
+
+
+def _summarize_and_store(session_id: str, claimed: list):
+    """Summarizes the windows like any other section (map-reducing long ones) and stores the results."""
+    try:
+        summaries = summarize_sections(
+            [(lines, INTERVAL_SUMMARY_INSTRUCTION) for _, _, lines in claimed], return_exceptions=True
+        )
+    except Exception as e:
+        summaries = [SummarizationError(f"Unexpected summarization error: {e}")] * len(claimed)
+    for (window_index, text_key, _), summary in zip(claimed, summaries):
+        _store_window_summary(session_id, window_index, text_key, summary)
+
+
+def _store_window_summary(session_id: str, window_index: int, text_key: str, summary):
+    if isinstance(summary, SummarizationError):
+        summary, status, error = None, "failed", str(summary)
+        print(f"Session {session_id}: interval {window_index} could not be summarized: {error}")
+    else:
+        status, error = "done", None
+    try:
+        # A window reopened by late captions carries a new text_key; drop the stale result
+        _connect().execute(
+            "UPDATE session_intervals SET status = ?, summary = ?, error = ?, updated_at = ?"
+            " WHERE session_id = ? AND window_index = ? AND text_key = ?",
+            (status, summary, error, time.time(), session_id, window_index, text_key),
+        )
+    except sqlite3.Error as e:
+        print(f"Session {session_id}: could not store interval {window_index}: {e}")
+
+
+def known_interval_summaries(session_id: str, wait_seconds: float = MEETING_PENDING_WAIT_SECONDS) -> dict:
+    """
+    Returns {interval_text_key: summary} for the session's finished windows,
+    waiting up to `wait_seconds` for windows still being summarized (but not
+    for stale ones, see MEETING_PENDING_STALE_SECONDS).
+    """
+    conn = _connect()
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        pending = conn.execute(
+            "SELECT COUNT(*) FROM session_intervals WHERE session_id = ? AND status = 'pending' AND updated_at >= ?",
+            (session_id, time.time() - MEETING_PENDING_STALE_SECONDS),
+        ).fetchone()[0]
+        if not pending or time.monotonic() >= deadline:
+            break
+        time.sleep(0.2)
+    return {
+        row["text_key"]: row["summary"]
+        for row in conn.execute(
+            "SELECT text_key, summary FROM session_intervals WHERE session_id = ? AND status = 'done'", (session_id,)
+        )
+    }
+
+
+def session_meeting_data(session_id: str):
+    """
+    Assembles the session into the meeting_data shape /report accepts, or None.
+
+    Fields the client never sent are derived from the captions where possible.
+    """
+    conn = _connect()
+    session = conn.execute("SELECT * FROM meeting_sessions WHERE id = ?", (session_id,)).fetchone()
+    if session is None:
+        return None
+    transcript_data = [
+        json.loads(row["entry"])
+        for row in conn.execute("SELECT entry FROM session_entries WHERE session_id = ? ORDER BY seq", (session_id,))
+    ]
+    speakers = list(dict.fromkeys(entry["name"] for entry in transcript_data))
+    meeting_data = {
+        "speakers": speakers,
+        "attendees": speakers,
+        "speakerDuration": {},
+        **json.loads(session["meta"]),
+        "transcriptData": transcript_data,
+    }
+    if transcript_data:
+        by_time = sorted(transcript_data, key=lambda entry: parse_timestamp(entry["timeStamp"]))
+        meeting_data.setdefault("meetingStartTimeStamp", by_time[0]["timeStamp"])
+        meeting_data.setdefault("meetingEndTimeStamp", by_time[-1]["timeStamp"])
+    return meeting_data
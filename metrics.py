@@ -0,0 +1,98 @@
+import os
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry,
+                               Counter, Gauge, Histogram, generate_latest,
+                               multiprocess)
+
+# ==============================================================================
+# PROMETHEUS METRICS
+# ==============================================================================
+# Under gunicorn, gunicorn.conf.py points PROMETHEUS_MULTIPROC_DIR at a shared
+# directory before any worker starts. Every worker then writes its samples to
+# files there and /metrics merges them, so counters add up across processes.
+# Cache hit ratios are derived at query time, e.g.
+#   sum(rate(cache_lookups_total{result="hit"}[5m])) / sum(rate(cache_lookups_total[5m]))
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+FAST_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+REPORT_REQUEST_SECONDS = Histogram(
+    "report_request_seconds",
+    "Time to produce a report response, by endpoint, report type and format.",
+    ["endpoint", "report_type", "format"],
+    buckets=LATENCY_BUCKETS,
+)
+REPORT_REQUESTS_TOTAL = Counter(
+    "report_requests",
+    "Report requests by endpoint, report type, format and HTTP status.",
+    ["endpoint", "report_type", "format", "status"],
+)
+GEMINI_CALL_SECONDS = Histogram(
+    "gemini_call_seconds",
+    "Latency of individual Gemini generate_content calls (each retry counts).",
+    ["outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+GEMINI_ERRORS_TOTAL = Counter(
+    "gemini_errors",
+    "Failed Gemini calls by exception class.",
+    ["error"],
+)
+GEMINI_TOKENS_TOTAL = Counter(
+    "gemini_tokens",
+    "Gemini tokens by kind (prompt or output), as reported by the API.",
+    ["kind"],
+)
+LLM_INFLIGHT_CALLS = Gauge(
+    "llm_inflight_calls",
+    "Gemini calls currently waiting for a response.",
+    multiprocess_mode="livesum",
+)
+SENTIMENT_SECONDS = Histogram(
+    "sentiment_seconds",
+    "Time to score the sentiment of one transcript.",
+    buckets=FAST_BUCKETS,
+)
+RENDER_SECONDS = Histogram(
+    "render_seconds",
+    "Time to lay out one report document, by format.",
+    ["format"],
+    buckets=FAST_BUCKETS,
+)
+CACHE_LOOKUPS_TOTAL = Counter(
+    "cache_lookups",
+    "Cache lookups by cache (llm, document, artifact) and result (hit or miss).",
+    ["cache", "result"],
+)
+REPORT_JOB_QUEUE_DEPTH = Gauge(
+    "report_job_queue_depth",
+    "Report jobs waiting for a worker, sampled at scrape time.",
+    multiprocess_mode="mostrecent",
+)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS_TOTAL.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_gemini_usage(response, estimated_prompt_tokens: int):
+    """
+    Counts the tokens of one successful call, estimating the prompt if the
+    API did not say. Returns (prompt tokens, output tokens).
+    """
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", 0) or estimated_prompt_tokens
+    output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+    GEMINI_TOKENS_TOTAL.labels(kind="prompt").inc(prompt_tokens)
+    GEMINI_TOKENS_TOTAL.labels(kind="output").inc(output_tokens)
+    return prompt_tokens, output_tokens
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Returns (exposition body, content type) for the /metrics endpoint."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,56 @@
+import functools
+import os
+import sqlite3
+import threading
+
+# ==============================================================================
+# PER-PROCESS AND PER-THREAD RESOURCES
+# ==============================================================================
+# Pools, clients and connections are created lazily on first use, so a gunicorn
+# worker never inherits them from the master across fork.
+
+
+def lazy_singleton(factory):
+    """Decorator turning `factory` into a getter that builds its result once per process."""
+    lock = threading.Lock()
+    instance = None
+
+    @functools.wraps(factory)
+    def get():
+        nonlocal instance
+        if instance is None:
+            with lock:
+                if instance is None:
+                    instance = factory()
+        return instance
+
+    return get
+
+
+def thread_connection(
+    local: threading.local,
+    path: str,
+    schema=(),
+    pragmas=("journal_mode=WAL",),
+    row_factory=None,
+    **connect_kwargs,
+) -> sqlite3.Connection:
+    """Returns this thread's connection to `path` (SQLite connections are not shareable).
+
+    The first call on a thread creates the parent directory, opens the file,
+    applies the pragmas and runs the (idempotent) schema statements.
+    """
+    conn = getattr(local, "conn", None)
+    if conn is None:
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, **connect_kwargs)
+        if row_factory is not None:
+            conn.row_factory = row_factory
+        for pragma in pragmas:
+            conn.execute(f"PRAGMA {pragma}")
+        for statement in schema:
+            conn.execute(statement)
+        local.conn = conn
+    return conn
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import threading
+import time
+
+from process_state import lazy_singleton
+
+# ==============================================================================
+# QUOTA-AWARE RATE LIMITER FOR GEMINI CALLS
+# ==============================================================================
+# Two token buckets (requests per minute and tokens per minute) shared by all
+# threads of a process. The project quota is split evenly across gunicorn
+# workers via WEB_CONCURRENCY, so together they stay just under the quota.
+# The defaults are the free-tier limits of gemini-2.0-flash; deployments set
+# their project's quota (see render.yaml), or every worker throttles to a
+# fraction of 15 requests per minute.
+
+GEMINI_RPM = int(os.environ.get("GEMINI_RPM", "15"))
+GEMINI_TPM = int(os.environ.get("GEMINI_TPM", "1000000"))
+WORKER_PROCESSES = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+
+
+class TokenBucket:
+    """A bucket refilled continuously; reservations may run it negative to queue callers."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Takes `amount` tokens and returns how long the caller must wait for them."""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # a single oversized call must still be able to run
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.refill_per_second
+
+    def drain(self, now: float):
+        """Empties the bucket, e.g. after the server reported the quota exhausted."""
+        self._refill(now)
+        self.tokens = min(self.tokens, 0)
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute: int = GEMINI_RPM, tokens_per_minute: int = GEMINI_TPM, processes: int = WORKER_PROCESSES):
+        rpm = max(1.0, requests_per_minute / processes)
+        tpm = max(1.0, tokens_per_minute / processes)
+        self.requests = TokenBucket(rpm, rpm / 60)
+        self.tokens = TokenBucket(tpm, tpm / 60)
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, estimated_tokens: int) -> float:
+        """Books one request of `estimated_tokens` and returns how long to wait before sending it."""
+        with self._lock:
+            now = time.monotonic()
+            return max(
+                self.requests.reserve(1, now),
+                self.tokens.reserve(estimated_tokens, now),
+                self.paused_until - now,
+            )
+
+    def acquire(self, estimated_tokens: int):
+        """Blocks until one request of `estimated_tokens` fits in both budgets."""
+        wait = self.reserve(estimated_tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, estimated_tokens: int):
+        """Like acquire, but waits without blocking the event loop."""
+        wait = self.reserve(estimated_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Holds back every caller for `seconds`, honouring a server retry hint."""
+        with self._lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.requests.drain(now)
+
+
+@lazy_singleton
+def get_rate_limiter() -> RateLimiter:
+    return RateLimiter()
@@ -0,0 +1,236 @@
+import copy
+import io
+import os
+import threading
+from tempfile import SpooledTemporaryFile
+from xml.sax.saxutils import escape
+
+from charts import chart_drawing, chart_png
+from metrics import RENDER_SECONDS
+from process_state import lazy_singleton
+from report_model import (Chart, Fields, Heading, Paragraph, ReportDocument,
+                          Spacer, Table)
+from tracing import span
+
+# ==============================================================================
+# 1. SHARED RENDERING HELPERS
+# ==============================================================================
+# reportlab and python-docx are imported by the renderer that needs them, so
+# starting the server (and serving the other format) does not pay for both.
+
+FONT_NAME = "DejaVuSans"
+FONT_PATH = "./fonts/DejaVuSans.ttf"
+
+
+def fix_style():
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    styles = getSampleStyleSheet()
+    for name in styles.byName:
+        styles[name].fontName = FONT_NAME
+    return styles
+
+
+class RenderingContext:
+    """
+    Everything a renderer needs that does not depend on the report.
+
+    One per process; each format's part is built on first use (or up front
+    by warmup.py) and only read afterwards, so threads share it freely.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pdf_styles = None
+        self._docx_template = None
+
+    @property
+    def pdf_styles(self):
+        """The sample stylesheet with the Unicode font registered and applied."""
+        if self._pdf_styles is None:
+            with self._lock:
+                if self._pdf_styles is None:
+                    from reportlab.pdfbase import pdfmetrics
+                    from reportlab.pdfbase.ttfonts import TTFont
+
+                    pdfmetrics.registerFont(TTFont(FONT_NAME, FONT_PATH))
+                    self._pdf_styles = fix_style()
+        return self._pdf_styles
+
+    def new_docx(self):
+        """Returns a fresh, independent copy of the blank DOCX document."""
+        if self._docx_template is None:
+            with self._lock:
+                if self._docx_template is None:
+                    import docx
+
+                    # docx.Document() unzips and parses the default template every time;
+                    # a deep copy of an already parsed one is about twice as fast. The
+                    # template is never used directly: python-docx caches wrappers such
+                    # as the document body on first access, and a deep copy of a cached
+                    # wrapper would point at a detached copy of the XML.
+                    self._docx_template = docx.Document()
+        return copy.deepcopy(self._docx_template)
+
+    def warm(self):
+        """Builds the resources of every format now."""
+        self.pdf_styles
+        self.new_docx()
+
+
+@lazy_singleton
+def get_rendering_context() -> RenderingContext:
+    return RenderingContext()
+
+
+def _output_size(output) -> int:
+    """Size written so far to a render target (path or stream), for tracing."""
+    if isinstance(output, str):
+        return os.path.getsize(output)
+    return output.tell()
+
+
+# ==============================================================================
+# 2. PDF RENDERER
+# ==============================================================================
+
+PDF_PARAGRAPH_STYLES = {"body": "BodyText", "normal": "Normal"}
+
+
+def _pdf_elements(block, styles) -> list:
+    """Converts one document block into reportlab flowables."""
+    from reportlab.lib import colors
+    from reportlab.platypus import Paragraph as PdfParagraph
+    from reportlab.platypus import Spacer as PdfSpacer
+    from reportlab.platypus import Table as PdfTable
+    from reportlab.platypus import TableStyle
+
+    if isinstance(block, Heading):
+        return [PdfParagraph(f"<b>{escape(block.text)}</b>", styles[f"h{block.level}"])]
+    if isinstance(block, Paragraph):
+        text = escape(block.text)
+        if block.bold:
+            text = f"<b>{text}</b>"
+        return [PdfParagraph(text, styles[PDF_PARAGRAPH_STYLES[block.style]])]
+    if isinstance(block, Fields):
+        details = "<br/>".join(
+            f"<b>{escape(label)}:</b> {escape(str(value))}" for label, value in block.items
+        )
+        return [PdfParagraph(details, styles["Normal"])]
+    if isinstance(block, Table):
+        rows = ([block.header] if block.header else []) + block.rows
+        table = PdfTable(
+            [[PdfParagraph(escape(str(cell)), styles["BodyText"]) for cell in row] for row in rows]
+        )
+        table_style = [("GRID", (0, 0), (-1, -1), 0.5, colors.grey)]
+        if block.header:
+            table_style.append(("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey))
+        table.setStyle(TableStyle(table_style))
+        return [table]
+    if isinstance(block, Chart):
+        with span("chart", kind=block.kind, format="PDF"):
+            return [chart_drawing(block)]
+    if isinstance(block, Spacer):
+        return [PdfSpacer(1, block.height)]
+    raise TypeError(f"Unsupported block type: {type(block).__name__}")
+
+
+def render_pdf(document: ReportDocument, output):
+    """Lays out a report document as a PDF into a file path or binary stream."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import Paragraph as PdfParagraph
+    from reportlab.platypus import SimpleDocTemplate
+
+    with RENDER_SECONDS.labels(format="PDF").time(), span("render", format="PDF") as current:
+        styles = get_rendering_context().pdf_styles
+        doc = SimpleDocTemplate(output, pagesize=A4)
+        elements = [PdfParagraph(f"<b>{escape(document.title)}</b>", styles["Title"])]
+
+        for section in document.sections:
+            if section.heading:
+                elements.extend(_pdf_elements(section.heading, styles))
+            for block in section.blocks:
+                elements.extend(_pdf_elements(block, styles))
+
+        doc.build(elements)
+        current.set(output_bytes=_output_size(output))
+    return output
+
+
+# ==============================================================================
+# 3. DOCX RENDERER
+# ==============================================================================
+
+
+def _add_docx_block(doc, block):
+    """Appends one document block to a python-docx document."""
+    from docx.shared import Inches
+
+    if isinstance(block, Heading):
+        doc.add_heading(block.text, level=block.level)
+    elif isinstance(block, Paragraph):
+        paragraph = doc.add_paragraph()
+        paragraph.add_run(block.text).bold = block.bold
+    elif isinstance(block, Fields):
+        for label, value in block.items:
+            doc.add_paragraph(f"{label}: {value}")
+    elif isinstance(block, Table):
+        rows = ([block.header] if block.header else []) + block.rows
+        table = doc.add_table(rows=len(rows), cols=len(rows[0]) if rows else 0)
+        table.style = "Table Grid"
+        for row_cells, row in zip(table.rows, rows):
+            for cell, value in zip(row_cells.cells, row):
+                cell.text = str(value)
+    elif isinstance(block, Chart):
+        with span("chart", kind=block.kind, format="DOCX"):
+            doc.add_picture(chart_png(block), width=Inches(block.width_inches))
+    elif isinstance(block, Spacer):
+        pass  # Word paragraphs already carry their own spacing
+    else:
+        raise TypeError(f"Unsupported block type: {type(block).__name__}")
+
+
+def render_docx(document: ReportDocument, output):
+    """Writes a report document as DOCX into a file path or binary stream."""
+    with RENDER_SECONDS.labels(format="DOCX").time(), span("render", format="DOCX") as current:
+        doc = get_rendering_context().new_docx()
+        doc.add_heading(document.title, level=1)
+
+        for section in document.sections:
+            if section.heading:
+                _add_docx_block(doc, section.heading)
+            for block in section.blocks:
+                _add_docx_block(doc, block)
+
+        doc.save(output)
+        current.set(output_bytes=_output_size(output))
+    return output
+
+
+RENDERERS = {
+    "PDF": (render_pdf, "pdf"),
+    "DOCX": (render_docx, "docx"),
+}
+
+REPORT_MIMETYPES = {
+    "PDF": "application/pdf",
+    "DOCX": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+# Reports up to this size stay in memory; larger ones spill to a temp file.
+REPORT_SPOOL_MAX_BYTES = int(os.environ.get("REPORT_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+
+
+def render_to_buffer(document: ReportDocument, format_type: str) -> tuple[SpooledTemporaryFile, int]:
+    """
+    Renders a report without going through ./reports.
+
+    Returns:
+        tuple: (spooled file rewound to the start, size in bytes).
+    """
+    render, _ = RENDERERS[format_type]
+    buffer = SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_BYTES)
+    render(document, buffer)
+    size = buffer.seek(0, io.SEEK_END)
+    buffer.seek(0)
+    return buffer, size
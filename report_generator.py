@@ -1,128 +1,394 @@
+import hashlib
+import json
 import os
-import re
-from collections import Counter, defaultdict
-from datetime import datetime,timedelta
+import shutil
+import threading
+import zipfile
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from tempfile import SpooledTemporaryFile
 
-import matplotlib
-from nltk import data
 # --- Third-party Libraries ---
-
-matplotlib.use("Agg")  # Use non-GUI backend for plotting
-import docx
-import matplotlib.pyplot as plt
-from docx.shared import Inches
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-# --- Report Generation Libraries ---
-from reportlab.platypus import (Image, Paragraph, SimpleDocTemplate, Spacer,
-                                Table, TableStyle)
 # -----import 3rd class---
-from summary_llm import summarize_with_gemini
-from textblob import TextBlob
-from utils import SAMPLE_DATA_ENG, SAMPLE_DATA_VN
+from renderers import REPORT_SPOOL_MAX_BYTES, RENDERERS, render_to_buffer
+from report_model import (Chart, Fields, Heading, Paragraph, ReportDocument,
+                          Spacer)
+from chunking import SUMMARY_CHUNK_TOKENS, estimate_tokens
+from metrics import SENTIMENT_SECONDS, record_cache_lookup
+from summary_llm import (SummarizationError, structured_output_tokens,
+                         summarize_sections, summarize_structured)
+from tracing import propagate, span
+from transcript import (Transcript, TranscriptDataError, as_transcript,
+                        epoch_to_datetime, parse_timestamp)
+from utils import SAMPLE_DATA_VN
 
 # ==============================================================================
 # 2. REPORT CONTENT GENERATION
 # ==============================================================================
 
 
-def is_meaningful(content: str) -> bool:
-    """Checks if content is substantial enough for analysis."""
-    return len(content.split()) >= 4 and "?" not in content
+def meaningful_lines(transcript: Transcript) -> list:
+    """Returns the meaningful utterances as 'Speaker: content' lines."""
+    transcript = as_transcript(transcript)
+    return [transcript.line(index) for index in transcript.meaningful_indices()]
+
+
+def join_meaningful_transcript(transcript: Transcript) -> str:
+    """Joins the meaningful utterances into one 'Speaker: content' string."""
+    return " ".join(meaningful_lines(transcript))
+
+
+OVERALL_SUMMARY_INSTRUCTION = "Provide a concise executive summary of this meeting transcript.If there use the Vietnamese, please write it in Vietnamese"
+KEY_TAKEAWAYS_INSTRUCTION = "List the key takeaways from this meeting. Use Vietnamese if appropriate, otherwise use English."
+INTERVAL_SUMMARY_INSTRUCTION = "Summarize the following conversation snippet. If Vietnamese is used, please write it in Vietnamese."
+
+
+def speaker_summary_instruction(speaker: str) -> str:
+    return f"Summarize the key points made by {speaker}.If there use the Vietnamese, please write it in Vietnamese"
+
+
+# The top of the summary hierarchy: the executive summary and key takeaways
+# are written from the interval summaries rather than the raw transcript.
+OVERALL_FROM_INTERVALS_INSTRUCTION = (
+    "The following are summaries of consecutive parts of one meeting. "
+    "Provide a concise executive summary of the whole meeting. If Vietnamese is used, please write it in Vietnamese."
+)
+KEY_TAKEAWAYS_FROM_INTERVALS_INSTRUCTION = (
+    "The following are summaries of consecutive parts of one meeting. "
+    "List the key takeaways from the whole meeting. Use Vietnamese if appropriate, otherwise use English."
+)
+
+# "intervals" derives the executive summary and key takeaways from the
+# interval summaries (computed once and shared with the Interval report);
+# "transcript" sends the raw transcript again, which costs far more input
+# tokens on long meetings but lets the model see every detail.
+OVERALL_SUMMARY_SOURCE = os.environ.get("OVERALL_SUMMARY_SOURCE", "intervals")
+SUMMARY_HIERARCHY_INTERVAL_MINUTES = int(os.environ.get("SUMMARY_HIERARCHY_INTERVAL_MINUTES", "5"))
+
 
+def interval_digest(interval_summaries: dict) -> list:
+    """The interval summaries as 'label: summary' lines, the input for the top-level sections."""
+    return [f"{label}: {summary}" for label, summary in interval_summaries.items() if summary]
 
-def generate_overall_summary(transcript_data: list) -> str:
+
+def top_level_sources(transcript: Transcript, interval_summaries: dict = None) -> tuple[list, str, str]:
+    """
+    Returns (lines, executive summary instruction, key takeaways instruction).
+
+    Uses the interval digest when OVERALL_SUMMARY_SOURCE is "intervals" and
+    interval summaries are available, otherwise the meaningful transcript lines.
+    """
+    lines = meaningful_lines(transcript)
+    if OVERALL_SUMMARY_SOURCE == "intervals" and interval_summaries:
+        digest = interval_digest(interval_summaries)
+        if digest:
+            print(
+                f"Deriving the executive summary and key takeaways from {len(digest)} interval summaries "
+                f"(~{estimate_tokens(' '.join(digest))} instead of ~{estimate_tokens(' '.join(lines))} tokens)."
+            )
+            return digest, OVERALL_FROM_INTERVALS_INSTRUCTION, KEY_TAKEAWAYS_FROM_INTERVALS_INSTRUCTION
+    return lines, OVERALL_SUMMARY_INSTRUCTION, KEY_TAKEAWAYS_INSTRUCTION
+
+
+def generate_overall_summary(transcript: Transcript, interval_summaries: dict = None) -> str:
     """Generates a high-level executive summary of the entire meeting."""
-    full_transcript = " ".join(
-        [
-            f"{entry['name']}: {entry['content']}"
-            for entry in transcript_data
-            if is_meaningful(entry["content"])
-        ]
-    )
-    return summarize_with_gemini(
-        full_transcript,
-        "Provide a concise executive summary of this meeting transcript.If there use the Vietnamese, please write it in Vietnamese",
-    )
+    lines, instruction, _ = top_level_sources(transcript, interval_summaries)
+    return summarize_sections([(lines, instruction)])[0]
 
 
-def generate_key_takeaways(transcript_data: list) -> str:
+def generate_key_takeaways(transcript: Transcript, interval_summaries: dict = None) -> str:
     """Generates key takeaways or action items from the meeting."""
-    full_transcript = " ".join(
-        [
-            f"{entry['name']}: {entry['content']}"
-            for entry in transcript_data
-            if is_meaningful(entry["content"])
-        ]
-    )
-    return summarize_with_gemini(
-        full_transcript,
-        "List the key takeaways from this meeting. Use Vietnamese if appropriate, otherwise use English."
-    )
+    lines, _, instruction = top_level_sources(transcript, interval_summaries)
+    return summarize_sections([(lines, instruction)])[0]
 
 
-def generate_speaker_summaries(transcript_data: list, speaker_durations: dict) -> dict:
-    """Generates a summary of each speaker's contributions."""
+def group_speaker_contributions(transcript: Transcript) -> dict:
+    """Collects each speaker's meaningful utterances, in order of first appearance."""
+    transcript = as_transcript(transcript)
     speaker_contributions = defaultdict(list)
-    for entry in transcript_data:
-        if is_meaningful(entry["content"]):
-            speaker_contributions[entry["name"]].append(entry["content"])
+    for index in transcript.meaningful_indices():
+        speaker_contributions[transcript.speaker(index)].append(transcript.content(index))
+    return speaker_contributions
+
+
+def generate_speaker_summaries(transcript: Transcript, speaker_durations: dict) -> dict:
+    """Generates a summary of each speaker's contributions, one concurrent call per speaker."""
+    speaker_contributions = group_speaker_contributions(transcript)
+
+    speakers = list(speaker_contributions)
+    summaries = summarize_sections(
+        [
+            (speaker_contributions[speaker], speaker_summary_instruction(speaker))
+            for speaker in speakers
+        ]
+    )
 
     speaker_summaries = {}
-    for speaker, points in speaker_contributions.items():
-        combined_points = " ".join(points)
-        summary = summarize_with_gemini(
-            combined_points,
-            f"Summarize the key points made by {speaker}.If there use the Vietnamese, please write it in Vietnamese",
-        )
+    for speaker, summary in zip(speakers, summaries):
         speaker_summaries[speaker] = {
             "summary": summary,
             "duration": speaker_durations.get(speaker, 0),
         }
     return speaker_summaries
 
-def generate_interval_summaries(transcript_data: list, interval_minutes: int) -> dict:
-    """Generates summaries for specified time intervals."""
-    if not transcript_data:
-        return {}
-
-    interval_summaries = {}
-    # Use 'timeStamp' instead of 'start_time'
-    start_time = datetime.fromisoformat(transcript_data[0]["timeStamp"].replace("Z", "+00:00"))
-    interval_delta = timedelta(minutes=interval_minutes)
-    current_interval_start = start_time
-    
-    # Also get the meeting end time from the last entry
-    last_entry_time = datetime.fromisoformat(transcript_data[-1]["timeStamp"].replace("Z", "+00:00"))
-
-    while current_interval_start <= last_entry_time:
-        interval_end = current_interval_start + interval_delta
-        interval_transcript = []
-
-        for entry in transcript_data:
-            # Use 'timeStamp' instead of 'start_time'
-            entry_time = datetime.fromisoformat(entry["timeStamp"].replace("Z", "+00:00"))
-            if current_interval_start <= entry_time < interval_end:
-                interval_transcript.append(f"{entry['name']}: {entry['content']}")
-
-        if interval_transcript:
-            full_interval_text = " ".join(interval_transcript)
-            interval_summary = summarize_with_gemini(
-                full_interval_text,
-                "Summarize the following conversation snippet. If Vietnamese is used, please write it in Vietnamese."
-            )
-            time_format = "%I:%M %p"
-            interval_label = f"{current_interval_start.strftime(time_format)} - {interval_end.strftime(time_format)}"
-            interval_summaries[interval_label] = interval_summary
-
-        # Move to the next interval
-        current_interval_start = interval_end
-            
-    return interval_summaries
+
+# "structured" sends the transcript once and asks for every Normal-report
+# section in one JSON response; "sections" issues one prompt per section.
+NORMAL_REPORT_MODE = os.environ.get("NORMAL_REPORT_MODE", "structured")
+# Speakers summarized inside the structured call (the most active ones); the
+# rest get their own per-speaker prompts, so the JSON fits its output budget.
+STRUCTURED_MAX_SPEAKERS = int(os.environ.get("STRUCTURED_MAX_SPEAKERS", "16"))
+
+NORMAL_REPORT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "executive_summary": {"type": "string"},
+        "key_takeaways": {"type": "string"},
+        "speaker_summaries": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "speaker": {"type": "string"},
+                    "summary": {"type": "string"},
+                },
+                "required": ["speaker", "summary"],
+            },
+        },
+    },
+    "required": ["executive_summary", "key_takeaways", "speaker_summaries"],
+}
+
+
+def normal_report_instruction(speakers: list) -> str:
+    speaker_list = "\n".join(f"- {speaker}" for speaker in speakers)
+    return (
+        "You are summarizing a meeting transcript. Fill in every field of the JSON response:\n"
+        f"executive_summary: {OVERALL_SUMMARY_INSTRUCTION}\n"
+        f"key_takeaways: {KEY_TAKEAWAYS_INSTRUCTION}\n"
+        "speaker_summaries: one entry per speaker below, using the exact name as 'speaker' "
+        "and summarizing the key points that speaker made. If Vietnamese is used, write it in Vietnamese.\n"
+        f"Speakers:\n{speaker_list}"
+    )
+
+
+def _structured_text(value) -> str:
+    """Returns a usable section text from the structured response, or ''."""
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _start_in_background(fn, name: str) -> Future:
+    """Runs fn() on its own thread, inside the caller's trace, and returns its future."""
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=propagate(run), name=name, daemon=True).start()
+    return future
+
+
+def generate_normal_sections(
+    transcript: Transcript, speaker_durations: dict, interval_summaries=None
+) -> tuple[str, str, dict]:
+    """
+    Produces the executive summary, key takeaways and speaker summaries.
+
+    In structured mode the transcript is sent once; any field missing from
+    the response (and any speaker past STRUCTURED_MAX_SPEAKERS) is filled in
+    with its own per-section call. Transcripts longer than one chunk skip the
+    structured call and are map-reduced. Quota and transient failures of the
+    structured call are raised rather than retried section by section.
+
+    `interval_summaries` is a callable returning {label: summary}; it is
+    only called when the executive summary or key takeaways need their own
+    prompt, which is then built from those summaries (see top_level_sources).
+    Missing speaker summaries are requested while the interval stage runs.
+    """
+    transcript = as_transcript(transcript)
+    lines = meaningful_lines(transcript)
+    speaker_contributions = group_speaker_contributions(transcript)
+    speakers = list(speaker_contributions)
+
+    overall, takeaways, speaker_texts = "", "", {}
+    asked_structured = False
+    if NORMAL_REPORT_MODE == "structured":
+        full_transcript = " ".join(lines)
+        if estimate_tokens(full_transcript) > SUMMARY_CHUNK_TOKENS:
+            print("Transcript exceeds one chunk; summarizing each section with map-reduce.")
+        else:
+            asked_structured = True
+            structured_speakers = sorted(
+                speakers, key=lambda speaker: len(speaker_contributions[speaker]), reverse=True
+            )[:STRUCTURED_MAX_SPEAKERS]
+            result = summarize_structured(
+                full_transcript,
+                normal_report_instruction(structured_speakers),
+                NORMAL_REPORT_SCHEMA,
+                max_output_tokens=structured_output_tokens(len(structured_speakers)),
+            ) or {}
+            overall = _structured_text(result.get("executive_summary"))
+            takeaways = _structured_text(result.get("key_takeaways"))
+            items = result.get("speaker_summaries")
+            for item in items if isinstance(items, list) else []:
+                if isinstance(item, dict) and item.get("speaker") in structured_speakers:
+                    summary = _structured_text(item.get("summary"))
+                    if summary:
+                        speaker_texts[item["speaker"]] = summary
+
+    # Per-section prompts for whatever is still missing (everything in
+    # "sections" mode, only the gaps in "structured" mode)
+    top_kinds = [kind for kind, text in (("overall", overall), ("takeaways", takeaways)) if not text]
+    missing_speakers = [speaker for speaker in speakers if speaker not in speaker_texts]
+    speaker_sections = [
+        (speaker_contributions[speaker], speaker_summary_instruction(speaker)) for speaker in missing_speakers
+    ]
+    if (top_kinds or missing_speakers) and asked_structured:
+        print(f"Structured response incomplete; falling back for {len(top_kinds) + len(missing_speakers)} section(s).")
+
+    use_intervals = bool(top_kinds) and OVERALL_SUMMARY_SOURCE == "intervals" and interval_summaries is not None
+    background_speakers = None
+    if use_intervals and speaker_sections:
+        # Speaker summaries do not depend on the interval stage, so they run beside it
+        background_speakers = _start_in_background(
+            lambda: summarize_sections(speaker_sections), "speaker-sections"
+        )
+
+    sections = []
+    if top_kinds:
+        known_intervals = None
+        if use_intervals:
+            try:
+                known_intervals = interval_summaries()
+            except (SummarizationError, TranscriptDataError) as e:
+                print(f"Interval summaries unavailable ({e}); summarizing the transcript instead.")
+        top_lines, overall_instruction, takeaways_instruction = top_level_sources(transcript, known_intervals)
+        instructions = {"overall": overall_instruction, "takeaways": takeaways_instruction}
+        sections = [(top_lines, instructions[kind]) for kind in top_kinds]
+    if background_speakers is None:
+        # Nothing has to wait, so every section goes out in one fan-out
+        sections += speaker_sections
+    results = summarize_sections(sections)
+
+    top_results = dict(zip(top_kinds, results))
+    overall = top_results.get("overall", overall)
+    takeaways = top_results.get("takeaways", takeaways)
+    speaker_results = background_speakers.result() if background_speakers is not None else results[len(top_kinds):]
+    speaker_texts.update(zip(missing_speakers, speaker_results))
+
+    speaker_summaries = {
+        speaker: {"summary": speaker_texts[speaker], "duration": speaker_durations.get(speaker, 0)}
+        for speaker in speakers
+    }
+    return overall, takeaways, speaker_summaries
+
+
+# Interval lengths a client may ask for: shorter windows mean one Gemini call
+# per few seconds of meeting, longer ones are a single interval anyway.
+MIN_INTERVAL_MINUTES = 1
+MAX_INTERVAL_MINUTES = 24 * 60
+
+
+def validate_interval_minutes(interval_minutes):
+    """
+    Returns interval_minutes if it is a number of minutes within
+    [MIN_INTERVAL_MINUTES, MAX_INTERVAL_MINUTES].
+
+    Raises:
+        ValueError: Otherwise; the message is client-facing.
+    """
+    if (
+        isinstance(interval_minutes, bool)
+        or not isinstance(interval_minutes, (int, float))
+        or not MIN_INTERVAL_MINUTES <= interval_minutes <= MAX_INTERVAL_MINUTES
+    ):
+        raise ValueError(
+            f"interval_minutes must be a number between {MIN_INTERVAL_MINUTES} and {MAX_INTERVAL_MINUTES}"
+        )
+    return interval_minutes
+
+
+def bucket_transcript_by_interval(transcript: Transcript, interval_minutes: int) -> list:
+    """
+    Groups transcript entries into fixed-length time windows in a single pass.
+
+    Windows start at the earliest entry, so out-of-order entries land in the
+    right window. Only non-empty windows are returned, in chronological order,
+    each as a dict with 'start', 'end', 'label' and the 'indices' of its
+    entries in the transcript, sorted by time.
+    """
+    transcript = as_transcript(transcript)
+    if not len(transcript):
+        return []
+
+    ordered = transcript.time_ordered_indices()
+    timestamps = transcript.timestamps
+    start_epoch = timestamps[ordered[0]]
+    interval_seconds = max(1, int(interval_minutes * 60))
+
+    buckets = defaultdict(list)
+    for index in ordered:
+        buckets[(timestamps[index] - start_epoch) // interval_seconds].append(index)
+
+    start_time = epoch_to_datetime(start_epoch)
+    interval_delta = timedelta(seconds=interval_seconds)
+    time_format = "%I:%M %p"
+    intervals = []
+    for bucket_index in sorted(buckets):
+        interval_start = start_time + bucket_index * interval_delta
+        interval_end = interval_start + interval_delta
+        intervals.append(
+            {
+                "start": interval_start,
+                "end": interval_end,
+                "label": f"{interval_start.strftime(time_format)} - {interval_end.strftime(time_format)}",
+                "indices": buckets[bucket_index],
+            }
+        )
+    return intervals
+
+
+def interval_lines(transcript: Transcript, indices: list) -> list:
+    """The prompt lines of one interval: its 'Speaker: content' lines in time order."""
+    return [transcript.line(index) for index in indices]
+
+
+def interval_text_key(lines: list) -> str:
+    """Content address of an interval's text, used to reuse summaries made earlier (live sessions)."""
+    return hashlib.sha256(" ".join(lines).encode("utf-8")).hexdigest()
+
+
+def generate_interval_summaries(
+    transcript: Transcript, interval_minutes: int, known_summaries: dict = None
+) -> dict:
+    """
+    Generates summaries for specified time intervals.
+
+    `known_summaries` maps interval_text_key(lines) to an existing summary;
+    only intervals whose exact text is not in it are sent to Gemini.
+    """
+    transcript = as_transcript(transcript)
+    intervals = bucket_transcript_by_interval(transcript, interval_minutes)
+    lines = [interval_lines(transcript, interval["indices"]) for interval in intervals]
+
+    known_summaries = known_summaries or {}
+    summaries = [known_summaries.get(interval_text_key(section)) for section in lines]
+    missing = [position for position, summary in enumerate(summaries) if summary is None]
+    if len(missing) < len(lines):
+        print(f"Reusing {len(lines) - len(missing)} of {len(lines)} interval summaries.")
+
+    # Summarize every remaining interval concurrently, keeping chronological
+    # order; an interval longer than one prompt is map-reduced
+    fresh = summarize_sections([(lines[position], INTERVAL_SUMMARY_INSTRUCTION) for position in missing])
+    for position, summary in zip(missing, fresh):
+        summaries[position] = summary
+    return {interval["label"]: summary for interval, summary in zip(intervals, summaries)}
+
+
 # ==============================================================================
 # 3. HELPER & UTILITY FUNCTIONS
 # ==============================================================================
@@ -130,7 +396,7 @@ def generate_interval_summaries(transcript_data: list, interval_minutes: int) ->
 
 def format_time(timestamp: str) -> str:
     """Converts ISO format timestamp to a readable format with AM/PM."""
-    dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    dt = parse_timestamp(timestamp)
     return dt.strftime("%Y-%m-%d %I:%M %p")
 
 
@@ -141,308 +407,308 @@ def create_reports_directory():
         print("Reports directory created successfully.")
 
 
-def generate_sentiment_pie_chart(sentiment_summary: dict) -> str:
-    """Generates a pie chart from sentiment data and saves it."""
-    labels = list(sentiment_summary.keys())
-    sizes = list(sentiment_summary.values())
-    colors = ["#4CAF50", "#FFC107", "#F44336"]  # Green, Amber, Red
-
-    plt.figure(figsize=(5, 5))
-    plt.pie(
-        sizes,
-        labels=labels,
-        colors=colors,
-        autopct="%1.1f%%",
-        startangle=140,
-        wedgeprops={"edgecolor": "white"},
-    )
-    plt.axis("equal")
-
-    chart_filename = "./reports/sentiment_pie_chart.png"
-    plt.savefig(chart_filename)
-    return chart_filename
-
-
 def categorize_sentiment(polarity: float) -> str:
     """Categorizes sentiment based on polarity score."""
-    if polarity > 0.2:
+    from sentiment import NEGATIVE_THRESHOLD, POSITIVE_THRESHOLD
+
+    if polarity > POSITIVE_THRESHOLD:
         return "Positive"
-    elif polarity < -0.2:
+    elif polarity < NEGATIVE_THRESHOLD:
         return "Negative"
     else:
         return "Neutral"
 
 
-def analyze_speech(transcript_data: list) -> tuple[list, dict]:
+def analyze_speech(transcript: Transcript) -> tuple[list, dict]:
     """Analyzes speech data to categorize sentiment for each entry."""
-    analysis_results = []
-    sentiment_summary = Counter({"Positive": 0, "Neutral": 0, "Negative": 0})
-
-    for entry in transcript_data:
-        blob = TextBlob(entry["content"])
-        sentiment_category = categorize_sentiment(blob.sentiment.polarity)
-        sentiment_summary[sentiment_category] += 1
+    # NumPy and the lexicon are only loaded for reports that need sentiment
+    import numpy as np
 
-        analysis_results.append(
-            {
-                "speaker": entry["name"],
-                "content": entry["content"],
-                "sentiment_category": sentiment_category,
-            }
-        )
+    from sentiment import categorize_polarities, get_sentiment_engine
 
-    return analysis_results, dict(sentiment_summary)
+    transcript = as_transcript(transcript)
+    contents = [transcript.content(index) for index in range(len(transcript))]
+    with SENTIMENT_SECONDS.time():
+        categories = categorize_polarities(get_sentiment_engine().polarity(contents))
 
+    sentiment_summary = {"Positive": 0, "Neutral": 0, "Negative": 0}
+    labels, counts = np.unique(categories, return_counts=True)
+    sentiment_summary.update(zip(labels.tolist(), counts.tolist()))
 
-# Register the font
-pdfmetrics.registerFont(TTFont("DejaVuSans", "./fonts/DejaVuSans.ttf"))
+    analysis_results = [
+        {
+            "speaker": transcript.speaker(index),
+            "content": content,
+            "sentiment_category": str(category),
+        }
+        for index, (content, category) in enumerate(zip(contents, categories))
+    ]
+    return analysis_results, sentiment_summary
 
 
-def fix_style():
-    styles = getSampleStyleSheet()
-    for name in styles.byName:
-        styles[name].fontName = "DejaVuSans"
-    return styles
+def meeting_fingerprint(meeting_data: dict) -> str:
+    """Returns a stable hash of the meeting data, independent of key order."""
+    canonical = json.dumps(meeting_data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
 
 # ==============================================================================
-# 4. REPORT CREATION FUNCTIONS (PDF & DOCX)
+# 4. REPORT DOCUMENT BUILDERS (format-neutral)
 # ==============================================================================
 
 
-# --- NORMAL REPORT ---
-def create_normal_report_pdf(meeting_data):
-
-    file_name = f"./reports/{meeting_data['meetingTitle']}_summary_report.pdf"
-    doc = SimpleDocTemplate(file_name, pagesize=A4)
-    styles = fix_style()
-    elements = [
-        Paragraph(f"<b>{meeting_data['meetingTitle']}</b>", styles["Title"]),
-        Spacer(1, 12),
-    ]
+def _meeting_transcript(meeting_data, transcript) -> Transcript:
+    """Reuses the request's Transcript, building it only when none was passed."""
+    if transcript is None:
+        transcript = Transcript.from_entries(meeting_data["transcriptData"])
+    return transcript
 
-    # Details
-    details = (
-        f"<b>Convenor:</b> {meeting_data['convenor']}<br/>"
-        f"<b>Start Time:</b> {format_time(meeting_data['meetingStartTimeStamp'])}<br/>"
-        f"<b>End Time:</b> {format_time(meeting_data['meetingEndTimeStamp'])}<br/>"
-        f"<b>Attendees:</b> {', '.join(meeting_data.get('attendees', ['N/A']))}"
-    )
-    elements.append(Paragraph(details, styles["Normal"]))
-    elements.append(Spacer(1, 24))
 
-    # Content
-    elements.append(Paragraph("Executive Summary", styles["h2"]))
-    elements.append(
-        Paragraph(
-            generate_overall_summary(meeting_data["transcriptData"]), styles["BodyText"]
+class MeetingAnalysis:
+    """
+    The Gemini and sentiment results for one meeting, shared by its reports.
+
+    Each result is computed at most once, even when several report builders
+    ask for it from different threads (the others wait for the first).
+    `report_types` lists the reports that will be built, so SpeakerRanking
+    can reuse the speaker summaries Normal produces anyway.
+    `known_interval_summaries` (see generate_interval_summaries) holds
+    interval summaries computed ahead of time, e.g. during a live meeting.
+    The Normal report's top-level sections are built on the
+    SUMMARY_HIERARCHY_INTERVAL_MINUTES interval summaries, so an Interval
+    report of that length in the same bundle costs nothing extra.
+    """
+
+    def __init__(
+        self, meeting_data, transcript: Transcript = None, report_types=(), known_interval_summaries: dict = None
+    ):
+        self.meeting_data = meeting_data
+        self.transcript = _meeting_transcript(meeting_data, transcript)
+        self.report_types = set(report_types)
+        self.known_interval_summaries = known_interval_summaries or {}
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def _once(self, key, compute):
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+        if owner:
+            name = key if isinstance(key, str) else key[0]
+            try:
+                with span(f"analysis.{name}"):
+                    future.set_result(compute())
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
+
+    def normal_sections(self) -> tuple[str, str, dict]:
+        return self._once(
+            "normal",
+            lambda: generate_normal_sections(
+                self.transcript,
+                self.meeting_data["speakerDuration"],
+                lambda: self.interval_summaries(SUMMARY_HIERARCHY_INTERVAL_MINUTES),
+            ),
         )
-    )
-    elements.append(Spacer(1, 12))
 
-    elements.append(Paragraph("Key Takeaways", styles["h2"]))
-    elements.append(
-        Paragraph(
-            generate_key_takeaways(meeting_data["transcriptData"]), styles["BodyText"]
+    def speaker_summaries(self) -> dict:
+        if "Normal" in self.report_types:
+            return self.normal_sections()[2]
+        return self._once(
+            "speakers",
+            lambda: generate_speaker_summaries(self.transcript, self.meeting_data["speakerDuration"]),
         )
-    )
-    elements.append(Spacer(1, 12))
 
-    elements.append(Paragraph("Speaker Summaries", styles["h2"]))
-    speaker_summaries = generate_speaker_summaries(
-        meeting_data["transcriptData"], meeting_data["speakerDuration"]
-    )
-    for speaker, data in speaker_summaries.items():
-        elements.append(
-            Paragraph(f"<b>{speaker}</b> ({data['duration']} seconds)", styles["h3"])
+    def sentiment(self) -> tuple[list, dict]:
+        return self._once("sentiment", lambda: analyze_speech(self.transcript))
+
+    def interval_summaries(self, interval_minutes: int) -> dict:
+        return self._once(
+            ("interval", interval_minutes),
+            lambda: generate_interval_summaries(self.transcript, interval_minutes, self.known_interval_summaries),
         )
-        elements.append(Paragraph(data["summary"], styles["BodyText"]))
-        elements.append(Spacer(1, 12))
 
-    doc.build(elements)
-    return file_name
 
+def _meeting_analysis(meeting_data, analysis) -> MeetingAnalysis:
+    return analysis if analysis is not None else MeetingAnalysis(meeting_data)
 
-def create_normal_report_docx(meeting_data):
-    file_name = f"./reports/{meeting_data['meetingTitle']}_summary_report.docx"
-    doc = docx.Document()
-    doc.add_heading(meeting_data["meetingTitle"], level=1)
+
+# --- NORMAL REPORT ---
+def build_normal_report(meeting_data, analysis: MeetingAnalysis = None) -> ReportDocument:
+    analysis = _meeting_analysis(meeting_data, analysis)
+    title = meeting_data["meetingTitle"]
+    document = ReportDocument(title, f"{title}_summary_report")
 
     # Details
-    doc.add_paragraph(f"Convenor: {meeting_data['convenor']}")
-    doc.add_paragraph(
-        f"Time: {format_time(meeting_data['meetingStartTimeStamp'])} - {format_time(meeting_data['meetingEndTimeStamp'])}"
-    )
-    doc.add_paragraph(f"Attendees: {', '.join(meeting_data.get('attendees', ['N/A']))}")
+    details = document.section()
+    details.blocks += [
+        Spacer(12),
+        Fields(
+            [
+                ("Convenor", meeting_data["convenor"]),
+                ("Start Time", format_time(meeting_data["meetingStartTimeStamp"])),
+                ("End Time", format_time(meeting_data["meetingEndTimeStamp"])),
+                ("Attendees", ", ".join(meeting_data.get("attendees", ["N/A"]))),
+            ]
+        ),
+        Spacer(24),
+    ]
 
     # Content
-    doc.add_heading("Executive Summary", level=2)
-    doc.add_paragraph(generate_overall_summary(meeting_data["transcriptData"]))
+    overall_summary, key_takeaways, speaker_summaries = analysis.normal_sections()
 
-    doc.add_heading("Key Takeaways", level=2)
-    doc.add_paragraph(generate_key_takeaways(meeting_data["transcriptData"]))
+    document.section("Executive Summary").blocks += [
+        Paragraph(overall_summary),
+        Spacer(12),
+    ]
+    document.section("Key Takeaways").blocks += [
+        Paragraph(key_takeaways),
+        Spacer(12),
+    ]
 
-    doc.add_heading("Speaker Summaries", level=2)
-    speaker_summaries = generate_speaker_summaries(
-        meeting_data["transcriptData"], meeting_data["speakerDuration"]
-    )
+    speakers = document.section("Speaker Summaries")
     for speaker, data in speaker_summaries.items():
-        doc.add_heading(f"{speaker} ({data['duration']} seconds)", level=3)
-        doc.add_paragraph(data["summary"])
+        speakers.blocks += [
+            Heading(f"{speaker} ({data['duration']} seconds)", level=3),
+            Paragraph(data["summary"]),
+            Spacer(12),
+        ]
 
-    doc.save(file_name)
-    return file_name
+    return document
 
 
 # --- SENTIMENT REPORT ---
-def create_sentiment_report_pdf(meeting_data):
-    file_name = f"./reports/{meeting_data['meetingTitle']}_sentiment_report.pdf"
-    doc = SimpleDocTemplate(file_name, pagesize=A4)
-    styles = fix_style()
-    analysis, sentiment_summary = analyze_speech(meeting_data["transcriptData"])
-    chart_filename = generate_sentiment_pie_chart(sentiment_summary)
-
-    elements = [
-        Paragraph("Sentiment Analysis Report", styles["Title"]),
-        Spacer(1, 12),
-        Image(chart_filename, width=4 * inch, height=4 * inch),
-        Spacer(1, 12),
-    ]
-
-    for entry in analysis:
-        elements.append(
-            Paragraph(
-                f"<b>{entry['speaker']}</b> ({entry['sentiment_category']})",
-                styles["Normal"],
-            )
-        )
-        elements.append(Paragraph(entry["content"], styles["BodyText"]))
-        elements.append(Spacer(1, 12))
-
-    doc.build(elements)
-    return file_name
-
+def build_sentiment_report(meeting_data, analysis: MeetingAnalysis = None) -> ReportDocument:
+    analysis = _meeting_analysis(meeting_data, analysis)
+    document = ReportDocument(
+        "Sentiment Analysis Report", f"{meeting_data['meetingTitle']}_sentiment_report"
+    )
+    results, sentiment_summary = analysis.sentiment()
 
-def create_sentiment_report_docx(meeting_data):
-    file_name = f"./reports/{meeting_data['meetingTitle']}_sentiment_report.docx"
-    doc = docx.Document()
-    doc.add_heading("Sentiment Analysis Report", level=1)
+    overview = document.section()
+    overview.blocks += [Spacer(12), Chart("pie", sentiment_summary), Spacer(12)]
 
-    analysis, sentiment_summary = analyze_speech(meeting_data["transcriptData"])
-    chart_filename = generate_sentiment_pie_chart(sentiment_summary)
-    doc.add_picture(chart_filename, width=Inches(4))
+    for entry in results:
+        overview.blocks += [
+            Heading(f"{entry['speaker']} ({entry['sentiment_category']})", level=3),
+            Paragraph(entry["content"]),
+            Spacer(12),
+        ]
 
-    for entry in analysis:
-        doc.add_heading(f"{entry['speaker']} ({entry['sentiment_category']})", level=3)
-        doc.add_paragraph(entry["content"])
+    return document
 
-    doc.save(file_name)
-    return file_name
 
 # --- SPEAKER RANKING REPORT ---
-def create_speaker_ranking_report_pdf(meeting_data):
-    file_name = f"./reports/{meeting_data['meetingTitle']}_speaker_ranking_report.pdf"
-    doc = SimpleDocTemplate(file_name, pagesize=A4)
-    styles = fix_style()
-    elements = [
-        Paragraph("Speaker Ranking Report", styles["Title"]),
-        Spacer(1, 24),
-    ]
-
-    speaker_summaries = generate_speaker_summaries(
-        meeting_data["transcriptData"], meeting_data["speakerDuration"]
-    )
-    # Sort speakers by duration, descending
-    sorted_speakers = sorted(
-        speaker_summaries.items(), key=lambda item: item[1]["duration"], reverse=True
+def build_speaker_ranking_report(meeting_data, analysis: MeetingAnalysis = None) -> ReportDocument:
+    analysis = _meeting_analysis(meeting_data, analysis)
+    document = ReportDocument(
+        "Speaker Ranking Report", f"{meeting_data['meetingTitle']}_speaker_ranking_report"
     )
+    document.section().blocks.append(Spacer(24))
 
-    for i, (speaker, data) in enumerate(sorted_speakers, 1):
-        elements.append(Paragraph(f"<b>{i}. {speaker}</b>", styles["h2"]))
-        elements.append(Paragraph(f"Speaking Time: {data['duration']} seconds", styles["Normal"]))
-        elements.append(Paragraph("<b>Contribution Summary:</b>", styles["Normal"]))
-        elements.append(Paragraph(data["summary"], styles["BodyText"]))
-        elements.append(Spacer(1, 12))
-
-    doc.build(elements)
-    return file_name
-
-
-def create_speaker_ranking_report_docx(meeting_data):
-    file_name = f"./reports/{meeting_data['meetingTitle']}_speaker_ranking_report.docx"
-    doc = docx.Document()
-    doc.add_heading("Speaker Ranking Report", level=1)
-
-    speaker_summaries = generate_speaker_summaries(
-        meeting_data["transcriptData"], meeting_data["speakerDuration"]
-    )
+    speaker_summaries = analysis.speaker_summaries()
     # Sort speakers by duration, descending
     sorted_speakers = sorted(
         speaker_summaries.items(), key=lambda item: item[1]["duration"], reverse=True
     )
 
     for i, (speaker, data) in enumerate(sorted_speakers, 1):
-        doc.add_heading(f"{i}. {speaker}", level=2)
-        doc.add_paragraph(f"Speaking Time: {data['duration']} seconds")
-        doc.add_paragraph("Contribution Summary:")
-        doc.add_paragraph(data["summary"])
+        document.section(f"{i}. {speaker}").blocks += [
+            Paragraph(f"Speaking Time: {data['duration']} seconds", style="normal"),
+            Paragraph("Contribution Summary:", style="normal", bold=True),
+            Paragraph(data["summary"]),
+            Spacer(12),
+        ]
 
-    doc.save(file_name)
-    return file_name
+    return document
 
 
 # --- INTERVAL REPORT ---
-def create_interval_report_pdf(meeting_data, interval_minutes):
-    file_name = f"./reports/{meeting_data['meetingTitle']}_interval_report.pdf"
-    doc = SimpleDocTemplate(file_name, pagesize=A4)
-    styles = fix_style()
-    elements = [
-        Paragraph(f"Interval Report ({interval_minutes}-Minute Intervals)", styles["Title"]),
-        Spacer(1, 24),
-    ]
-
-    interval_summaries = generate_interval_summaries(
-        meeting_data["transcriptData"], interval_minutes
+def build_interval_report(meeting_data, interval_minutes, analysis: MeetingAnalysis = None) -> ReportDocument:
+    analysis = _meeting_analysis(meeting_data, analysis)
+    document = ReportDocument(
+        f"Interval Report ({interval_minutes}-Minute Intervals)",
+        f"{meeting_data['meetingTitle']}_interval_report",
     )
+    document.section().blocks.append(Spacer(24))
 
-    if not interval_summaries:
-        elements.append(Paragraph("No conversations to report.", styles["Normal"]))
-    else:
-        for interval, summary in interval_summaries.items():
-            elements.append(Paragraph(f"<b>Interval: {interval}</b>", styles["h2"]))
-            elements.append(Paragraph(summary, styles["BodyText"]))
-            elements.append(Spacer(1, 12))
-
-    doc.build(elements)
-    return file_name
-
-
-def create_interval_report_docx(meeting_data, interval_minutes):
-    file_name = f"./reports/{meeting_data['meetingTitle']}_interval_report.docx"
-    doc = docx.Document()
-    doc.add_heading(f"Interval Report ({interval_minutes}-Minute Intervals)", level=1)
-
-    interval_summaries = generate_interval_summaries(
-        meeting_data["transcriptData"], interval_minutes
-    )
+    interval_summaries = analysis.interval_summaries(interval_minutes)
 
     if not interval_summaries:
-        doc.add_paragraph("No conversations to report.")
+        document.section().blocks.append(
+            Paragraph("No conversations to report.", style="normal")
+        )
     else:
         for interval, summary in interval_summaries.items():
-            doc.add_heading(f"Interval: {interval}", level=2)
-            doc.add_paragraph(summary)
-
-    doc.save(file_name)
-    return file_name
-
-# ... Add other report generation functions (SpeakerRanking, Interval) in a similar refactored style ...
+            document.section(f"Interval: {interval}").blocks += [
+                Paragraph(summary),
+                Spacer(12),
+            ]
+
+    return document
+
+
+REPORT_BUILDERS = {
+    "Normal": lambda data, analysis, interval_minutes: build_normal_report(data, analysis),
+    "Sentiment": lambda data, analysis, interval_minutes: build_sentiment_report(data, analysis),
+    "SpeakerRanking": lambda data, analysis, interval_minutes: build_speaker_ranking_report(data, analysis),
+    "Interval": lambda data, analysis, interval_minutes: build_interval_report(data, interval_minutes, analysis),
+}
+
+# Built documents are kept per process so that asking for the same meeting in
+# another format (or again) only pays for rendering, not for Gemini/TextBlob.
+REPORT_CACHE_SIZE = int(os.environ.get("REPORT_CACHE_SIZE", "32"))
+_report_cache = OrderedDict()
+_report_cache_lock = threading.Lock()
+
+
+def build_report(
+    meeting_data, report_type="Normal", interval_minutes=5, analysis: MeetingAnalysis = None
+) -> ReportDocument:
+    """Builds (or reuses) the format-neutral document for a meeting and report type."""
+    builder = REPORT_BUILDERS.get(report_type)
+    if builder is None:
+        raise ValueError(f"Invalid report type: {report_type}")
+
+    cache_key = (
+        meeting_fingerprint(meeting_data),
+        report_type,
+        interval_minutes if report_type == "Interval" else None,
+    )
+    with _report_cache_lock:
+        document = _report_cache.get(cache_key)
+        record_cache_lookup("document", hit=document is not None)
+        if document is not None:
+            _report_cache.move_to_end(cache_key)
+            print(f"Reusing built {report_type} report document.")
+            return document
+
+    with span("build", report_type=report_type):
+        document = builder(meeting_data, _meeting_analysis(meeting_data, analysis), interval_minutes)
+
+    with _report_cache_lock:
+        _report_cache[cache_key] = document
+        _report_cache.move_to_end(cache_key)
+        while len(_report_cache) > REPORT_CACHE_SIZE:
+            _report_cache.popitem(last=False)
+    return document
 
 # ==============================================================================
 # 5. MAIN REPORT DISPATCHER
 # ==============================================================================
 
 
+def check_report_choice(report_type: str, format_type: str):
+    """Raises ValueError for an unknown report type or format."""
+    if report_type not in REPORT_BUILDERS or format_type not in RENDERERS:
+        raise ValueError(
+            f"Invalid report/format combination: {report_type}/{format_type}"
+        )
+
+
 def generate_reports(
     meeting_data, report_type="Normal", format_type="PDF", interval_minutes=5
 ):
@@ -456,34 +722,121 @@ def generate_reports(
         interval_minutes (int): The interval in minutes for interval reports.
     """
     create_reports_directory()
+    check_report_choice(report_type, format_type)
+
+    print(f"Generating {report_type} report in {format_type} format...")
+    try:
+        document = build_report(meeting_data, report_type, interval_minutes)
+        render, extension = RENDERERS[format_type]
+        file_path = render(document, f"./reports/{document.file_stem}.{extension}")
+        print(f"Successfully generated: {file_path}")
+        return file_path
+    except SummarizationError as e:
+        # Never ship a report with missing sections; let the caller report it
+        print(f"Failed to generate report. Summarization error: {e}")
+        raise
+    except Exception as e:
+        print(f"Failed to generate report. Error: {e}")
+        return None
+
+
+def generate_report_stream(
+    meeting_data, report_type="Normal", format_type="PDF", interval_minutes=5, analysis: MeetingAnalysis = None
+):
+    """
+    Generates a report in memory (spilling to a temp file only if it is large).
 
-    report_functions = {
-        ("Normal", "PDF"): create_normal_report_pdf,
-        ("Normal", "DOCX"): create_normal_report_docx,
-        ("Sentiment", "PDF"): create_sentiment_report_pdf,
-        ("Sentiment", "DOCX"): create_sentiment_report_docx,
-        ("SpeakerRanking", "PDF"): create_speaker_ranking_report_pdf, 
-        ("SpeakerRanking", "DOCX"): create_speaker_ranking_report_docx,  
-        ("Interval", "PDF"): lambda data: create_interval_report_pdf(data, interval_minutes), 
-        ("Interval", "DOCX"):lambda data:  create_interval_report_docx(data, interval_minutes),  
-    }
+    `analysis` may carry precomputed results (see MeetingAnalysis).
 
-    func = report_functions.get((report_type, format_type))
+    Returns:
+        tuple | None: (rewound file object, size in bytes, download file name),
+        or None if generation failed.
+    """
+    check_report_choice(report_type, format_type)
+
+    print(f"Generating {report_type} report in {format_type} format (in memory)...")
+    try:
+        document = build_report(meeting_data, report_type, interval_minutes, analysis)
+        buffer, size = render_to_buffer(document, format_type)
+        download_name = f"{document.file_stem}.{RENDERERS[format_type][1]}"
+        print(f"Successfully generated: {download_name} ({size} bytes)")
+        return buffer, size, download_name
+    except SummarizationError as e:
+        print(f"Failed to generate report. Summarization error: {e}")
+        raise
+    except TranscriptDataError as e:
+        print(f"Failed to generate report. Invalid transcript: {e}")
+        raise
+    except Exception as e:
+        print(f"Failed to generate report. Error: {e}")
+        return None
+
+
+def _render_bundle_entry(meeting_data, report_type, format_type, interval_minutes, analysis):
+    document = build_report(meeting_data, report_type, interval_minutes, analysis)
+    buffer, size = render_to_buffer(document, format_type)
+    return buffer, f"{document.file_stem}.{RENDERERS[format_type][1]}"
+
+
+def generate_report_bundle(meeting_data, reports: list, interval_minutes=5):
+    """
+    Generates several reports for one meeting and packs them into a zip.
 
-    if func:
-        print(f"Generating {report_type} report in {format_type} format...")
-        try:
-            # Logic for interval reports could be added here if needed
-            file_path = func(meeting_data)
-            print(f"Successfully generated: {file_path}")
-            return file_path
-        except Exception as e:
-            print(f"Failed to generate report. Error: {e}")
-            return None
-    else:
-        raise ValueError(
-            f"Invalid report/format combination: {report_type}/{format_type}"
-        )
+    The meeting is analyzed once (see MeetingAnalysis) and the reports are
+    built and rendered in parallel, so the bundle costs about as much as its
+    most expensive report.
+
+    Args:
+        reports (list): (report_type, format_type) pairs.
+
+    Returns:
+        tuple | None: (rewound zip file object, size in bytes, download file name),
+        or None if generation failed.
+    """
+    reports = list(dict.fromkeys((report_type, format_type) for report_type, format_type in reports))
+    if not reports:
+        raise ValueError("No reports requested")
+    for report_type, format_type in reports:
+        check_report_choice(report_type, format_type)
+
+    print(f"Generating report bundle: {', '.join(f'{t}/{f}' for t, f in reports)} (in memory)...")
+    analysis = MeetingAnalysis(meeting_data, report_types=[report_type for report_type, _ in reports])
+    with ThreadPoolExecutor(max_workers=len(reports), thread_name_prefix="bundle") as pool:
+        futures = [
+            pool.submit(propagate(_render_bundle_entry), meeting_data, report_type, format_type, interval_minutes, analysis)
+            for report_type, format_type in reports
+        ]
+    rendered = [future.result() for future in futures if future.exception() is None]
+    try:
+        for future in futures:
+            if future.exception() is not None:
+                raise future.exception()
+
+        bundle = SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_BYTES)
+        with span("zip", entries=len(rendered)) as current:
+            # PDF and DOCX are already compressed; storing them keeps zipping cheap
+            with zipfile.ZipFile(bundle, "w", compression=zipfile.ZIP_STORED) as archive:
+                for buffer, name in rendered:
+                    with archive.open(name, "w") as entry:
+                        shutil.copyfileobj(buffer, entry)
+            size = bundle.seek(0, os.SEEK_END)
+            current.set(output_bytes=size)
+        bundle.seek(0)
+        download_name = f"{meeting_data['meetingTitle']}_reports.zip"
+        print(f"Successfully generated: {download_name} ({size} bytes)")
+        return bundle, size, download_name
+    except SummarizationError as e:
+        print(f"Failed to generate report bundle. Summarization error: {e}")
+        raise
+    except TranscriptDataError as e:
+        print(f"Failed to generate report bundle. Invalid transcript: {e}")
+        raise
+    except Exception as e:
+        print(f"Failed to generate report bundle. Error: {e}")
+        return None
+    finally:
+        for buffer, _ in rendered:
+            buffer.close()
 
 
 # ==============================================================================
@@ -0,0 +1,346 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+
+from metrics import REPORT_REQUEST_SECONDS, REPORT_REQUESTS_TOTAL
+from process_state import thread_connection
+from renderers import RENDERERS
+from report_generator import build_report, create_reports_directory
+from tracing import traced
+
+# ==============================================================================
+# PERSISTENT REPORT JOB QUEUE
+# ==============================================================================
+# `POST /reports` only records a job here and returns its id; background
+# workers (threads inside the web process, or `python report_jobs.py` as a
+# separate process on the same host) claim queued jobs and generate the files.
+
+REPORT_JOBS_DB = os.environ.get("REPORT_JOBS_DB", "./cache/report_jobs.sqlite3")
+REPORT_JOBS_DIR = os.environ.get("REPORT_JOBS_DIR", "./reports/jobs")
+REPORT_JOB_WORKERS = int(os.environ.get("REPORT_JOB_WORKERS", "2"))
+# A running job whose heartbeat is older than this is assumed orphaned by a
+# crashed or restarted worker and is put back in the queue.
+REPORT_JOB_STALE_SECONDS = int(os.environ.get("REPORT_JOB_STALE_SECONDS", "900"))
+# How often a running job refreshes its heartbeat (updated_at)
+REPORT_JOB_HEARTBEAT_SECONDS = int(os.environ.get("REPORT_JOB_HEARTBEAT_SECONDS", "30"))
+# Finished and failed jobs (rows and result files) are deleted after this long
+REPORT_JOB_TTL_SECONDS = int(os.environ.get("REPORT_JOB_TTL_SECONDS", str(24 * 3600)))
+CLEANUP_INTERVAL_SECONDS = 600
+POLL_INTERVAL_SECONDS = 1.0
+
+REPORT_JOBS_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS report_jobs ("
+    " id TEXT PRIMARY KEY,"
+    " idempotency_key TEXT UNIQUE,"
+    " status TEXT NOT NULL,"
+    " stage TEXT NOT NULL,"
+    " progress INTEGER NOT NULL DEFAULT 0,"
+    " request TEXT NOT NULL,"
+    " result_path TEXT,"
+    " download_name TEXT,"
+    " error TEXT,"
+    " created_at REAL NOT NULL,"
+    " updated_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS report_jobs_status ON report_jobs (status, created_at)",
+)
+
+
+_local = threading.local()
+
+
+def _connect() -> sqlite3.Connection:
+    """Returns this thread's connection to the job database."""
+    return thread_connection(
+        _local,
+        REPORT_JOBS_DB,
+        schema=REPORT_JOBS_SCHEMA,
+        row_factory=sqlite3.Row,
+        timeout=30,
+        isolation_level=None,
+    )
+
+
+def _job_to_dict(row) -> dict:
+    return {
+        "job_id": row["id"],
+        "status": row["status"],
+        "stage": row["stage"],
+        "progress": row["progress"],
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def submit_job(report_request: dict, idempotency_key: str = None) -> tuple[dict, bool]:
+    """
+    Queues a report job, or returns the existing one for a repeated key.
+
+    A failed job is queued again (with the new request) when its key is
+    resubmitted, so a client can retry after a quota or transient failure.
+
+    Returns:
+        tuple: (job status dict, True if a job was queued).
+    """
+    conn = _connect()
+    if idempotency_key:
+        now = time.time()
+        requeued = conn.execute(
+            "UPDATE report_jobs SET status = 'queued', stage = 'queued', progress = 0, request = ?,"
+            " result_path = NULL, download_name = NULL, error = NULL, created_at = ?, updated_at = ?"
+            " WHERE idempotency_key = ? AND status = 'failed'",
+            (json.dumps(report_request, ensure_ascii=False), now, now, idempotency_key),
+        ).rowcount
+        existing = conn.execute(
+            "SELECT * FROM report_jobs WHERE idempotency_key = ?", (idempotency_key,)
+        ).fetchone()
+        if requeued:
+            _wake_workers.set()
+            return _job_to_dict(existing), True
+        if existing is not None:
+            return _job_to_dict(existing), False
+
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    try:
+        conn.execute(
+            "INSERT INTO report_jobs (id, idempotency_key, status, stage, progress, request, created_at, updated_at)"
+            " VALUES (?, ?, 'queued', 'queued', 0, ?, ?, ?)",
+            (job_id, idempotency_key, json.dumps(report_request, ensure_ascii=False), now, now),
+        )
+    except sqlite3.IntegrityError:
+        # Another request with the same key won the race
+        existing = conn.execute(
+            "SELECT * FROM report_jobs WHERE idempotency_key = ?", (idempotency_key,)
+        ).fetchone()
+        return _job_to_dict(existing), False
+
+    _wake_workers.set()
+    return get_job(job_id), True
+
+
+def get_job(job_id: str):
+    """Returns the job's status dict, or None if it does not exist."""
+    row = _connect().execute("SELECT * FROM report_jobs WHERE id = ?", (job_id,)).fetchone()
+    return _job_to_dict(row) if row is not None else None
+
+
+def get_job_result(job_id: str):
+    """Returns (file path, download name) for a finished job, or None."""
+    row = _connect().execute(
+        "SELECT result_path, download_name FROM report_jobs WHERE id = ? AND status = 'done'",
+        (job_id,),
+    ).fetchone()
+    if row is None or not row["result_path"] or not os.path.exists(row["result_path"]):
+        return None
+    return row["result_path"], row["download_name"]
+
+
+def queue_depth() -> int:
+    """Number of jobs waiting for a worker."""
+    return _connect().execute(
+        "SELECT COUNT(*) FROM report_jobs WHERE status = 'queued'"
+    ).fetchone()[0]
+
+
+def _update_job(job_id: str, **fields):
+    fields["updated_at"] = time.time()
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    _connect().execute(
+        f"UPDATE report_jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id)
+    )
+
+
+def _claim_next_job():
+    """Atomically moves the oldest queued job to running and returns it."""
+    conn = _connect()
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "UPDATE report_jobs SET status = 'queued', stage = 'requeued', updated_at = ?"
+            " WHERE status = 'running' AND updated_at < ?",
+            (now, now - REPORT_JOB_STALE_SECONDS),
+        )
+        row = conn.execute(
+            "SELECT * FROM report_jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE report_jobs SET status = 'running', stage = 'starting', progress = 5, updated_at = ?"
+                " WHERE id = ?",
+                (now, row["id"]),
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return row
+
+
+@contextmanager
+def _heartbeat(job_id: str):
+    """Refreshes a running job's updated_at in the background, so it is not requeued as stale."""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(REPORT_JOB_HEARTBEAT_SECONDS):
+            try:
+                _connect().execute(
+                    "UPDATE report_jobs SET updated_at = ? WHERE id = ? AND status = 'running'",
+                    (time.time(), job_id),
+                )
+            except sqlite3.Error as e:
+                print(f"Job {job_id}: heartbeat failed: {e}")
+
+    thread = threading.Thread(target=beat, name=f"report-job-heartbeat-{job_id[:8]}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(row):
+    """Generates the report for one claimed job and records the outcome."""
+    with traced(f"job {row['id']}"), _heartbeat(row["id"]):
+        _run_job(row)
+
+
+def _run_job(row):
+    job_id = row["id"]
+    report_request = json.loads(row["request"])
+    print(f"Job {job_id}: generating {report_request['report_type']} report in {report_request['report_format']} format...")
+    labels = ("job", report_request["report_type"], report_request["report_format"])
+    started = time.perf_counter()
+    try:
+        _update_job(job_id, stage="analyzing", progress=10)
+        document = build_report(
+            report_request["meeting_data"],
+            report_request["report_type"],
+            report_request["interval_minutes"],
+        )
+
+        _update_job(job_id, stage="rendering", progress=80)
+        render, extension = RENDERERS[report_request["report_format"]]
+        os.makedirs(REPORT_JOBS_DIR, exist_ok=True)
+        # Absolute, so the download route finds it whatever the server's working directory
+        result_path = render(document, os.path.join(REPORT_JOBS_DIR, f"{job_id}.{extension}"))
+        result_path = os.path.abspath(result_path)
+
+        _update_job(
+            job_id,
+            status="done",
+            stage="done",
+            progress=100,
+            result_path=result_path,
+            download_name=f"{document.file_stem}.{extension}",
+        )
+        print(f"Job {job_id}: done.")
+        REPORT_REQUESTS_TOTAL.labels(*labels, "done").inc()
+    except Exception as e:
+        print(f"Job {job_id}: failed. Error: {e}")
+        print(traceback.format_exc())
+        _update_job(job_id, status="failed", stage="failed", error=str(e))
+        REPORT_REQUESTS_TOTAL.labels(*labels, "failed").inc()
+    REPORT_REQUEST_SECONDS.labels(*labels).observe(time.perf_counter() - started)
+
+
+def cleanup_jobs(ttl_seconds: int = REPORT_JOB_TTL_SECONDS) -> int:
+    """
+    Deletes finished and failed jobs older than ttl_seconds, with their
+    result files, plus any leftover file in REPORT_JOBS_DIR that old.
+
+    Returns:
+        int: The number of job rows deleted.
+    """
+    cutoff = time.time() - ttl_seconds
+    conn = _connect()
+    expired = conn.execute(
+        "SELECT id, result_path FROM report_jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+        (cutoff,),
+    ).fetchall()
+    for row in expired:
+        conn.execute("DELETE FROM report_jobs WHERE id = ?", (row["id"],))
+        if row["result_path"]:
+            try:
+                os.remove(row["result_path"])
+            except OSError:
+                pass
+
+    # Files whose row is gone (e.g. a render interrupted by a restart)
+    try:
+        for entry in os.scandir(REPORT_JOBS_DIR):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    if expired:
+        print(f"Deleted {len(expired)} expired report job(s).")
+    return len(expired)
+
+
+_wake_workers = threading.Event()
+_workers_started = False
+_workers_lock = threading.Lock()
+_last_cleanup = 0.0
+
+
+def _cleanup_if_due():
+    global _last_cleanup
+    if time.monotonic() - _last_cleanup < CLEANUP_INTERVAL_SECONDS:
+        return
+    _last_cleanup = time.monotonic()
+    try:
+        cleanup_jobs()
+    except sqlite3.Error as e:
+        print(f"Report job cleanup failed: {e}")
+
+
+def worker_loop():
+    """Runs queued jobs forever, sleeping briefly while the queue is empty."""
+    create_reports_directory()
+    while True:
+        _cleanup_if_due()
+        try:
+            row = _claim_next_job()
+        except sqlite3.Error as e:
+            print(f"Job queue unavailable: {e}")
+            row = None
+        if row is None:
+            _wake_workers.wait(POLL_INTERVAL_SECONDS)
+            _wake_workers.clear()
+            continue
+        run_job(row)
+
+
+def start_workers(count: int = REPORT_JOB_WORKERS):
+    """
+    Starts the in-process worker threads once per process.
+
+    Called at boot (gunicorn post_worker_init, the ASGI lifespan, `python
+    app.py`), so jobs queued or orphaned before a restart are picked up
+    without waiting for a new submission.
+    """
+    global _workers_started
+    with _workers_lock:
+        if _workers_started or count <= 0:
+            return
+        for i in range(count):
+            threading.Thread(target=worker_loop, name=f"report-job-{i}", daemon=True).start()
+        _workers_started = True
+
+
+if __name__ == "__main__":
+    # Standalone worker process: `python report_jobs.py`
+    print("Starting report job worker...")
+    worker_loop()
@@ -0,0 +1,66 @@
+from dataclasses import dataclass, field
+
+# ==============================================================================
+# FORMAT-NEUTRAL REPORT DOCUMENT MODEL
+# ==============================================================================
+# A report is built once from the meeting data (LLM and sentiment work happens
+# here) and can then be rendered to any output format by `renderers.py`.
+
+
+@dataclass
+class Heading:
+    text: str
+    level: int = 2
+
+
+@dataclass
+class Paragraph:
+    text: str
+    style: str = "body"  # "body" or "normal"
+    bold: bool = False
+
+
+@dataclass
+class Fields:
+    """Label/value pairs, e.g. the meeting details block."""
+
+    items: list
+
+
+@dataclass
+class Table:
+    rows: list
+    header: list = None
+
+
+@dataclass
+class Chart:
+    """A chart described by its data; each renderer draws it natively."""
+
+    kind: str
+    data: dict
+    width_inches: float = 4
+
+
+@dataclass
+class Spacer:
+    height: int = 12
+
+
+@dataclass
+class Section:
+    heading: Heading = None
+    blocks: list = field(default_factory=list)
+
+
+@dataclass
+class ReportDocument:
+    title: str
+    file_stem: str
+    sections: list = field(default_factory=list)
+
+    def section(self, heading: str = None, level: int = 2) -> Section:
+        """Appends a new section and returns it for filling."""
+        new_section = Section(Heading(heading, level) if heading else None)
+        self.sections.append(new_section)
+        return new_section
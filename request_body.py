@@ -0,0 +1,197 @@
+import json
+import os
+import zlib
+
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+
+# ==============================================================================
+# REPORT REQUEST BODIES: GZIP AND NDJSON
+# ==============================================================================
+# Report requests can be sent as one JSON object (as before) or as NDJSON:
+# the first line is the request object without transcriptData, and every
+# following line is one transcript entry. Either may be gzip-compressed
+# (Content-Encoding: gzip). The body is fed in chunks as it arrives; NDJSON is
+# parsed line by line, so only the current chunk and the parsed entries are
+# held, never the raw upload. MAX_REQUEST_BODY_BYTES bounds both the bytes on
+# the wire and the decompressed size (which also stops gzip bombs).
+#
+#   {"report_type": "Normal", "report_format": "PDF", "meeting_data": {"meetingTitle": ...}}
+#   {"name": "Alex", "content": "Hello.", "timeStamp": "2024-09-29T12:00:05.000Z"}
+#   ...
+
+MAX_REQUEST_BODY_BYTES = int(os.environ.get("MAX_REQUEST_BODY_BYTES", str(64 * 1024 * 1024)))
+READ_CHUNK_BYTES = 64 * 1024
+NDJSON_MIMETYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+GZIP_ENCODINGS = {"gzip", "x-gzip"}
+
+
+class BodyDecoder:
+    """Turns raw body chunks into decompressed chunks, enforcing MAX_REQUEST_BODY_BYTES."""
+
+    def __init__(self, content_encoding: str = None, max_bytes: int = MAX_REQUEST_BODY_BYTES):
+        encoding = (content_encoding or "identity").strip().lower()
+        if encoding not in GZIP_ENCODINGS | {"identity"}:
+            raise UnsupportedMediaType(f"Unsupported Content-Encoding: {content_encoding}")
+        self.gzip = encoding in GZIP_ENCODINGS
+        self.max_bytes = max_bytes
+        self.raw_bytes = 0
+        self.decoded_bytes = 0
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if self.gzip else None
+
+    def _count(self, data: bytes) -> bytes:
+        self.decoded_bytes += len(data)
+        if self.decoded_bytes > self.max_bytes:
+            raise RequestEntityTooLarge(f"The request body exceeds {self.max_bytes} bytes.")
+        return data
+
+    def feed(self, chunk: bytes) -> list:
+        self.raw_bytes += len(chunk)
+        if self.raw_bytes > self.max_bytes:
+            raise RequestEntityTooLarge(f"The request body exceeds {self.max_bytes} bytes.")
+        if not self.gzip:
+            return [self._count(chunk)]
+
+        decoded = []
+        while chunk:
+            if self._decompressor.eof:
+                # Concatenated gzip members are one stream (as with `cat a.gz b.gz`)
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            try:
+                # Bounded output per step, so a tiny chunk cannot expand unchecked
+                data = self._decompressor.decompress(chunk, READ_CHUNK_BYTES)
+            except zlib.error as e:
+                raise ValueError(f"Invalid gzip body: {e}")
+            chunk = self._decompressor.unconsumed_tail or self._decompressor.unused_data
+            if data:
+                decoded.append(self._count(data))
+        return decoded
+
+    def close(self) -> list:
+        if not self.gzip:
+            return []
+        if not self._decompressor.eof:
+            if self.raw_bytes == 0:
+                return []
+            raise ValueError("Invalid gzip body: the stream is truncated")
+        return [self._count(self._decompressor.flush())]
+
+
+class JsonBodyParser:
+    """Collects a JSON body and parses it once complete."""
+
+    def __init__(self):
+        self._chunks = []
+        self.entries = None
+
+    def feed(self, data: bytes):
+        self._chunks.append(data)
+
+    def close(self):
+        body = b"".join(self._chunks)
+        self._chunks = []
+        if not body.strip():
+            return None
+        try:
+            received_data = json.loads(body)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON body: {e}")
+        if received_data is not None and not isinstance(received_data, dict):
+            raise ValueError("The request body must be a JSON object")
+        meeting_data = received_data.get("meeting_data") if isinstance(received_data, dict) else None
+        if isinstance(meeting_data, dict) and isinstance(meeting_data.get("transcriptData"), list):
+            self.entries = len(meeting_data["transcriptData"])
+        return received_data
+
+
+class NdjsonBodyParser:
+    """Builds the request object from NDJSON lines as they arrive."""
+
+    def __init__(self):
+        self._pending = b""
+        self._line_number = 0
+        self.request = None
+        self.entries = 0
+
+    def _line(self, line: bytes):
+        self._line_number += 1
+        if not line.strip():
+            return
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid NDJSON on line {self._line_number}: {e}")
+        if not isinstance(value, dict):
+            raise ValueError(f"Invalid NDJSON on line {self._line_number}: expected an object")
+
+        if self.request is None:
+            meeting_data = value.get("meeting_data")
+            if meeting_data is not None and not isinstance(meeting_data, dict):
+                raise ValueError("meeting_data in the first NDJSON line must be an object")
+            meeting_data = dict(meeting_data or {})
+            transcript = meeting_data.get("transcriptData") or []
+            if not isinstance(transcript, list):
+                raise ValueError("transcriptData in the first NDJSON line must be a list")
+            meeting_data["transcriptData"] = list(transcript)
+            self.request = {**value, "meeting_data": meeting_data}
+            self.entries = len(transcript)
+        else:
+            self.request["meeting_data"]["transcriptData"].append(value)
+            self.entries += 1
+
+    def feed(self, data: bytes):
+        lines = (self._pending + data).split(b"\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self._line(line)
+
+    def close(self):
+        if self._pending:
+            self._line(self._pending)
+            self._pending = b""
+        return self.request
+
+
+class RequestBodyReader:
+    """
+    Decodes and parses a report request body fed chunk by chunk.
+
+    Raises (from feed/close):
+        RequestEntityTooLarge: Past MAX_REQUEST_BODY_BYTES, compressed or not.
+        UnsupportedMediaType: For a Content-Encoding other than gzip.
+        ValueError: If the body is not valid gzip, JSON or NDJSON.
+    """
+
+    def __init__(self, mimetype: str = None, content_encoding: str = None, max_bytes: int = MAX_REQUEST_BODY_BYTES):
+        self.decoder = BodyDecoder(content_encoding, max_bytes)
+        self.ndjson = (mimetype or "").lower() in NDJSON_MIMETYPES
+        self.parser = NdjsonBodyParser() if self.ndjson else JsonBodyParser()
+
+    def feed(self, chunk: bytes):
+        for data in self.decoder.feed(chunk):
+            self.parser.feed(data)
+
+    def close(self):
+        """Returns the request object (None for an empty body)."""
+        for data in self.decoder.close():
+            self.parser.feed(data)
+        return self.parser.close()
+
+    def describe(self) -> str:
+        """A one-line summary of the body for the request log."""
+        parts = [f"{self.decoder.raw_bytes} bytes", "NDJSON" if self.ndjson else "JSON"]
+        if self.decoder.gzip:
+            parts.append(f"gzip, {self.decoder.decoded_bytes} bytes decompressed")
+        if self.parser.entries is not None:
+            parts.append(f"{self.parser.entries} transcript entries")
+        return ", ".join(parts)
+
+
+def read_request_body(stream, mimetype: str = None, content_encoding: str = None):
+    """Reads a report request from a file-like WSGI input stream; returns (request object, reader)."""
+    reader = RequestBodyReader(mimetype, content_encoding)
+    while True:
+        chunk = stream.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        reader.feed(chunk)
+    return reader.close(), reader
@@ -0,0 +1,210 @@
+import importlib.util
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+
+from process_state import lazy_singleton
+
+# ==============================================================================
+# LEXICON-BASED, VECTORIZED SENTIMENT ENGINE
+# ==============================================================================
+# Replaces one TextBlob per utterance. Utterances are tokenized once, matched
+# against a compiled English + Vietnamese polarity lexicon, and scored for the
+# whole batch with NumPy. Repeated utterances ("Okay.", "Yeah.") are memoized.
+
+POSITIVE_THRESHOLD = 0.2
+NEGATIVE_THRESHOLD = -0.2
+SENTIMENT_MEMO_SIZE = int(os.environ.get("SENTIMENT_MEMO_SIZE", "100000"))
+
+# Negation flips and dampens the following opinion word, as in TextBlob's
+# pattern analyzer.
+NEGATION_FACTOR = -0.5
+ENGLISH_NEGATORS = {"not", "no", "never", "n't", "cannot"}
+VIETNAMESE_NEGATORS = {"không", "chẳng", "chả", "chưa", "đừng", "chớ"}
+
+# Vietnamese opinion words and phrases (syllables separated by spaces).
+VIETNAMESE_LEXICON = {
+    "tốt": 0.7, "tuyệt": 0.9, "tuyệt vời": 1.0, "xuất sắc": 1.0, "hay": 0.5,
+    "ổn": 0.4, "được": 0.2, "đẹp": 0.7, "vui": 0.7, "vui vẻ": 0.7, "hài lòng": 0.7,
+    "thích": 0.6, "yêu": 0.7, "cảm ơn": 0.5, "cám ơn": 0.5, "hiệu quả": 0.6,
+    "tiện": 0.4, "tiện lợi": 0.6, "dễ": 0.4, "dễ dàng": 0.5, "nhanh": 0.3,
+    "thành công": 0.8, "hoàn hảo": 1.0, "chính xác": 0.5, "rõ ràng": 0.4,
+    "hữu ích": 0.6, "tích cực": 0.6, "đồng ý": 0.4, "chắc chắn": 0.3,
+    "hợp lý": 0.4, "nâng cao": 0.3, "cải thiện": 0.4, "hào hứng": 0.7,
+    "tệ": -0.7, "dở": -0.6, "kém": -0.6, "xấu": -0.7, "buồn": -0.6,
+    "chán": -0.6, "ghét": -0.8, "lỗi": -0.5, "sai": -0.5, "hỏng": -0.7,
+    "chậm": -0.4, "khó": -0.3, "khó khăn": -0.5, "phức tạp": -0.3,
+    "thất bại": -0.8, "thất vọng": -0.8, "lo lắng": -0.5, "vấn đề": -0.2,
+    "rắc rối": -0.6, "bực": -0.7, "bực mình": -0.7, "tiêu cực": -0.6,
+    "nguy hiểm": -0.7, "trễ": -0.4, "muộn": -0.3, "tồi": -0.8, "tồi tệ": -1.0,
+}
+
+# Modifiers that scale the next opinion word...
+VIETNAMESE_PRE_INTENSIFIERS = {"rất": 1.3, "cực kỳ": 1.5, "vô cùng": 1.5, "khá": 1.1, "hơi": 0.7}
+# ...or the previous one ("tốt quá", "hay lắm").
+VIETNAMESE_POST_INTENSIFIERS = {"quá": 1.3, "lắm": 1.3}
+
+TOKEN_RE = re.compile(r"\w+(?:'\w+)?|n't", re.UNICODE)
+
+
+def _english_lexicon_path():
+    """Locates TextBlob's pattern lexicon without importing TextBlob itself."""
+    spec = importlib.util.find_spec("textblob")
+    if spec is None or spec.origin is None:
+        return None
+    return os.path.join(os.path.dirname(spec.origin), "en", "en-sentiment.xml")
+
+
+def compile_english_lexicon() -> tuple[dict, dict]:
+    """
+    Averages the per-sense scores of TextBlob's English lexicon.
+
+    Returns:
+        tuple: ({word: polarity}, {adverb: intensity}) for opinion words and
+        intensifiers such as "very".
+    """
+    path = _english_lexicon_path()
+    if path is None or not os.path.exists(path):
+        print("English sentiment lexicon not found; English text will score neutral.")
+        return {}, {}
+
+    polarities, intensities = defaultdict(list), defaultdict(list)
+    for word in ET.parse(path).getroot().iter("word"):
+        form = word.get("form", "").lower()
+        polarities[form].append(float(word.get("polarity", 0)))
+        if word.get("pos") == "RB":
+            intensities[form].append(float(word.get("intensity", 1)))
+
+    lexicon = {form: sum(values) / len(values) for form, values in polarities.items()}
+    intensifiers = {}
+    for form, values in intensities.items():
+        intensity = sum(values) / len(values)
+        if intensity != 1.0:
+            intensifiers[form] = intensity
+    return lexicon, intensifiers
+
+
+def normalize_utterance(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class SentimentEngine:
+    def __init__(self, lexicon: dict, pre_intensifiers: dict, post_intensifiers: dict, negators: set):
+        self.vocabulary = {word: index for index, word in enumerate(lexicon)}
+        self.polarity_table = np.array(list(lexicon.values()) or [0.0], dtype=np.float64)
+        self.pre_intensifiers = pre_intensifiers
+        self.post_intensifiers = post_intensifiers
+        self.negators = negators
+        # First tokens of multi-token phrases, so most tokens need one lookup
+        phrases = list(lexicon) + list(pre_intensifiers)
+        self.phrase_starts = {phrase.split()[0] for phrase in phrases if " " in phrase}
+        self.max_phrase = max((phrase.count(" ") + 1 for phrase in phrases), default=1)
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _match(self, tokens: list, start: int, table: dict):
+        """Returns (value, length) of the longest phrase in `table` at `start`."""
+        if tokens[start] not in self.phrase_starts:
+            value = table.get(tokens[start])
+            return value, 0 if value is None else 1
+        for length in range(min(self.max_phrase, len(tokens) - start), 0, -1):
+            phrase = " ".join(tokens[start:start + length])
+            if phrase in table:
+                return table[phrase], length
+        return None, 0
+
+    def _opinion_words(self, text: str) -> tuple[list, list]:
+        """Returns the lexicon ids and multipliers of the opinion words in one utterance."""
+        tokens = TOKEN_RE.findall(text)
+        ids, multipliers = [], []
+        position = 0
+        negated, intensity = False, 1.0
+        while position < len(tokens):
+            token = tokens[position]
+            if token in self.negators or token.endswith("n't"):
+                negated = True
+                position += 1
+                continue
+            modifier, length = self._match(tokens, position, self.pre_intensifiers)
+            if modifier is not None:
+                intensity *= modifier
+                position += length
+                continue
+            word_id, length = self._match(tokens, position, self.vocabulary)
+            if word_id is None:
+                # Negation and intensity only reach the next word
+                negated, intensity = False, 1.0
+                position += 1
+                continue
+            position += length
+            if position < len(tokens) and tokens[position] in self.post_intensifiers:
+                intensity *= self.post_intensifiers[tokens[position]]
+                position += 1
+            ids.append(word_id)
+            multipliers.append(intensity * (NEGATION_FACTOR if negated else 1.0))
+            negated, intensity = False, 1.0
+        return ids, multipliers
+
+    def _score_batch(self, texts: list) -> np.ndarray:
+        """Scores normalized utterances: mean adjusted polarity of their opinion words."""
+        flat_ids, flat_multipliers, owners = [], [], []
+        for owner, text in enumerate(texts):
+            ids, multipliers = self._opinion_words(text)
+            flat_ids.extend(ids)
+            flat_multipliers.extend(multipliers)
+            owners.extend([owner] * len(ids))
+
+        values = self.polarity_table[np.asarray(flat_ids, dtype=np.intp)] * np.asarray(flat_multipliers)
+        owners = np.asarray(owners, dtype=np.intp)
+        sums = np.bincount(owners, weights=values, minlength=len(texts))
+        counts = np.bincount(owners, minlength=len(texts))
+        polarities = np.divide(sums, counts, out=np.zeros(len(texts)), where=counts > 0)
+        return np.clip(polarities, -1.0, 1.0)
+
+    def polarity(self, texts: list) -> np.ndarray:
+        """Returns one polarity in [-1, 1] per utterance, scoring each distinct text once."""
+        keys = [normalize_utterance(text) for text in texts]
+        with self._lock:
+            missing = list(dict.fromkeys(key for key in keys if key not in self._memo))
+        if missing:
+            scores = self._score_batch(missing)
+            with self._lock:
+                for key, score in zip(missing, scores):
+                    self._memo[key] = float(score)
+                while len(self._memo) > SENTIMENT_MEMO_SIZE:
+                    self._memo.popitem(last=False)
+        with self._lock:
+            result = np.empty(len(keys))
+            for index, key in enumerate(keys):
+                score = self._memo.get(key)
+                if score is None:  # evicted by a concurrent batch; rescore alone
+                    score = float(self._score_batch([key])[0])
+                else:
+                    self._memo.move_to_end(key)
+                result[index] = score
+        return result
+
+
+def categorize_polarities(polarities: np.ndarray) -> np.ndarray:
+    """Vectorized categorize_sentiment, with the same thresholds."""
+    return np.where(
+        polarities > POSITIVE_THRESHOLD,
+        "Positive",
+        np.where(polarities < NEGATIVE_THRESHOLD, "Negative", "Neutral"),
+    )
+
+
+@lazy_singleton
+def get_sentiment_engine() -> SentimentEngine:
+    """Compiles the lexicons once per process."""
+    english_lexicon, english_intensifiers = compile_english_lexicon()
+    return SentimentEngine(
+        {**english_lexicon, **VIETNAMESE_LEXICON},
+        {**english_intensifiers, **VIETNAMESE_PRE_INTENSIFIERS},
+        VIETNAMESE_POST_INTENSIFIERS,
+        ENGLISH_NEGATORS | VIETNAMESE_NEGATORS,
+    )
@@ -1,12 +1,303 @@
+import asyncio
+import json
 import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from types import SimpleNamespace
 
-import google.generativeai as genai
 from dotenv import load_dotenv
+from chunking import chunk_utterances, estimate_tokens
 from google.api_core import exceptions as google_exception
+from llm_cache import get_llm_cache, make_cache_key
+from metrics import (GEMINI_CALL_SECONDS, GEMINI_ERRORS_TOTAL,
+                     LLM_INFLIGHT_CALLS, record_gemini_usage)
+from process_state import lazy_singleton
+from rate_limiter import get_rate_limiter
+from tracing import propagate, span
 from utils import INSTRUCTION
 
 load_dotenv()
 
+MODEL_NAME = "gemini-2.0-flash"
+
+# Define generation configuration for controlling the output.
+GENERATION_CONFIG = {
+    "temperature": 0.5,
+    "top_p": 1,
+    "top_k": 1,
+    "max_output_tokens": 256,  # Adjust as needed
+}
+
+# Structured calls answer several report sections at once, so they get a
+# larger output budget and a JSON response.
+STRUCTURED_GENERATION_CONFIG = {
+    **GENERATION_CONFIG,
+    "max_output_tokens": 2048,
+    "response_mime_type": "application/json",
+}
+
+# The structured output budget grows with the number of list items asked for
+# (e.g. one summary per speaker), up to what the model can return at once; a
+# budget that is too small truncates the JSON and wastes the whole call.
+STRUCTURED_BASE_OUTPUT_TOKENS = 1024
+STRUCTURED_OUTPUT_TOKENS_PER_ITEM = GENERATION_CONFIG["max_output_tokens"]
+STRUCTURED_MAX_OUTPUT_TOKENS = 8192
+
+
+def structured_output_tokens(items: int) -> int:
+    """The max_output_tokens for a structured call that returns `items` list entries."""
+    return min(STRUCTURED_MAX_OUTPUT_TOKENS, STRUCTURED_BASE_OUTPUT_TOKENS + STRUCTURED_OUTPUT_TOKENS_PER_ITEM * items)
+
+
+# "gemini" calls the real API; "fake" uses the in-process stand-in from
+# fake_gemini.py (no key, no quota) for load tests, benchmarks and offline runs.
+SUMMARIZER_BACKEND = os.environ.get("SUMMARIZER_BACKEND", "gemini")
+
+# Cached responses must never cross backends.
+CACHE_MODEL_ID = MODEL_NAME if SUMMARIZER_BACKEND == "gemini" else f"{SUMMARIZER_BACKEND}/{MODEL_NAME}"
+
+
+# ==============================================================================
+# PROCESS-WIDE GEMINI CLIENT AND MODEL REGISTRY
+# ==============================================================================
+# genai.configure() drops the cached API clients (and their open connections),
+# so it runs once per process; model objects are reused per
+# (model_name, generation_config). The registry is reset in forked children
+# because gRPC channels must not be shared across fork.
+
+_client_configured = False
+_models = {}
+_registry_lock = threading.Lock()
+
+
+def _reset_registry():
+    global _client_configured, _models, _registry_lock
+    _client_configured = False
+    _models = {}
+    _registry_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_registry)
+
+
+def _configure_gemini() -> bool:
+    # The SDK takes about a second to import, so it is loaded on first use
+    import google.generativeai as genai
+
+    # Load the API key from an environment variable for security.
+    api_key = os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        return False
+    genai.configure(api_key=api_key)
+    return True
+
+
+def _create_gemini_model(model_name: str, generation_config: dict):
+    import google.generativeai as genai
+
+    return genai.GenerativeModel(model_name=model_name, generation_config=generation_config)
+
+
+def _configure_fake() -> bool:
+    return True
+
+
+def _create_fake_model(model_name: str, generation_config: dict):
+    from fake_gemini import FakeGenerativeModel
+
+    return FakeGenerativeModel(model_name, generation_config)
+
+
+# Backend name -> (configure once per process, create a model object)
+SUMMARIZER_BACKENDS = {
+    "gemini": (_configure_gemini, _create_gemini_model),
+    "fake": (_configure_fake, _create_fake_model),
+}
+if SUMMARIZER_BACKEND not in SUMMARIZER_BACKENDS:
+    raise ValueError(
+        f"Unknown SUMMARIZER_BACKEND {SUMMARIZER_BACKEND!r}; expected one of {', '.join(SUMMARIZER_BACKENDS)}"
+    )
+
+
+def configure_client() -> bool:
+    """Configures the summarizer backend once; returns False if no API key is set."""
+    global _client_configured
+    if _client_configured:
+        return True
+    with _registry_lock:
+        if not _client_configured:
+            configure, _ = SUMMARIZER_BACKENDS[SUMMARIZER_BACKEND]
+            if not configure():
+                return False
+            _client_configured = True
+    return True
+
+
+def get_model(model_name: str = MODEL_NAME, generation_config: dict = GENERATION_CONFIG):
+    """Returns the shared GenerativeModel for this model name and config."""
+    key = (model_name, json.dumps(generation_config, sort_keys=True, default=str))
+    model = _models.get(key)
+    if model is None:
+        with _registry_lock:
+            model = _models.get(key)
+            if model is None:
+                _, create_model = SUMMARIZER_BACKENDS[SUMMARIZER_BACKEND]
+                model = create_model(model_name, generation_config)
+                _models[key] = model
+    return model
+
+
+# ==============================================================================
+# TYPED FAILURES, RETRY AND BACKOFF
+# ==============================================================================
+
+GEMINI_MAX_RETRIES = int(os.environ.get("GEMINI_MAX_RETRIES", "4"))
+GEMINI_BACKOFF_BASE_SECONDS = float(os.environ.get("GEMINI_BACKOFF_BASE_SECONDS", "1"))
+GEMINI_BACKOFF_MAX_SECONDS = float(os.environ.get("GEMINI_BACKOFF_MAX_SECONDS", "30"))
+
+# Quota (429) and transient server-side errors are worth retrying.
+RETRYABLE_ERRORS = (
+    google_exception.ResourceExhausted,
+    google_exception.TooManyRequests,
+    google_exception.InternalServerError,
+    google_exception.BadGateway,
+    google_exception.ServiceUnavailable,
+    google_exception.GatewayTimeout,
+    google_exception.DeadlineExceeded,
+)
+
+NO_CONTENT_SUMMARY = "No content provided for summarization."
+
+
+class SummarizationError(Exception):
+    """Raised when Gemini could not produce a summary; never rendered into a report."""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: float = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class SectionsFailedError(SummarizationError):
+    """Raised when one or more sections of a fan-out failed."""
+
+    def __init__(self, failures: list, total: int):
+        self.failures = failures  # [(section index, SummarizationError)]
+        first_error = failures[0][1]
+        retry_hints = [error.retry_after for _, error in failures if error.retry_after]
+        super().__init__(
+            f"{len(failures)} of {total} section(s) could not be summarized: {first_error}",
+            retryable=all(error.retryable for _, error in failures),
+            retry_after=max(retry_hints) if retry_hints else None,
+        )
+
+
+def retry_after_seconds(error: Exception):
+    """Extracts the server's retry hint (RetryInfo detail or 'retry in Ns') if any."""
+    for detail in getattr(error, "details", None) or []:
+        retry_delay = getattr(detail, "retry_delay", None)
+        if retry_delay is not None:
+            return retry_delay.seconds + retry_delay.nanos / 1e9
+    match = re.search(r"retry in ([0-9.]+)\s*s", str(error), re.IGNORECASE)
+    if match:
+        return float(match.group(1))
+    return None
+
+
+@contextmanager
+def _recorded_call(prompt: str):
+    """Records one generate_content call (set `.response` on the yielded object) in the Gemini metrics."""
+    with span("gemini", prompt_chars=len(prompt)) as current:
+        call = SimpleNamespace(response=None)
+        LLM_INFLIGHT_CALLS.inc()
+        started = time.perf_counter()
+        try:
+            yield call
+        except Exception as e:
+            GEMINI_CALL_SECONDS.labels(outcome="error").observe(time.perf_counter() - started)
+            GEMINI_ERRORS_TOTAL.labels(error=type(e).__name__).inc()
+            raise
+        finally:
+            LLM_INFLIGHT_CALLS.dec()
+        GEMINI_CALL_SECONDS.labels(outcome="ok").observe(time.perf_counter() - started)
+        prompt_tokens, output_tokens = record_gemini_usage(call.response, estimate_tokens(prompt))
+        current.set(prompt_tokens=prompt_tokens, output_tokens=output_tokens)
+
+
+def _generate_once(model, prompt: str):
+    """One generate_content call, recorded in the Gemini metrics."""
+    with _recorded_call(prompt) as call:
+        call.response = model.generate_content(prompt)
+    return call.response
+
+
+def _backoff_delay(error: Exception, attempt: int, limiter) -> float:
+    """
+    Returns how long to wait before retrying a retryable error.
+
+    Raises:
+        SummarizationError: If this was the last attempt.
+    """
+    hint = retry_after_seconds(error)
+    if attempt == GEMINI_MAX_RETRIES:
+        raise SummarizationError(
+            f"Gemini is unavailable or over quota after {attempt + 1} attempts: {error}",
+            retryable=True,
+            retry_after=hint,
+        ) from error
+    # Full jitter, but never sooner than the server asked for
+    delay = random.uniform(0, min(GEMINI_BACKOFF_MAX_SECONDS, GEMINI_BACKOFF_BASE_SECONDS * 2 ** attempt))
+    if hint:
+        delay = max(delay, hint)
+        limiter.pause(hint)
+    print(f"Retryable Gemini error ({type(error).__name__}); retrying in {delay:.1f}s: {error}")
+    return delay
+
+
+def generate_with_retry(model, prompt: str, max_output_tokens: int):
+    """
+    Calls model.generate_content under the shared rate limiter, retrying
+    quota and transient errors with jittered exponential backoff.
+    """
+    limiter = get_rate_limiter()
+    estimated_tokens = estimate_tokens(prompt) + max_output_tokens
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        with span("rate_limit_wait", attempt=attempt):
+            limiter.acquire(estimated_tokens)
+        try:
+            return _generate_once(model, prompt)
+        except RETRYABLE_ERRORS as e:
+            time.sleep(_backoff_delay(e, attempt, limiter))
+
+
+def _cached_result(generation_config: dict, instruction: str, text_to_summarize: str) -> tuple:
+    """Looks a prompt up in the LLM cache; returns (cache or None, cache key, cached value or None)."""
+    cache = get_llm_cache()
+    cache_key = make_cache_key(CACHE_MODEL_ID, generation_config, instruction, text_to_summarize)
+    if cache is None:
+        return None, cache_key, None
+    with span("llm_cache_get") as current:
+        cached = cache.get(cache_key)
+        current.set(hit=cached is not None)
+    return cache, cache_key, cached
+
+
+def _summarization_error(error: Exception) -> SummarizationError:
+    """Translates an unexpected failure of a summary call into a SummarizationError."""
+    if isinstance(error, google_exception.PermissionDenied):
+        print(f"Authentication Error: {error}")
+        return SummarizationError("Permission denied. Please check if your API key is correct and has the necessary permissions.")
+    if isinstance(error, google_exception.InvalidArgument):
+        print(f"Invalid Argument Error: {error}")
+        return SummarizationError(f"The API request was invalid. This might be due to the content sent. Details: {error}")
+    # Any other unexpected error (e.g. a response blocked by safety filters).
+    print(f"An unexpected error occurred: {error}")
+    return SummarizationError(f"An unexpected error occurred during summarization. Details: {error}")
+
 
 def summarize_with_gemini(
     text_to_summarize: str, instruction: str = INSTRUCTION
@@ -19,57 +310,405 @@ def summarize_with_gemini(
         instruction (str): A prompt or instruction for the Gemini model.
 
     Returns:
-        str: The summarized text from the API, or a descriptive error message.
+        str: The summarized text from the API.
+
+    Raises:
+        SummarizationError: If no summary could be produced, even after retries.
     """
     # --- 1. Check for Input Content ---
     if not text_to_summarize or not text_to_summarize.strip():
-        return "Error: No content provided for summarization."
+        return NO_CONTENT_SUMMARY
 
-    try:
-        # --- 2. Configure API Key ---
-        # Load the API key from an environment variable for security.
-        api_key = os.environ.get("GOOGLE_API_KEY")
-        if not api_key:
-            return "Error: GOOGLE_API_KEY environment variable not set. Please configure your API key."
+    # --- Serve repeated requests from the cache ---
+    cache, cache_key, cached_summary = _cached_result(GENERATION_CONFIG, instruction, text_to_summarize)
+    if cached_summary is not None:
+        return cached_summary
 
-        genai.configure(api_key=api_key)
+    # --- 2. Configure API Key (once per process) ---
+    if not configure_client():
+        raise SummarizationError("GOOGLE_API_KEY environment variable not set. Please configure your API key.")
 
+    try:
         # --- 3. Set Up the Model ---
-        # Define generation configuration for controlling the output.
-        generation_config = {
-            "temperature": 0.5,
-            "top_p": 1,
-            "top_k": 1,
-            "max_output_tokens": 256,  # Adjust as needed
-        }
-
-        # Initialize the Generative Model. 'gemini-1.5-flash-latest' is a fast and cost-effective model.
-        model = genai.GenerativeModel(
-            model_name="gemini-2.0-flash", generation_config=generation_config
-        )
+        # The shared 'gemini-2.0-flash' model object is reused across calls.
+        model = get_model(MODEL_NAME, GENERATION_CONFIG)
 
         # --- 4. Create the Prompt and Call the API ---
         # Construct the full prompt for the model.
         prompt = f"{instruction}\n\n---\n\n{text_to_summarize}"
 
-        # Generate the content using the model.
-        response = model.generate_content(prompt)
+        # Generate the content using the model (rate limited, with retries).
+        response = generate_with_retry(model, prompt, GENERATION_CONFIG["max_output_tokens"])
 
         # --- 5. Extract and Return the Summary ---
         summary = response.text.strip()
+        # Only successful responses are cached; errors are retried next time.
+        if cache is not None:
+            cache.set(cache_key, summary)
         return summary
 
     # --- 6. Handle Potential Errors ---
-    except google_exception.PermissionDenied as e:
-        print(f"Authentication Error: {e}")
-        return "Error: Permission denied. Please check if your API key is correct and has the necessary permissions."
-    except google_exception.InvalidArgument as e:
-        print(f"Invalid Argument Error: {e}")
-        return f"Error: The API request was invalid. This might be due to the content sent. Details: {e}"
+    except SummarizationError:
+        raise
+    except Exception as e:
+        raise _summarization_error(e) from e
+
+
+def summarize_structured(
+    text_to_summarize: str,
+    instruction: str,
+    response_schema: dict,
+    max_output_tokens: int = STRUCTURED_GENERATION_CONFIG["max_output_tokens"],
+):
+    """
+    Sends the text once and asks Gemini for a JSON object matching a schema.
+
+    Args:
+        text_to_summarize (str): The text content to be summarized.
+        instruction (str): A prompt describing every field to fill in.
+        response_schema (dict): OpenAPI-style schema of the expected object.
+        max_output_tokens (int): Output budget (see structured_output_tokens).
+
+    Returns:
+        dict | None: The parsed object, or None if the response could not be
+        used (invalid or truncated JSON, or a non-retryable failure), in which
+        case the caller falls back to per-section prompts.
+
+    Raises:
+        SummarizationError: For quota and transient failures (retryable), so
+        callers do not multiply calls while Gemini is unavailable.
+    """
+    if not text_to_summarize or not text_to_summarize.strip():
+        return None
+    if _use_llm_loop():
+        return asyncio.run_coroutine_threadsafe(
+            summarize_structured_async(text_to_summarize, instruction, response_schema, max_output_tokens), _llm_loop
+        ).result()
+
+    generation_config = _structured_config(response_schema, max_output_tokens)
+    cache, cache_key, cached_result = _cached_result(generation_config, instruction, text_to_summarize)
+    if cached_result is not None:
+        return json.loads(cached_result)
+
+    try:
+        if not configure_client():
+            print("Structured summarization skipped: GOOGLE_API_KEY is not set.")
+            return None
+
+        model = get_model(MODEL_NAME, generation_config)
+        response = generate_with_retry(
+            model,
+            f"{instruction}\n\n---\n\n{text_to_summarize}",
+            generation_config["max_output_tokens"],
+        )
+        result = _parse_structured(response)
+    except SummarizationError as e:
+        if e.retryable:
+            raise
+        print(f"Structured summarization failed: {e}")
+        return None
+    except Exception as e:
+        print(f"Structured summarization failed: {e}")
+        return None
+
+    if cache is not None and result is not None:
+        cache.set(cache_key, json.dumps(result, ensure_ascii=False))
+    return result
+
+
+def _structured_config(response_schema: dict, max_output_tokens: int) -> dict:
+    return {
+        **STRUCTURED_GENERATION_CONFIG,
+        "max_output_tokens": max_output_tokens,
+        "response_schema": response_schema,
+    }
+
+
+def _parse_structured(response):
+    """The response as a dict, or None if it is not a JSON object."""
+    result = json.loads(response.text)
+    if not isinstance(result, dict):
+        print("Structured summarization returned a non-object response.")
+        return None
+    return result
+
+
+# ==============================================================================
+# BOUNDED-CONCURRENCY FAN-OUT
+# ==============================================================================
+# Independent report sections are summarized in parallel so report latency
+# tracks the slowest call rather than the sum of all calls. The pool only runs
+# leaf Gemini calls, never tasks that submit more work, so it cannot deadlock.
+
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))
+
+@lazy_singleton
+def _get_executor() -> ThreadPoolExecutor:
+    """Creates the per-process pool lazily, so it is never inherited across fork."""
+    return ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="gemini")
+
+
+def submit_summary(text_to_summarize: str, instruction: str = INSTRUCTION) -> Future:
+    """Schedules summarize_with_gemini on the shared pool (or the LLM event loop) and returns its future."""
+    if _use_llm_loop():
+        # The coroutine's task copies the caller's context, so its spans join the trace
+        return asyncio.run_coroutine_threadsafe(
+            summarize_with_gemini_async(text_to_summarize, instruction), _llm_loop
+        )
+    # Run under the caller's context so the call's spans join its trace
+    return _get_executor().submit(propagate(summarize_with_gemini), text_to_summarize, instruction)
+
+
+def collect_summary(future: Future) -> str:
+    """Waits for one section; any failure surfaces as a SummarizationError."""
+    try:
+        return future.result()
+    except SummarizationError:
+        raise
     except Exception as e:
-        # Catch any other unexpected errors.
         print(f"An unexpected error occurred: {e}")
-        return f"An unexpected error occurred during summarization. Details: {e}"
+        raise SummarizationError(f"An unexpected error occurred during summarization. Details: {e}") from e
+
+
+def _raise_failures(results: list):
+    failures = [
+        (index, result) for index, result in enumerate(results) if isinstance(result, SummarizationError)
+    ]
+    if failures:
+        raise SectionsFailedError(failures, len(results))
+
+
+def summarize_many(jobs: list, return_exceptions: bool = False) -> list:
+    """
+    Summarizes several (text, instruction) pairs concurrently.
+
+    Every job runs to completion even if others fail, so each one reports
+    its own outcome.
+
+    Returns:
+        list: One summary per job, in the order given. With
+        return_exceptions=True a failed job's slot holds its SummarizationError.
+
+    Raises:
+        SectionsFailedError: If any job failed and return_exceptions is False.
+    """
+    futures = [submit_summary(text, instruction) for text, instruction in jobs]
+    results = []
+    for future in futures:
+        try:
+            results.append(collect_summary(future))
+        except SummarizationError as e:
+            results.append(e)
+    if not return_exceptions:
+        _raise_failures(results)
+    return results
+
+
+
+# ==============================================================================
+# ASYNC GEMINI CALLS (ASGI SERVER)
+# ==============================================================================
+# Under the ASGI server (asgi.py) every Gemini call runs as a coroutine on the
+# server's event loop instead of occupying a pool thread, so a process can
+# keep hundreds of calls in flight. Report code stays synchronous: it runs on
+# executor threads and submit_summary/summarize_structured hand the calls to
+# the loop. Cache, rate limits, retries and errors match the sync path.
+
+ASYNC_LLM_MAX_CONCURRENCY = int(os.environ.get("ASYNC_LLM_MAX_CONCURRENCY", "256"))
+
+_llm_loop = None
+_async_slots = None
+
+
+def use_event_loop(loop):
+    """Routes Gemini calls to `loop` (None switches back to the thread pool)."""
+    global _llm_loop, _async_slots
+    _async_slots = asyncio.Semaphore(ASYNC_LLM_MAX_CONCURRENCY) if loop is not None else None
+    _llm_loop = loop
+
+
+def _use_llm_loop() -> bool:
+    """True when calls should go to the LLM loop; never from the loop itself, which would deadlock."""
+    if _llm_loop is None:
+        return False
+    try:
+        return asyncio.get_running_loop() is not _llm_loop
+    except RuntimeError:
+        return True
+
+
+async def _generate_once_async(model, prompt: str):
+    with _recorded_call(prompt) as call:
+        call.response = await model.generate_content_async(prompt)
+    return call.response
+
+
+async def generate_with_retry_async(model, prompt: str, max_output_tokens: int):
+    """generate_with_retry for the event loop: waits for quota and backs off without blocking it."""
+    limiter = get_rate_limiter()
+    estimated_tokens = estimate_tokens(prompt) + max_output_tokens
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        with span("rate_limit_wait", attempt=attempt):
+            await limiter.acquire_async(estimated_tokens)
+        try:
+            async with _async_slots:
+                return await _generate_once_async(model, prompt)
+        except RETRYABLE_ERRORS as e:
+            await asyncio.sleep(_backoff_delay(e, attempt, limiter))
+
+
+async def summarize_with_gemini_async(text_to_summarize: str, instruction: str = INSTRUCTION) -> str:
+    """summarize_with_gemini as a coroutine on the LLM loop."""
+    if not text_to_summarize or not text_to_summarize.strip():
+        return NO_CONTENT_SUMMARY
+
+    # Opening the cache and the SQLite lookup stay off the loop, like the write
+    cache, cache_key, cached_summary = await asyncio.to_thread(
+        _cached_result, GENERATION_CONFIG, instruction, text_to_summarize
+    )
+    if cached_summary is not None:
+        return cached_summary
+    if not configure_client():
+        raise SummarizationError("GOOGLE_API_KEY environment variable not set. Please configure your API key.")
+
+    try:
+        model = get_model(MODEL_NAME, GENERATION_CONFIG)
+        response = await generate_with_retry_async(
+            model, f"{instruction}\n\n---\n\n{text_to_summarize}", GENERATION_CONFIG["max_output_tokens"]
+        )
+        summary = response.text.strip()
+    except SummarizationError:
+        raise
+    except Exception as e:
+        raise _summarization_error(e) from e
+    if cache is not None:
+        # The disk write stays off the loop
+        await asyncio.to_thread(cache.set, cache_key, summary)
+    return summary
+
+
+async def summarize_structured_async(
+    text_to_summarize: str,
+    instruction: str,
+    response_schema: dict,
+    max_output_tokens: int = STRUCTURED_GENERATION_CONFIG["max_output_tokens"],
+):
+    """summarize_structured as a coroutine on the LLM loop."""
+    generation_config = _structured_config(response_schema, max_output_tokens)
+    cache, cache_key, cached_result = await asyncio.to_thread(
+        _cached_result, generation_config, instruction, text_to_summarize
+    )
+    if cached_result is not None:
+        return json.loads(cached_result)
+
+    try:
+        if not configure_client():
+            print("Structured summarization skipped: GOOGLE_API_KEY is not set.")
+            return None
+        model = get_model(MODEL_NAME, generation_config)
+        response = await generate_with_retry_async(
+            model,
+            f"{instruction}\n\n---\n\n{text_to_summarize}",
+            generation_config["max_output_tokens"],
+        )
+        result = _parse_structured(response)
+    except SummarizationError as e:
+        if e.retryable:
+            raise
+        print(f"Structured summarization failed: {e}")
+        return None
+    except Exception as e:
+        print(f"Structured summarization failed: {e}")
+        return None
+
+    if cache is not None and result is not None:
+        await asyncio.to_thread(cache.set, cache_key, json.dumps(result, ensure_ascii=False))
+    return result
+
+
+# ==============================================================================
+# MAP-REDUCE SUMMARIZATION FOR LONG INPUTS
+# ==============================================================================
+
+
+def map_instruction(instruction: str) -> str:
+    return (
+        "Summarize this part of a longer meeting transcript. Keep decisions, action items, "
+        "open questions and who said what, because the partial summaries will be combined later. "
+        "If Vietnamese is used, please write it in Vietnamese.\n"
+        f"The final task will be: {instruction}"
+    )
+
+
+def reduce_instruction(instruction: str) -> str:
+    return (
+        "The following are summaries of consecutive parts of one meeting, in order. "
+        f"Combine them to complete this task for the whole meeting: {instruction}"
+    )
+
+
+def summarize_sections(sections: list, return_exceptions: bool = False) -> list:
+    """
+    Summarizes several (utterance lines, instruction) sections concurrently.
+
+    A section that fits in one chunk is a single call. Longer sections are
+    split along utterance boundaries, every chunk of every section is
+    summarized in parallel (map), and the partial summaries are combined
+    (reduce), repeating until each section fits in one prompt. All calls are
+    issued from the caller's thread, so the shared pool never waits on itself.
+
+    Returns:
+        list: One summary per section, in the order given (failed sections
+        hold their SummarizationError when return_exceptions=True).
+
+    Raises:
+        SectionsFailedError: If any section failed and return_exceptions is False.
+    """
+    instructions = [instruction for _, instruction in sections]
+    pending = [chunk_utterances(lines) for lines, _ in sections]
+    is_partial = [False] * len(sections)
+    results = [None] * len(sections)
+
+    while any(result is None for result in results):
+        jobs, owners = [], []
+        for index, chunks in enumerate(pending):
+            if results[index] is not None:
+                continue
+            if len(chunks) == 1:
+                final_instruction = instructions[index]
+                if is_partial[index]:
+                    final_instruction = reduce_instruction(final_instruction)
+                jobs.append((chunks[0], final_instruction))
+                owners.append((index, False))
+            else:
+                for chunk in chunks:
+                    jobs.append((chunk, map_instruction(instructions[index])))
+                    owners.append((index, True))
+
+        partials = {}
+        for (index, is_map), summary in zip(owners, summarize_many(jobs, return_exceptions=True)):
+            if isinstance(summary, SummarizationError):
+                # A failed chunk fails its whole section; no reduce over gaps
+                if results[index] is None:
+                    results[index] = summary
+            elif is_map:
+                partials.setdefault(index, []).append(summary)
+            else:
+                results[index] = summary
+
+        for index, summaries in partials.items():
+            if results[index] is not None:
+                continue
+            chunks = chunk_utterances(summaries, overlap_tokens=0, separator="\n\n")
+            if len(chunks) >= len(pending[index]):
+                # The partials did not shrink; reduce them in one final call
+                chunks = ["\n\n".join(summaries)]
+            pending[index] = chunks
+            is_partial[index] = True
+
+    if not return_exceptions:
+        _raise_failures(results)
+    return results
 
 
 # --- Example Usage ---
@@ -90,7 +729,10 @@ if __name__ == "__main__":
     """
 
     print("--- Summarizing Sample Text ---")
-    summary_result = summarize_with_gemini(sample_text)
+    try:
+        summary_result = summarize_with_gemini(sample_text)
+    except SummarizationError as e:
+        summary_result = f"Summarization failed: {e}"
 
     # Print the result in a formatted way.
     print("\n--- ORIGINAL TEXT ---")
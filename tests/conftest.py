@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+# The modules read their configuration at import time, so the test settings
+# must be in place before anything from the app is imported.
+_runtime_dir = tempfile.mkdtemp(prefix="ai-server-tests-")
+os.environ.setdefault("SUMMARIZER_BACKEND", "fake")
+os.environ.setdefault("GEMINI_RPM", "100000")
+os.environ.setdefault("FAKE_GEMINI_LATENCY_MEDIAN_SECONDS", "0.01")
+os.environ.setdefault("WARMUP_ON_BOOT", "0")
+os.environ.setdefault("REPORT_JOB_WORKERS", "0")
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(_runtime_dir, "llm_cache.sqlite3"))
+os.environ.setdefault("ARTIFACT_CACHE_DIR", os.path.join(_runtime_dir, "artifacts"))
+os.environ.setdefault("REPORT_JOBS_DB", os.path.join(_runtime_dir, "report_jobs.sqlite3"))
+os.environ.setdefault("REPORT_JOBS_DIR", os.path.join(_runtime_dir, "jobs"))
+os.environ.setdefault("MEETING_SESSIONS_DB", os.path.join(_runtime_dir, "meeting_sessions.sqlite3"))
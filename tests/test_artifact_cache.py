@@ -0,0 +1,120 @@
+import io
+import threading
+import time
+
+import pytest
+
+import app as app_module
+import artifact_cache
+from benchmark import generate_meeting
+
+
+@pytest.fixture(autouse=True)
+def artifact_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_cache, "ARTIFACT_CACHE_DIR", str(tmp_path / "artifacts"))
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def report_request(seed=1):
+    return {"report_type": "Normal", "report_format": "PDF", "meeting_data": generate_meeting(30, 2, "en", seed)}
+
+
+def wait_for_artifact(key, timeout=5):
+    deadline = time.monotonic() + timeout
+    while artifact_cache.get_artifact(key) is None and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return artifact_cache.get_artifact(key)
+
+
+def test_report_evicted_right_after_generation_is_still_served(client, monkeypatch):
+    # Every artifact is evicted as soon as it is written (as with a tiny ARTIFACT_CACHE_MAX_BYTES)
+    evict = artifact_cache.evict_artifacts
+    monkeypatch.setattr(artifact_cache, "evict_artifacts", lambda: evict(max_bytes=0))
+
+    response = client.post("/report", json=report_request())
+    assert response.status_code == 200
+    assert response.data.startswith(b"%PDF")
+    assert response.headers["ETag"]
+
+
+def test_repeat_request_is_served_from_the_cache_and_revalidated(client, monkeypatch):
+    first = client.post("/report", json=report_request())
+    assert first.status_code == 200
+    etag = first.headers["ETag"].strip('"')
+    assert wait_for_artifact(etag) is not None
+
+    monkeypatch.setattr(app_module, "generate_report_stream", lambda *args, **kwargs: pytest.fail("regenerated"))
+    second = client.post("/report", json=report_request())
+    assert second.status_code == 200 and second.data == first.data
+
+    not_modified = client.post("/report", json=report_request(), headers={"If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304
+
+
+def test_concurrent_identical_requests_generate_once(monkeypatch):
+    calls = []
+
+    def slow_generate(meeting_data, **kwargs):
+        calls.append(1)
+        time.sleep(0.2)
+        return io.BytesIO(b"%PDF-report"), 11, "report.pdf"
+
+    monkeypatch.setattr(app_module, "generate_report_stream", slow_generate)
+    request = {**report_request(), "interval_minutes": 5}
+    key = artifact_cache.artifact_key(request["meeting_data"], "Normal", "PDF", 5)
+
+    bodies = []
+    threads = [
+        threading.Thread(target=lambda: bodies.append(app_module.generate_cached_report(key, request)[0].read()))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert bodies == [b"%PDF-report"] * 4
+
+
+def test_generation_locks_are_per_key():
+    held = artifact_cache.acquire_generation_lock("a" * 64)
+    try:
+        # A key that shared a stripe with the held one used to wait for it
+        acquired = threading.Event()
+
+        def other_key():
+            artifact_cache.release_generation_lock(artifact_cache.acquire_generation_lock("a" * 8 + "b" * 56))
+            acquired.set()
+
+        threading.Thread(target=other_key, daemon=True).start()
+        assert acquired.wait(2)
+    finally:
+        artifact_cache.release_generation_lock(held)
+
+
+def test_failed_cache_write_does_not_fail_the_report(client, monkeypatch):
+    def full_disk(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(artifact_cache, "put_artifact", full_disk)
+    response = client.post("/report", json=report_request(seed=2))
+    assert response.status_code == 200
+    assert response.data.startswith(b"%PDF")
+
+
+@pytest.mark.parametrize(
+    "setting, value",
+    [("NORMAL_REPORT_MODE", "sections"), ("OVERALL_SUMMARY_SOURCE", "transcript")],
+)
+def test_normal_report_key_depends_on_how_it_is_summarized(monkeypatch, setting, value):
+    meeting = generate_meeting(20, 2, "en", seed=3)
+    normal = artifact_cache.artifact_key(meeting, "Normal", "PDF", 5)
+    sentiment = artifact_cache.artifact_key(meeting, "Sentiment", "PDF", 5)
+    monkeypatch.setattr(artifact_cache, setting, value)
+
+    assert artifact_cache.artifact_key(meeting, "Normal", "PDF", 5) != normal
+    assert artifact_cache.artifact_key(meeting, "Sentiment", "PDF", 5) == sentiment
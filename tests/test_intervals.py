@@ -0,0 +1,60 @@
+import pytest
+
+from app import parse_bundle_request, parse_report_request
+from report_generator import bucket_transcript_by_interval
+from utils import SAMPLE_DATA_ENG
+
+
+def entry(name: str, time_of_day: str) -> dict:
+    return {
+        "name": name,
+        "content": f"Update from {name} at {time_of_day}.",
+        "timeStamp": f"2024-09-29T{time_of_day}.000Z",
+    }
+
+
+def test_out_of_order_entries_land_in_their_own_window():
+    entries = [
+        entry("Ana", "12:07:00"),
+        entry("Ben", "12:01:00"),  # earliest, but arrives second
+        entry("Cho", "12:03:00"),
+        entry("Ana", "12:21:00"),
+        entry("Ben", "12:05:59"),
+    ]
+
+    intervals = bucket_transcript_by_interval(entries, 5)
+
+    # Windows start at the earliest entry and empty windows are skipped
+    assert [interval["indices"] for interval in intervals] == [[1, 2, 4], [0], [3]]
+    assert [interval["start"].strftime("%H:%M") for interval in intervals] == ["12:01", "12:06", "12:21"]
+    assert intervals[0]["label"] == "12:01 PM - 12:06 PM"
+
+
+def test_entries_with_the_same_timestamp_keep_arrival_order():
+    entries = [entry("Ana", "12:01:00"), entry("Ben", "12:00:00"), entry("Cho", "12:01:00")]
+
+    assert bucket_transcript_by_interval(entries, 1)[1]["indices"] == [0, 2]
+
+
+@pytest.mark.parametrize("interval_minutes", [None, "5", 0])
+def test_interval_minutes_is_ignored_by_other_report_types(interval_minutes):
+    request = {"meeting_data": SAMPLE_DATA_ENG, "report_type": "Normal", "report_format": "PDF",
+               "interval_minutes": interval_minutes}
+
+    assert parse_report_request(request)["report_type"] == "Normal"
+
+
+def test_interval_report_validates_interval_minutes():
+    request = {"meeting_data": SAMPLE_DATA_ENG, "report_type": "interval", "report_format": "PDF"}
+
+    assert parse_report_request({**request, "interval_minutes": None})["interval_minutes"] == 5
+    with pytest.raises(ValueError, match="interval_minutes"):
+        parse_report_request({**request, "interval_minutes": "5"})
+
+
+def test_bundle_validates_interval_minutes_only_with_an_interval_report():
+    request = {"meeting_data": SAMPLE_DATA_ENG, "interval_minutes": "5"}
+
+    parse_bundle_request({**request, "reports": [["Normal", "PDF"], ["Sentiment", "DOCX"]]})
+    with pytest.raises(ValueError, match="interval_minutes"):
+        parse_bundle_request({**request, "reports": [["Normal", "PDF"], ["Interval", "PDF"]]})
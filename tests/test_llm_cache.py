@@ -0,0 +1,56 @@
+import threading
+import time
+
+from llm_cache import LLMCache
+
+
+def make_cache(tmp_path, **kwargs) -> LLMCache:
+    return LLMCache(path=str(tmp_path / "llm_cache.sqlite3"), **kwargs)
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, memory_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert list(cache._memory) == ["a", "c"]
+    # The evicted entry is still on disk
+    assert cache.get("b") == "2"
+    assert cache.snapshot()["disk_hits"] == 1
+
+
+def test_disk_tier_evicts_least_recently_used_over_budget(tmp_path):
+    cache = make_cache(tmp_path, memory_entries=0, disk_max_bytes=10)
+    cache.set("a", "xxxx")
+    time.sleep(0.01)
+    cache.set("b", "xxxx")
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("c", "xxxx")
+
+    assert cache.get("a") == "xxxx"
+    assert cache.get("b") is None
+    assert cache.get("c") == "xxxx"
+
+
+def test_expired_entries_are_misses_in_both_tiers(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=0)
+    cache.set("a", "1")
+
+    assert cache.get("a") is None
+    assert cache.snapshot()["misses"] == 1
+
+
+def test_each_thread_uses_its_own_connection(tmp_path):
+    cache = make_cache(tmp_path, memory_entries=0)
+    cache.set("a", "1")
+    results = []
+    thread = threading.Thread(target=lambda: results.append((cache.get("a"), cache._connect())))
+    thread.start()
+    thread.join()
+
+    assert results[0][0] == "1"
+    assert results[0][1] is not cache._connect()
@@ -0,0 +1,101 @@
+import pytest
+
+import chunking
+import report_generator
+import summary_llm
+from summary_llm import SummarizationError, summarize_sections
+
+CHUNK_TOKENS = 50
+
+
+class FakeModel:
+    """Stands in for summarize_many and records every round of (text, instruction) jobs."""
+
+    def __init__(self):
+        self.rounds = []
+        self.reply = lambda text, instruction: f"summary of {len(text)} characters"
+
+    def summarize_many(self, jobs, return_exceptions=False):
+        self.rounds.append(list(jobs))
+        results = []
+        for text, instruction in jobs:
+            try:
+                results.append(self.reply(text, instruction))
+            except SummarizationError as e:
+                results.append(e)
+        return results
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(
+        summary_llm,
+        "chunk_utterances",
+        lambda lines, **kwargs: chunking.chunk_utterances(lines, chunk_tokens=CHUNK_TOKENS, **kwargs),
+    )
+    monkeypatch.setattr(summary_llm, "summarize_many", fake.summarize_many)
+    return fake
+
+
+def utterances(count: int) -> list:
+    return [f"Speaker {index % 3}: we reviewed item {index} of the release plan today." for index in range(count)]
+
+
+def test_short_section_is_a_single_call(model):
+    summarize_sections([(utterances(2), "Summarize.")])
+
+    assert model.rounds == [[(" ".join(utterances(2)), "Summarize.")]]
+
+
+def test_long_section_is_mapped_then_reduced(model):
+    summarize_sections([(utterances(40), "Summarize.")])
+
+    map_round, reduce_round = model.rounds[0], model.rounds[-1]
+    assert len(map_round) > 1
+    assert all(chunking.estimate_tokens(text) <= CHUNK_TOKENS for text, _ in map_round)
+    assert [instruction for _, instruction in reduce_round] == [summary_llm.reduce_instruction("Summarize.")]
+
+
+def test_partials_that_do_not_shrink_end_in_one_final_reduce(model):
+    # Each partial is as long as its chunk, so the partials never fit one prompt
+    model.reply = lambda text, instruction: text
+
+    summarize_sections([(utterances(40), "Summarize.")])
+
+    assert len(model.rounds) == 2
+    assert [instruction for _, instruction in model.rounds[1]] == [summary_llm.reduce_instruction("Summarize.")]
+
+
+def test_a_failed_chunk_fails_only_its_section(model):
+    def reply(text, instruction):
+        if "item 30 " in text:
+            raise SummarizationError("chunk failed")
+        return "ok"
+
+    model.reply = reply
+
+    long_result, short_result = summarize_sections(
+        [(utterances(40), "Summarize."), (utterances(2), "Summarize.")], return_exceptions=True
+    )
+    assert isinstance(long_result, SummarizationError)
+    assert short_result == "ok"
+    # No reduce over a section with a gap
+    assert len(model.rounds) == 1
+
+
+def test_long_interval_is_map_reduced(model):
+    entries = [
+        {
+            "name": f"Speaker {index % 3}",
+            "content": f"we reviewed item {index} of the release plan today.",
+            "timeStamp": f"2024-09-29T12:{index // 10:02d}:{index % 10:02d}.000Z",
+        }
+        for index in range(40)
+    ]
+
+    summaries = report_generator.generate_interval_summaries(entries, 60)
+
+    assert len(summaries) == 1
+    assert len(model.rounds[0]) > 1
+    assert all(chunking.estimate_tokens(text) <= CHUNK_TOKENS for jobs in model.rounds for text, _ in jobs)
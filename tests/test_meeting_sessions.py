@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+import app as app_module
+import meeting_sessions
+import report_generator
+from meeting_sessions import append_entries, create_session, end_session, get_session
+
+META = {"meetingTitle": "Weekly-Sync", "convenor": "Ana"}
+
+
+@pytest.fixture(autouse=True)
+def session_database(tmp_path, monkeypatch):
+    """A fresh session database; claimed windows are recorded instead of summarized."""
+    monkeypatch.setattr(meeting_sessions, "MEETING_SESSIONS_DB", str(tmp_path / "sessions.sqlite3"))
+    monkeypatch.setattr(meeting_sessions, "_local", threading.local())
+    monkeypatch.setattr(meeting_sessions, "MEETING_WINDOW_GRACE_SECONDS", 15)
+    claims = []
+    monkeypatch.setattr(
+        meeting_sessions, "_summarize_windows", lambda session_id, claimed: claims.append(claimed)
+    )
+    return claims
+
+
+def captions(*times: str) -> list:
+    return [
+        {
+            "name": "Ana",
+            "content": f"Status update given at {time_of_day} today.",
+            "timeStamp": f"2024-09-29T12:{time_of_day}.000Z",
+        }
+        for time_of_day in times
+    ]
+
+
+def claimed_windows(claims) -> list:
+    return [[window_index for window_index, _, _ in claimed] for claimed in claims]
+
+
+def test_window_is_claimed_once_it_closes(session_database):
+    session = create_session(META, 1)
+
+    append_entries(session["session_id"], captions("00:00", "00:30", "01:05"))
+    # 01:10 is still within the grace period after window 0 ends at 01:00
+    append_entries(session["session_id"], captions("01:10"))
+    append_entries(session["session_id"], captions("01:20"))
+    # Window 0 is not claimed a second time
+    append_entries(session["session_id"], captions("02:40"))
+
+    assert claimed_windows(session_database) == [[], [], [0], [1]]
+    assert [interval["status"] for interval in get_session(session["session_id"])["intervals"]] == ["pending"] * 2
+
+
+def test_late_caption_reopens_its_window(session_database):
+    session_id = create_session(META, 1)["session_id"]
+    append_entries(session_id, captions("00:00", "01:20"))
+    (window_index, first_key, _), = session_database[-1]
+    meeting_sessions._store_window_summary(session_id, window_index, first_key, "first summary")
+
+    append_entries(session_id, captions("00:40"))
+
+    (reclaimed_index, second_key, lines), = session_database[-1]
+    assert reclaimed_index == window_index and second_key != first_key
+    assert len(lines) == 2
+    # The summary of the old text is stale and no longer stored under the window
+    meeting_sessions._store_window_summary(session_id, window_index, first_key, "first summary")
+    assert meeting_sessions.known_interval_summaries(session_id, wait_seconds=0) == {}
+
+
+def test_stale_pending_window_is_claimed_again(session_database, monkeypatch):
+    session_id = create_session(META, 1)["session_id"]
+    append_entries(session_id, captions("00:00", "01:20"))
+    assert claimed_windows(session_database)[-1] == [0]
+
+    monkeypatch.setattr(meeting_sessions, "MEETING_PENDING_STALE_SECONDS", 0)
+    time.sleep(0.01)
+    end_session(session_id)
+
+    assert claimed_windows(session_database)[-1] == [0, 1]
+
+
+def test_whole_interval_minutes_are_reported_as_an_int(session_database):
+    session_id = create_session(META, 5)["session_id"]
+    append_entries(session_id, captions("00:00", "01:00", "02:00"))
+    end_session(session_id)
+
+    client = app_module.app.test_client()
+    assert client.get(f"/meetings/{session_id}").get_json()["interval_minutes"] == 5
+    assert create_session(META, 2.5)["interval_minutes"] == 2.5
+
+    meeting_data = meeting_sessions.session_meeting_data(session_id)
+    document = report_generator.build_report(meeting_data, "Interval", get_session(session_id)["interval_minutes"])
+    assert "(5-Minute Intervals)" in document.title
@@ -0,0 +1,99 @@
+import pytest
+
+import report_generator
+from summary_llm import SummarizationError
+
+TRANSCRIPT = [
+    {"name": "Ana", "content": "We agreed to ship the importer next week.", "timeStamp": "2024-09-29T12:21:37.000Z"},
+    {"name": "Ben", "content": "I will write the migration guide for it.", "timeStamp": "2024-09-29T12:22:37.000Z"},
+    {"name": "Cho", "content": "Support needs the release notes by Friday.", "timeStamp": "2024-09-29T12:23:37.000Z"},
+]
+
+
+@pytest.fixture
+def sections(monkeypatch):
+    """Records every per-section prompt and answers it with its instruction."""
+    calls = []
+
+    def fake_summarize_sections(sections):
+        calls.extend(sections)
+        return [f"fallback: {instruction}" for _, instruction in sections]
+
+    monkeypatch.setattr(report_generator, "NORMAL_REPORT_MODE", "structured")
+    monkeypatch.setattr(report_generator, "summarize_sections", fake_summarize_sections)
+    return calls
+
+
+def structured_response(monkeypatch, response):
+    monkeypatch.setattr(report_generator, "summarize_structured", lambda *args, **kwargs: response)
+
+
+def test_complete_structured_response_needs_no_fallback(monkeypatch, sections):
+    structured_response(monkeypatch, {
+        "executive_summary": "Overall.",
+        "key_takeaways": "Takeaways.",
+        "speaker_summaries": [{"speaker": name, "summary": f"{name} spoke."} for name in ("Ana", "Ben", "Cho")],
+    })
+
+    overall, takeaways, speakers = report_generator.generate_normal_sections(TRANSCRIPT, {})
+
+    assert (overall, takeaways) == ("Overall.", "Takeaways.")
+    assert speakers["Ben"]["summary"] == "Ben spoke."
+    assert sections == []
+
+
+def test_missing_fields_fall_back_to_their_own_prompts(monkeypatch, sections):
+    structured_response(monkeypatch, {
+        "executive_summary": "Overall.",
+        "key_takeaways": "  ",
+        "speaker_summaries": [{"speaker": "Ana", "summary": "Ana spoke."}, {"speaker": "Zed", "summary": "Unknown."}],
+    })
+
+    overall, takeaways, speakers = report_generator.generate_normal_sections(TRANSCRIPT, {})
+
+    assert overall == "Overall."
+    assert takeaways.startswith("fallback:")
+    assert speakers["Ana"]["summary"] == "Ana spoke."
+    assert "Ben" in speakers["Ben"]["summary"] and "Cho" in speakers["Cho"]["summary"]
+    assert "Zed" not in speakers
+    assert len(sections) == 3
+
+
+def test_unparseable_structured_response_falls_back_for_every_section(monkeypatch, sections):
+    structured_response(monkeypatch, None)
+
+    overall, takeaways, speakers = report_generator.generate_normal_sections(TRANSCRIPT, {})
+
+    assert overall.startswith("fallback:") and takeaways.startswith("fallback:")
+    assert all(entry["summary"].startswith("fallback:") for entry in speakers.values())
+    assert len(sections) == 5
+
+
+def test_speakers_past_the_structured_limit_get_their_own_prompts(monkeypatch, sections):
+    monkeypatch.setattr(report_generator, "STRUCTURED_MAX_SPEAKERS", 1)
+    asked = []
+
+    def summarize_structured(text, instruction, schema, max_output_tokens):
+        asked.append(instruction)
+        return {"executive_summary": "Overall.", "key_takeaways": "Takeaways.",
+                "speaker_summaries": [{"speaker": name, "summary": f"{name} spoke."} for name in ("Ana", "Ben")]}
+
+    monkeypatch.setattr(report_generator, "summarize_structured", summarize_structured)
+
+    _, _, speakers = report_generator.generate_normal_sections(TRANSCRIPT, {})
+
+    # Only the first speaker was requested, so Ben's unrequested answer is ignored
+    assert speakers["Ana"]["summary"] == "Ana spoke."
+    assert speakers["Ben"]["summary"].startswith("fallback:")
+    assert len(sections) == 2
+
+
+def test_quota_failure_of_the_structured_call_is_raised(monkeypatch, sections):
+    def busy(*args, **kwargs):
+        raise SummarizationError("quota exhausted", retryable=True)
+
+    monkeypatch.setattr(report_generator, "summarize_structured", busy)
+
+    with pytest.raises(SummarizationError):
+        report_generator.generate_normal_sections(TRANSCRIPT, {})
+    assert sections == []
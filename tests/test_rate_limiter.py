@@ -0,0 +1,112 @@
+import pytest
+from google.api_core import exceptions as google_exception
+
+import summary_llm
+from rate_limiter import RateLimiter, TokenBucket
+from summary_llm import SummarizationError, generate_with_retry
+
+
+def test_bucket_queues_callers_once_empty():
+    bucket = TokenBucket(capacity=2, refill_per_second=1)
+    now = bucket.updated_at
+
+    assert bucket.reserve(1, now) == 0
+    assert bucket.reserve(1, now) == 0
+    # Each further reservation waits for the tokens booked before it
+    assert bucket.reserve(1, now) == pytest.approx(1)
+    assert bucket.reserve(1, now) == pytest.approx(2)
+
+
+def test_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(capacity=2, refill_per_second=1)
+    now = bucket.updated_at
+    bucket.reserve(2, now)
+
+    assert bucket.reserve(1, now + 1) == 0
+    assert bucket.reserve(2, now + 100) == 0
+    assert bucket.reserve(1, now + 100) == pytest.approx(1)
+
+
+def test_oversized_reservation_waits_for_at_most_a_full_bucket():
+    bucket = TokenBucket(capacity=10, refill_per_second=1)
+    now = bucket.updated_at
+
+    assert bucket.reserve(50, now) == 0
+    assert bucket.reserve(50, now) == pytest.approx(10)
+
+
+def test_quota_is_split_across_worker_processes():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=60000, processes=4)
+
+    assert limiter.requests.capacity == 15
+    assert limiter.tokens.capacity == 15000
+
+
+def test_pause_holds_back_every_caller():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10**6)
+    limiter.pause(5)
+
+    assert limiter.reserve(1) == pytest.approx(5, abs=0.1)
+    assert limiter.reserve(1) == pytest.approx(5, abs=0.1)
+
+
+class FlakyModel:
+    """Fails with the given errors in turn, then answers."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "response"
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """A fresh, generous limiter, and no real sleeping (the delays are recorded instead)."""
+    limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=10**9)
+    limiter.sleeps = []
+    monkeypatch.setattr(summary_llm, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(summary_llm.time, "sleep", limiter.sleeps.append)
+    monkeypatch.setattr(summary_llm, "_generate_once", lambda model, prompt: model.generate_content(prompt))
+    return limiter
+
+
+def test_retryable_errors_are_retried_with_backoff(limiter, monkeypatch):
+    monkeypatch.setattr(summary_llm, "GEMINI_BACKOFF_BASE_SECONDS", 1)
+    model = FlakyModel(google_exception.ServiceUnavailable("down"), google_exception.InternalServerError("oops"))
+
+    assert generate_with_retry(model, "prompt", 100) == "response"
+    assert model.calls == 3
+    # Full jitter: attempt n waits at most base * 2 ** n
+    assert len(limiter.sleeps) == 2
+    assert 0 <= limiter.sleeps[0] <= 1 and 0 <= limiter.sleeps[1] <= 2
+
+
+def test_server_retry_hint_is_honoured_and_pauses_the_limiter(limiter):
+    model = FlakyModel(google_exception.ResourceExhausted("Quota exceeded, please retry in 7s."))
+
+    assert generate_with_retry(model, "prompt", 100) == "response"
+    assert limiter.sleeps[0] >= 7
+    assert limiter.paused_until > 0
+
+
+def test_last_retryable_failure_is_raised_as_retryable(limiter, monkeypatch):
+    monkeypatch.setattr(summary_llm, "GEMINI_MAX_RETRIES", 2)
+    model = FlakyModel(*[google_exception.ResourceExhausted("Quota exceeded, retry in 3s") for _ in range(3)])
+
+    with pytest.raises(SummarizationError) as raised:
+        generate_with_retry(model, "prompt", 100)
+    assert model.calls == 3
+    assert raised.value.retryable and raised.value.retry_after == 3
+
+
+def test_non_retryable_errors_are_not_retried(limiter):
+    model = FlakyModel(google_exception.InvalidArgument("bad prompt"))
+
+    with pytest.raises(google_exception.InvalidArgument):
+        generate_with_retry(model, "prompt", 100)
+    assert model.calls == 1
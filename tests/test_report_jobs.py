@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import report_jobs
+
+REQUEST = {"meeting_data": {}, "report_type": "Normal", "report_format": "PDF", "interval_minutes": 5}
+
+
+@pytest.fixture(autouse=True)
+def job_database(tmp_path, monkeypatch):
+    """A fresh job database and result directory for every test."""
+    monkeypatch.setattr(report_jobs, "REPORT_JOBS_DB", str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(report_jobs, "REPORT_JOBS_DIR", str(tmp_path / "results"))
+    monkeypatch.setattr(report_jobs, "_local", threading.local())
+
+
+def test_same_idempotency_key_returns_the_same_job():
+    job, created = report_jobs.submit_job(REQUEST, "key-1")
+    again, created_again = report_jobs.submit_job(REQUEST, "key-1")
+    assert created and not created_again
+    assert again["job_id"] == job["job_id"]
+    assert report_jobs.queue_depth() == 1
+
+
+def test_failed_job_is_queued_again_on_resubmit():
+    job, _ = report_jobs.submit_job(REQUEST, "key-1")
+    report_jobs.run_job(report_jobs._claim_next_job())  # empty meeting_data fails
+    assert report_jobs.get_job(job["job_id"])["status"] == "failed"
+
+    retried, created = report_jobs.submit_job({**REQUEST, "report_type": "Sentiment"}, "key-1")
+    assert created
+    assert retried["job_id"] == job["job_id"]
+    assert retried["status"] == "queued" and retried["error"] is None
+    assert json.loads(report_jobs._claim_next_job()["request"])["report_type"] == "Sentiment"
+
+
+def test_stale_running_job_is_requeued(monkeypatch):
+    job, _ = report_jobs.submit_job(REQUEST)
+    assert report_jobs._claim_next_job()["id"] == job["job_id"]
+    assert report_jobs._claim_next_job() is None
+
+    monkeypatch.setattr(report_jobs, "REPORT_JOB_STALE_SECONDS", 0)
+    time.sleep(0.01)
+    assert report_jobs._claim_next_job()["id"] == job["job_id"]
+
+
+def test_heartbeat_keeps_a_long_job_from_going_stale(monkeypatch):
+    monkeypatch.setattr(report_jobs, "REPORT_JOB_HEARTBEAT_SECONDS", 0.05)
+    monkeypatch.setattr(report_jobs, "REPORT_JOB_STALE_SECONDS", 0.5)
+    job, _ = report_jobs.submit_job(REQUEST)
+    report_jobs._claim_next_job()
+    with report_jobs._heartbeat(job["job_id"]):
+        time.sleep(1)
+        assert report_jobs._claim_next_job() is None
+    assert report_jobs.get_job(job["job_id"])["status"] == "running"
+
+
+def test_cleanup_deletes_expired_jobs_and_files():
+    job, _ = report_jobs.submit_job(REQUEST)
+    report_jobs._claim_next_job()
+    os.makedirs(report_jobs.REPORT_JOBS_DIR)
+    result_path = os.path.join(report_jobs.REPORT_JOBS_DIR, f"{job['job_id']}.pdf")
+    open(result_path, "wb").close()
+    report_jobs._update_job(job["job_id"], status="done", result_path=result_path)
+    queued, _ = report_jobs.submit_job(REQUEST)
+
+    assert report_jobs.cleanup_jobs(ttl_seconds=3600) == 0
+    time.sleep(0.01)
+    assert report_jobs.cleanup_jobs(ttl_seconds=0) == 1
+    assert report_jobs.get_job(job["job_id"]) is None
+    assert not os.path.exists(result_path)
+    # Jobs still waiting for a worker never expire
+    assert report_jobs.get_job(queued["job_id"])["status"] == "queued"
+
+
+def test_finished_report_downloads_from_any_working_directory(tmp_path, monkeypatch):
+    import app as app_module
+    from utils import SAMPLE_DATA_ENG
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(report_jobs, "REPORT_JOBS_DIR", "results")
+    job, _ = report_jobs.submit_job({**REQUEST, "meeting_data": SAMPLE_DATA_ENG})
+    report_jobs.run_job(report_jobs._claim_next_job())
+    assert report_jobs.get_job(job["job_id"])["status"] == "done"
+
+    (tmp_path / "elsewhere").mkdir()
+    monkeypatch.chdir(tmp_path / "elsewhere")
+    response = app_module.app.test_client().get(f"/reports/{job['job_id']}/download")
+    assert response.status_code == 200
+    assert response.data.startswith(b"%PDF")
+    assert "attachment" in response.headers["Content-Disposition"]
@@ -0,0 +1,90 @@
+import gzip
+import json
+
+import pytest
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+
+from request_body import READ_CHUNK_BYTES, RequestBodyReader
+
+
+def read(body: bytes, mimetype="application/json", encoding=None, max_bytes=1024 * 1024, chunk_size=7):
+    reader = RequestBodyReader(mimetype, encoding, max_bytes)
+    for start in range(0, len(body), chunk_size):
+        reader.feed(body[start : start + chunk_size])
+    return reader.close(), reader
+
+
+REQUEST = {"report_type": "Normal", "report_format": "PDF", "meeting_data": {"meetingTitle": "Sync"}}
+ENTRIES = [{"name": "Alex", "content": f"Line {i}.", "timeStamp": "2024-09-29T12:00:05.000Z"} for i in range(20)]
+
+
+def ndjson_body() -> bytes:
+    return "\n".join(json.dumps(line) for line in [REQUEST] + ENTRIES).encode()
+
+
+def test_gzip_json_body():
+    body = {**REQUEST, "meeting_data": {**REQUEST["meeting_data"], "transcriptData": ENTRIES}}
+    data, reader = read(gzip.compress(json.dumps(body).encode()), encoding="gzip")
+    assert data == body
+    assert reader.parser.entries == len(ENTRIES)
+
+
+def test_ndjson_lines_split_across_chunks():
+    data, reader = read(ndjson_body(), mimetype="application/x-ndjson", chunk_size=5)
+    assert data["meeting_data"]["transcriptData"] == ENTRIES
+    assert data["meeting_data"]["meetingTitle"] == "Sync"
+    assert reader.parser.entries == len(ENTRIES)
+
+
+def test_concatenated_gzip_members():
+    body = ndjson_body()
+    middle = body.index(b"\n", len(body) // 2) + 1
+    data, _ = read(
+        gzip.compress(body[:middle]) + gzip.compress(body[middle:]), mimetype="application/x-ndjson", encoding="gzip"
+    )
+    assert data["meeting_data"]["transcriptData"] == ENTRIES
+
+
+def test_gzip_bomb_is_rejected_while_decompressing():
+    bomb = gzip.compress(b" " * (10 * 1024 * 1024))
+    assert len(bomb) < 64 * 1024
+    reader = RequestBodyReader("application/json", "gzip", max_bytes=64 * 1024)
+    with pytest.raises(RequestEntityTooLarge):
+        reader.feed(bomb)
+    # Output is bounded per decompression step, so at most one step past the limit was produced
+    assert reader.decoder.decoded_bytes <= 64 * 1024 + READ_CHUNK_BYTES
+
+
+def test_raw_body_over_the_limit():
+    with pytest.raises(RequestEntityTooLarge):
+        read(b" " * 2000, max_bytes=1000)
+
+
+def test_truncated_gzip():
+    with pytest.raises(ValueError, match="truncated"):
+        read(gzip.compress(ndjson_body())[:-20], mimetype="application/x-ndjson", encoding="gzip")
+
+
+def test_corrupt_gzip():
+    with pytest.raises(ValueError, match="Invalid gzip"):
+        read(b"\x1f\x8b\x08\x00not really gzip", encoding="gzip")
+
+
+def test_unsupported_encoding():
+    with pytest.raises(UnsupportedMediaType):
+        RequestBodyReader("application/json", "br")
+
+
+def test_invalid_ndjson_line_is_reported():
+    with pytest.raises(ValueError, match="line 3"):
+        read(ndjson_body().replace(b"Line 1.", b'Line 1."'), mimetype="application/x-ndjson")
+
+
+def test_json_body_must_be_an_object():
+    with pytest.raises(ValueError, match="JSON object"):
+        read(b"[1, 2]")
+
+
+def test_empty_body():
+    assert read(b"")[0] is None
+    assert read(b"", encoding="gzip")[0] is None
@@ -0,0 +1,49 @@
+import copy
+
+import pytest
+
+import app as app_module
+import report_generator
+from transcript import Transcript, TranscriptDataError
+from utils import SAMPLE_DATA_ENG
+
+
+def meeting_with_bad_timestamp() -> dict:
+    meeting = copy.deepcopy(SAMPLE_DATA_ENG)
+    meeting["transcriptData"][3]["timeStamp"] = "yesterday"
+    return meeting
+
+
+def test_timestamps_are_parsed_only_when_read():
+    transcript = Transcript.from_entries(meeting_with_bad_timestamp()["transcriptData"])
+    assert transcript.speaker(3) == "TitaNyte Official"
+
+    with pytest.raises(TranscriptDataError, match=r"transcriptData\[3\]"):
+        transcript.timestamps
+
+
+@pytest.mark.parametrize("report_type", ["Normal", "Sentiment"])
+def test_reports_without_timestamps_ignore_a_malformed_one(report_type, monkeypatch):
+    # Sections mode writes the executive summary from interval summaries
+    monkeypatch.setattr(report_generator, "NORMAL_REPORT_MODE", "sections")
+    response = app_module.app.test_client().post(
+        "/report",
+        json={"meeting_data": meeting_with_bad_timestamp(), "report_type": report_type, "report_format": "PDF"},
+    )
+    assert response.status_code == 200
+
+
+def test_interval_report_rejects_a_malformed_timestamp():
+    client = app_module.app.test_client()
+    response = client.post(
+        "/report",
+        json={"meeting_data": meeting_with_bad_timestamp(), "report_type": "Interval", "report_format": "PDF"},
+    )
+    assert response.status_code == 400
+    assert "transcriptData[3]" in response.get_json()["error"]
+
+    response = client.post(
+        "/report/bundle",
+        json={"meeting_data": meeting_with_bad_timestamp(), "reports": [["Normal", "PDF"], ["Interval", "DOCX"]]},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,181 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# ==============================================================================
+# LIGHTWEIGHT REQUEST TRACING
+# ==============================================================================
+# Each request (or background job) gets a Trace; `span()` records nested,
+# timed stages into it. The summary goes out as a Server-Timing header and,
+# when TRACE_LOG_PATH is set, the full waterfall is appended to a JSON-lines
+# file. Outside a trace, `span()` costs a single context-variable lookup.
+#
+# Work handed to thread pools must run under contextvars.copy_context() (see
+# `propagate`) so its spans attach to the request that caused it.
+
+TRACE_LOG_PATH = os.environ.get("TRACE_LOG_PATH", "")
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+_log_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "start", "duration", "attributes")
+
+    def __init__(self, name: str, parent_id, start: float, attributes: dict):
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.start = start
+        self.duration = None
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        """Adds attributes (sizes, counts, outcomes) to the span."""
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+
+    def server_timing(self) -> str:
+        """
+        Summarizes the trace as a Server-Timing header value.
+
+        Spans with the same name are summed, so concurrent stages (parallel
+        Gemini calls) can add up to more than the total.
+        """
+        totals = {}
+        with self._lock:
+            for span in self.spans:
+                if span.duration is not None:
+                    duration, count = totals.get(span.name, (0.0, 0))
+                    totals[span.name] = (duration + span.duration, count + 1)
+        entries = [
+            f'{name};dur={duration * 1000:.1f};desc="{count}x"' for name, (duration, count) in totals.items()
+        ]
+        entries.append(f"total;dur={(self.duration or 0) * 1000:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = [
+                {
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "name": span.name,
+                    "start_ms": round((span.start - self.start) * 1000, 3),
+                    "duration_ms": None if span.duration is None else round(span.duration * 1000, 3),
+                    "attributes": span.attributes,
+                }
+                for span in self.spans
+            ]
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": None if self.duration is None else round(self.duration * 1000, 3),
+            "spans": spans,
+        }
+
+
+def start_trace(name: str) -> tuple:
+    """Makes a new trace current; returns a token for finish_trace."""
+    trace = Trace(name)
+    return trace, _current_trace.set(trace), _current_span.set(None)
+
+
+def finish_trace(token: tuple) -> Trace:
+    """Ends the trace started with `token`, logs it, and restores the previous context."""
+    trace, trace_token, span_token = token
+    trace.finish()
+    _current_span.reset(span_token)
+    _current_trace.reset(trace_token)
+    write_trace(trace)
+    return trace
+
+
+@contextmanager
+def traced(name: str):
+    """Runs a block (e.g. a background job) as its own trace."""
+    token = start_trace(name)
+    try:
+        yield token[0]
+    finally:
+        finish_trace(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Times a stage of the current trace, nested under the enclosing span."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    current = Span(name, parent.span_id if parent is not None else None, time.perf_counter(), attributes)
+    trace.add(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.start
+        _current_span.reset(token)
+
+
+def propagate(fn):
+    """Wraps `fn` to run in a copy of the caller's context (for thread pools)."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+def write_trace(trace: Trace):
+    """Appends the trace to TRACE_LOG_PATH as one JSON line, if enabled."""
+    if not TRACE_LOG_PATH:
+        return
+    line = json.dumps(trace.to_dict(), ensure_ascii=False, default=str)
+    try:
+        directory = os.path.dirname(TRACE_LOG_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _log_lock, open(TRACE_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print(f"Could not write trace log: {e}")
@@ -0,0 +1,130 @@
+import sys
+from array import array
+from datetime import datetime, timezone
+
+# ==============================================================================
+# COMPACT COLUMNAR TRANSCRIPT
+# ==============================================================================
+# Built once per request from the extension's `transcriptData` list. Speakers
+# are interned to small ids, timestamps are epoch seconds, and all utterance
+# text lives in one string addressed by offsets, so repeated passes by the
+# report generators are cheap index operations instead of dict walks.
+# Timestamps are parsed on first use: only the interval reports need them.
+
+
+class TranscriptDataError(ValueError):
+    """Raised when a transcript entry cannot be used; the message is client-facing."""
+
+
+def parse_timestamp(timestamp: str) -> datetime:
+    """Parses the extension's ISO timestamps (with a trailing 'Z')."""
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
+
+def epoch_to_datetime(epoch: int) -> datetime:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+def is_meaningful(content: str, word_count: int = None) -> bool:
+    """Checks if content is substantial enough for analysis."""
+    if word_count is None:
+        word_count = len(content.split())
+    return word_count >= 4 and "?" not in content
+
+
+class Transcript:
+    __slots__ = (
+        "speakers",
+        "speaker_ids",
+        "raw_timestamps",
+        "_timestamps",
+        "text",
+        "offsets",
+        "word_counts",
+        "meaningful",
+    )
+
+    def __init__(self):
+        self.speakers = []  # speaker id -> name
+        self.speaker_ids = array("I")
+        self.raw_timestamps = []  # timeStamp strings as received
+        self._timestamps = None
+        self.text = ""
+        self.offsets = array("Q", [0])  # content i is text[offsets[i]:offsets[i + 1]]
+        self.word_counts = array("I")
+        self.meaningful = bytearray()
+
+    @classmethod
+    def from_entries(cls, transcript_data: list) -> "Transcript":
+        """Builds the columnar form from a list of transcriptData dicts."""
+        transcript = cls()
+        speaker_index = {}
+        contents = []
+        position = 0
+        for entry in transcript_data:
+            name = sys.intern(entry["name"])
+            speaker_id = speaker_index.get(name)
+            if speaker_id is None:
+                speaker_id = speaker_index[name] = len(transcript.speakers)
+                transcript.speakers.append(name)
+
+            content = entry["content"]
+            word_count = len(content.split())
+            contents.append(content)
+            position += len(content)
+
+            transcript.speaker_ids.append(speaker_id)
+            transcript.raw_timestamps.append(entry.get("timeStamp"))
+            transcript.offsets.append(position)
+            transcript.word_counts.append(word_count)
+            transcript.meaningful.append(is_meaningful(content, word_count))
+
+        transcript.text = "".join(contents)
+        return transcript
+
+    @property
+    def timestamps(self) -> array:
+        """Epoch seconds of every entry, parsed on first access.
+
+        Raises:
+            TranscriptDataError: If an entry's timeStamp is missing or malformed.
+        """
+        if self._timestamps is None:
+            timestamps = array("q")
+            for index, timestamp in enumerate(self.raw_timestamps):
+                try:
+                    timestamps.append(int(parse_timestamp(timestamp).timestamp()))
+                except (TypeError, AttributeError, ValueError):
+                    raise TranscriptDataError(
+                        f"transcriptData[{index}] has an invalid timeStamp: {timestamp!r}"
+                    ) from None
+            self._timestamps = timestamps
+        return self._timestamps
+
+    def __len__(self) -> int:
+        return len(self.speaker_ids)
+
+    def speaker(self, index: int) -> str:
+        return self.speakers[self.speaker_ids[index]]
+
+    def content(self, index: int) -> str:
+        return self.text[self.offsets[index]:self.offsets[index + 1]]
+
+    def line(self, index: int) -> str:
+        """Returns the 'Speaker: content' form used in prompts."""
+        return f"{self.speaker(index)}: {self.content(index)}"
+
+    def meaningful_indices(self) -> list:
+        return [index for index, flag in enumerate(self.meaningful) if flag]
+
+    def time_ordered_indices(self) -> list:
+        """Entry indices sorted by timestamp, ties kept in arrival order."""
+        timestamps = self.timestamps
+        return sorted(range(len(self)), key=lambda index: (timestamps[index], index))
+
+
+def as_transcript(transcript_data) -> Transcript:
+    """Accepts either a Transcript or a raw transcriptData list."""
+    if isinstance(transcript_data, Transcript):
+        return transcript_data
+    return Transcript.from_entries(transcript_data)
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+
+# ==============================================================================
+# BACKGROUND WARMUP AND READINESS
+# ==============================================================================
+# Heavy dependencies (the Gemini SDK, reportlab, python-docx, matplotlib,
+# NumPy and the sentiment lexicon) are imported on first use, so a worker
+# starts serving quickly. Right after boot this thread loads them anyway, so
+# the first real report does not pay for them either. /readyz reports ready
+# once it has finished; /healthz only says the process is up.
+
+WARMUP_ON_BOOT = os.environ.get("WARMUP_ON_BOOT", "1") == "1"
+
+_state = {"status": "idle", "started_at": None, "finished_at": None, "steps": []}
+_state_lock = threading.Lock()
+
+
+def _warm_summarizer():
+    from summary_llm import GENERATION_CONFIG, MODEL_NAME, configure_client, get_model
+
+    if configure_client():
+        get_model(MODEL_NAME, GENERATION_CONFIG)
+
+
+def _warm_sentiment():
+    from sentiment import get_sentiment_engine
+
+    get_sentiment_engine().polarity(["Warmup"])
+
+
+def _warm_llm_cache():
+    from llm_cache import get_llm_cache
+
+    get_llm_cache()
+
+
+# Resources are loaded directly rather than by rendering a document, so the
+# render and sentiment metrics only ever count real reports.
+def _warm_pdf():
+    import reportlab.platypus  # noqa: F401
+
+    from charts import sentiment_pie_drawing
+    from renderers import get_rendering_context
+
+    get_rendering_context().pdf_styles
+    sentiment_pie_drawing(WARMUP_COUNTS)
+
+
+def _warm_docx():
+    import docx.shared  # noqa: F401
+
+    from charts import sentiment_pie_png
+    from renderers import get_rendering_context
+
+    get_rendering_context().new_docx()
+    sentiment_pie_png(WARMUP_COUNTS)
+
+
+WARMUP_COUNTS = {"Positive": 1, "Neutral": 1, "Negative": 1}
+
+WARMUP_STEPS = [
+    ("summarizer", _warm_summarizer),
+    ("sentiment", _warm_sentiment),
+    ("llm_cache", _warm_llm_cache),
+    ("pdf", _warm_pdf),
+    ("docx", _warm_docx),
+]
+
+
+def run_warmup() -> list:
+    """Runs every warmup step in this thread; a failing step is recorded and skipped."""
+    with _state_lock:
+        _state.update(status="running", started_at=time.time(), finished_at=None, steps=[])
+    for name, step in WARMUP_STEPS:
+        started = time.perf_counter()
+        error = None
+        try:
+            step()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"Warmup step {name} failed: {error}")
+        with _state_lock:
+            _state["steps"].append(
+                {"name": name, "seconds": round(time.perf_counter() - started, 4), "error": error}
+            )
+    with _state_lock:
+        _state.update(status="done", finished_at=time.time())
+        steps = list(_state["steps"])
+    print(f"Warmup finished in {sum(step['seconds'] for step in steps):.2f}s.")
+    return steps
+
+
+def start_warmup():
+    """Starts the warmup thread once per process if WARMUP_ON_BOOT is set."""
+    if not WARMUP_ON_BOOT:
+        return
+    with _state_lock:
+        if _state["status"] != "idle":
+            return
+        _state["status"] = "starting"
+    threading.Thread(target=run_warmup, name="warmup", daemon=True).start()
+
+
+def readiness() -> tuple[bool, dict]:
+    """Returns (ready, details). A process that never warms up is ready right away."""
+    with _state_lock:
+        details = {**_state, "steps": list(_state["steps"])}
+    return details["status"] in ("idle", "done"), details